@@ -0,0 +1,272 @@
+﻿"""Headless SecurePatch command line.
+
+    python -m app.cli scan PATH [--fail-on high] [--format text|json|ndjson|sarif]
+    python -m app.cli scan PATH --base origin/main [--changed-lines]
+    python -m app.cli patch PATH
+    python -m app.cli apply PATH [--no-backup] [--transactional]
+    python -m app.cli report PATH [--patch]
+    python -m app.cli rollback PATH
+    python -m app.cli watch PATH
+    python -m app.cli baseline PATH
+
+Exit codes: 0 when no finding reaches the ``--fail-on`` severity, 1 when
+some do, 2 on usage errors or when the command itself failed. Nothing
+here imports Qt, and the engine is only loaded once arguments are parsed.
+"""
+import argparse
+import os
+import sys
+from pathlib import Path
+from typing import Callable, Dict
+
+SEVERITY_ORDER = ("low", "medium", "high", "critical")
+EXIT_OK = 0
+EXIT_FINDINGS = 1
+EXIT_ERROR = 2
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="securepatch", description="Headless SecurePatch scanner.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def command(name, help_text):
+        sub = commands.add_parser(name, help=help_text)
+        sub.add_argument("path", help="project directory")
+        sub.add_argument("--fail-on", choices=SEVERITY_ORDER + ("never",), default="low",
+                         help="lowest severity that makes the exit code 1 (default: low)")
+        sub.add_argument("--tools", action="store_true", help="also run installed external tools")
+        sub.add_argument("--parallel", action="store_true", help="scan in a process pool")
+        sub.add_argument("--workers", type=int, default=0)
+        sub.add_argument("--cache", action="store_true", help="reuse results of unchanged files")
+        sub.add_argument("--no-ignore-files", action="store_true", help="do not honour .gitignore files")
+        sub.add_argument("--strict", action="store_true")
+        sub.add_argument("--base", metavar="REF", help="only scan files changed since this git ref")
+        sub.add_argument("--changed-lines", action="store_true",
+                         help="with --base, only report findings on added or changed lines")
+        sub.add_argument("--baseline", metavar="FILE",
+                         help="baseline of accepted findings (default: PATH/.securepatch-baseline.json)")
+        sub.add_argument("--no-baseline", action="store_true", help="report findings the baseline accepts")
+        return sub
+
+    scan = command("scan", "scan a project and print its findings")
+    scan.add_argument("--format", choices=("text", "json", "ndjson", "sarif"), default="text")
+    scan.add_argument("--output", help="write findings here instead of stdout")
+
+    patch = command("patch", "print the unified diff that would fix the findings")
+    patch.add_argument("--touch-business-logic", action="store_true")
+
+    apply = command("apply", "fix the findings in place")
+    apply.add_argument("--touch-business-logic", action="store_true")
+    apply.add_argument("--no-backup", action="store_true")
+    apply.add_argument("--transactional", action="store_true", help="apply every file or none")
+
+    report = command("report", "write the Markdown/HTML/JSON/SARIF reports")
+    report.add_argument("--patch", action="store_true", help="include the patch the fixers would make")
+    report.add_argument("--output-dir", help="directory that receives reports/<timestamp> (default: PATH)")
+
+    watch = command("watch", "rescan files as they change and print the findings delta")
+    watch.add_argument("--poll-interval", type=float, default=0.5,
+                       help="seconds between tree walks when watchdog is not installed (default: 0.5); "
+                            "without watchdog the first save of a file can take this long to show up")
+
+    command("baseline", "accept every current finding by writing them to the baseline")
+
+    rollback = commands.add_parser("rollback", help="restore the files changed by the last apply")
+    rollback.add_argument("path", help="project directory")
+    rollback.add_argument("--transaction", help="id of the apply to undo (default: latest)")
+    return parser
+
+
+def _options(args):
+    from core.config import ScanOptions
+
+    return ScanOptions(
+        strict=args.strict,
+        no_touch_business_logic=not getattr(args, "touch_business_logic", False),
+        use_external_tools=args.tools,
+        parallel=args.parallel,
+        workers=args.workers,
+        use_cache=args.cache,
+        use_ignore_files=not args.no_ignore_files,
+        git_base=args.base,
+        changed_lines_only=args.changed_lines,
+        use_baseline=not args.no_baseline and args.command != "baseline",
+        baseline_path=args.baseline,
+    )
+
+
+def exit_code(findings, fail_on) -> int:
+    """EXIT_FINDINGS if any finding is at least ``fail_on`` severe, else EXIT_OK."""
+    if fail_on == "never":
+        return EXIT_OK
+    threshold = SEVERITY_ORDER.index(fail_on)
+    for finding in findings:
+        if SEVERITY_ORDER.index(finding.severity.value) >= threshold:
+            return EXIT_FINDINGS
+    return EXIT_OK
+
+
+def _print_errors(errors):
+    for error in errors:
+        print(f"securepatch: {error}", file=sys.stderr)
+
+
+def _format_text(finding):
+    return (f"{finding.file_path}:{finding.line}:{finding.column}: "
+            f"[{finding.severity.value}] {finding.rule_id} {finding.message}")
+
+
+def _write_findings(result, args, out):
+    if args.format == "text":
+        for finding in result.findings:
+            out.write(_format_text(finding) + "\n")
+        return
+    from core.report import finding_json, finding_ndjson, finding_rows
+
+    rows = finding_rows(result.findings)
+    if args.format == "sarif":
+        from core.sarif import write_sarif
+
+        write_sarif(out, rows, result.errors, result.project_root)
+        out.write("\n")
+    elif args.format == "ndjson":
+        for row in rows:
+            out.write(finding_ndjson(row) + "\n")
+    else:
+        out.write("[")
+        for index, row in enumerate(rows):
+            out.write(("\n  " if not index else ",\n  ") + finding_json(row, 1))
+        out.write("\n]\n" if result.findings else "]\n")
+
+
+def _scan(engine, args):
+    result = engine.scan_project(args.path, _options(args))
+    _print_errors(result.errors)
+    return result
+
+
+def cmd_scan(engine, args):
+    result = _scan(engine, args)
+    if result.suppressed:
+        print(f"securepatch: {result.suppressed} findings accepted by the baseline", file=sys.stderr)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as out:
+            _write_findings(result, args, out)
+    else:
+        _write_findings(result, args, sys.stdout)
+    return exit_code(result.findings, args.fail_on)
+
+
+def cmd_patch(engine, args):
+    result = _scan(engine, args)
+    plan = engine.generate_patch(result, _options(args))
+    for change in plan.file_changes:
+        sys.stdout.write(change.diff + "\n")
+    return exit_code(result.findings, args.fail_on)
+
+
+def cmd_apply(engine, args):
+    result = _scan(engine, args)
+    plan = engine.generate_patch(result, _options(args))
+    outcome = engine.apply_patch(plan, create_backup=not args.no_backup, transactional=args.transactional)
+    for path in outcome.applied_files:
+        print(f"patched {path}")
+    _print_errors(outcome.errors)
+    if outcome.errors:
+        return EXIT_ERROR
+    applied = set(outcome.applied_files)
+    fixed = {
+        (change.file_path, item.line, item.rule_id)
+        for change in plan.file_changes if change.file_path in applied
+        for item in change.line_explanations
+    }
+    remaining = [f for f in result.findings if (f.file_path, f.line, f.rule_id) not in fixed]
+    return exit_code(remaining, args.fail_on)
+
+
+def cmd_report(engine, args):
+    result = _scan(engine, args)
+    plan = engine.generate_patch(result, _options(args)) if args.patch else None
+    paths = engine.export_report(args.output_dir or args.path, result, plan, None)
+    print(paths.output_dir)
+    return exit_code(result.findings, args.fail_on)
+
+
+def cmd_rollback(engine, args):
+    engine.project_root = Path(args.path).resolve()
+    outcome = engine.rollback_patch(args.transaction)
+    for path in outcome.applied_files:
+        print(f"restored {path}")
+    _print_errors(outcome.errors)
+    return EXIT_ERROR if outcome.errors else EXIT_OK
+
+
+def cmd_baseline(engine, args):
+    # The baseline is rewritten from the scan, so it must cover every file.
+    if args.base:
+        print("securepatch: baseline cannot be combined with --base", file=sys.stderr)
+        return EXIT_ERROR
+    result = _scan(engine, args)
+    path, count = engine.write_baseline(args.path, result, args.baseline)
+    print(f"securepatch: {count} findings accepted in {path}", file=sys.stderr)
+    return EXIT_OK
+
+
+def cmd_watch(engine, args):
+    watcher = engine.watch(args.path, _options(args), poll_interval=args.poll_interval)
+    initial = watcher.start()
+    for finding in initial.added:
+        print(_format_text(finding))
+    _print_errors(initial.errors)
+    print(f"securepatch: watching {len(initial.files)} files, {len(initial.added)} findings", file=sys.stderr)
+    try:
+        for delta in watcher.deltas():
+            for finding in delta.resolved:
+                print("- " + _format_text(finding))
+            for finding in delta.added:
+                print("+ " + _format_text(finding))
+            _print_errors(delta.errors)
+            sys.stdout.flush()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.stop()
+    return exit_code(watcher.findings(), args.fail_on)
+
+
+COMMANDS: Dict[str, Callable[..., int]] = {
+    "scan": cmd_scan,
+    "patch": cmd_patch,
+    "apply": cmd_apply,
+    "report": cmd_report,
+    "rollback": cmd_rollback,
+    "watch": cmd_watch,
+    "baseline": cmd_baseline,
+}
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    if not Path(args.path).is_dir():
+        print(f"securepatch: {args.path} is not a directory", file=sys.stderr)
+        return EXIT_ERROR
+    if getattr(args, "changed_lines", False) and not args.base:
+        print("securepatch: --changed-lines needs --base", file=sys.stderr)
+        return EXIT_ERROR
+    from core.engine import ScanEngine
+    from core.gitdiff import GitError
+
+    try:
+        return COMMANDS[args.command](ScanEngine(), args)
+    except GitError as exc:
+        print(f"securepatch: git: {exc}", file=sys.stderr)
+        return EXIT_ERROR
+    except BrokenPipeError:
+        # The reader (``head``, a closed pager) went away; silence the
+        # flush at exit instead of printing a traceback.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return EXIT_ERROR
+
+
+if __name__ == "__main__":
+    sys.exit(main())
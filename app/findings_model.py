@@ -0,0 +1,87 @@
+﻿from PySide6 import QtCore
+
+from core.store import FindingStore
+
+COLUMNS = ["Severity", "Rule", "File", "Line", "Message", "Fixable"]
+SEVERITY_RANK = {"low": 0, "medium": 1, "high": 2, "critical": 3}
+SORT_ROLE = QtCore.Qt.UserRole + 1
+
+
+class FindingsTableModel(QtCore.QAbstractTableModel):
+    """Table model over a FindingStore.
+
+    Cells are produced on demand in ``data()``, so only the rows a view
+    actually paints cost anything; appending a batch is a single row insert
+    notification.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._findings = FindingStore()
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self._findings)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if role == QtCore.Qt.DisplayRole and orientation == QtCore.Qt.Horizontal:
+            return COLUMNS[section]
+        return None
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        finding = self._findings[index.row()]
+        column = index.column()
+        if role == QtCore.Qt.DisplayRole:
+            if column == 0:
+                return finding.severity.value
+            if column == 1:
+                return finding.rule_id
+            if column == 2:
+                return finding.file_path
+            if column == 3:
+                return str(finding.line)
+            if column == 4:
+                return finding.message
+            return "yes" if finding.fixable else "no"
+        if role == SORT_ROLE:
+            if column == 0:
+                return SEVERITY_RANK.get(finding.severity.value, -1)
+            if column == 3:
+                return finding.line
+            return self.data(index, QtCore.Qt.DisplayRole)
+        return None
+
+    def finding(self, row):
+        return self._findings[row]
+
+    def clear(self):
+        self.set_findings(FindingStore())
+
+    def set_findings(self, findings):
+        self.beginResetModel()
+        self._findings = findings if isinstance(findings, FindingStore) else FindingStore(findings)
+        self.endResetModel()
+
+    def append_findings(self, findings):
+        if not findings:
+            return
+        start = len(self._findings)
+        self.beginInsertRows(QtCore.QModelIndex(), start, start + len(findings) - 1)
+        self._findings.extend(findings)
+        self.endInsertRows()
+
+
+def make_proxy(model, parent=None):
+    proxy = QtCore.QSortFilterProxyModel(parent)
+    proxy.setSourceModel(model)
+    proxy.setSortRole(SORT_ROLE)
+    proxy.setFilterKeyColumn(-1)
+    proxy.setFilterCaseSensitivity(QtCore.Qt.CaseInsensitive)
+    # Re-sorting on every streamed batch would cost O(n log n) per batch;
+    # sorting happens when a header is clicked instead.
+    proxy.setDynamicSortFilter(False)
+    return proxy
@@ -1,9 +1,11 @@
-﻿import sys
+﻿import multiprocessing
+import sys
 from PySide6 import QtCore, QtWidgets
 
 from core.engine import ScanEngine
 from core.config import ScanOptions
-from app.worker import Worker
+from app.worker import ScanWorker, WatchWorker, Worker
+from app.findings_model import FindingsTableModel, make_proxy
 
 
 class MainWindow(QtWidgets.QMainWindow):
@@ -16,6 +18,8 @@ class MainWindow(QtWidgets.QMainWindow):
         self.scan_result = None
         self.patch_plan = None
         self.patch_result = None
+        self.scan_worker = None
+        self.watch_worker = None
 
         central = QtWidgets.QWidget()
         self.setCentralWidget(central)
@@ -32,20 +36,33 @@ class MainWindow(QtWidgets.QMainWindow):
         self.use_tools_check.setChecked(True)
         self.backup_check = QtWidgets.QCheckBox("Create backup before apply")
         self.backup_check.setChecked(True)
+        self.transactional_check = QtWidgets.QCheckBox("Apply every file or none")
 
         self.analyze_btn = QtWidgets.QPushButton("Analyze")
+        self.cancel_btn = QtWidgets.QPushButton("Cancel")
+        self.cancel_btn.setEnabled(False)
+        self.watch_btn = QtWidgets.QPushButton("Watch")
+        self.watch_btn.setCheckable(True)
         self.patch_btn = QtWidgets.QPushButton("Generate patch")
         self.apply_btn = QtWidgets.QPushButton("Apply patch")
+        self.rollback_btn = QtWidgets.QPushButton("Rollback")
         self.export_btn = QtWidgets.QPushButton("Export report")
 
-        self.results_table = QtWidgets.QTableWidget(0, 6)
-        self.results_table.setHorizontalHeaderLabels(
-            ["Severity", "Rule", "File", "Line", "Message", "Fixable"]
-        )
+        self.findings_model = FindingsTableModel(self)
+        self.findings_proxy = make_proxy(self.findings_model, self)
+        self.filter_input = QtWidgets.QLineEdit()
+        self.filter_input.setPlaceholderText("Filter findings")
+
+        self.results_table = QtWidgets.QTableView()
+        self.results_table.setModel(self.findings_proxy)
+        self.results_table.horizontalHeader().setSortIndicator(-1, QtCore.Qt.AscendingOrder)
+        self.results_table.setSortingEnabled(True)
         self.results_table.horizontalHeader().setStretchLastSection(True)
+        self.results_table.verticalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Fixed)
         self.results_table.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
         self.results_table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
 
+        self.diff_file_combo = QtWidgets.QComboBox()
         self.diff_view = QtWidgets.QPlainTextEdit()
         self.diff_view.setReadOnly(True)
 
@@ -62,18 +79,27 @@ class MainWindow(QtWidgets.QMainWindow):
         options_row.addWidget(self.no_touch_logic_check)
         options_row.addWidget(self.use_tools_check)
         options_row.addWidget(self.backup_check)
+        options_row.addWidget(self.transactional_check)
         options_row.addStretch(1)
 
         actions_row = QtWidgets.QHBoxLayout()
         actions_row.addWidget(self.analyze_btn)
+        actions_row.addWidget(self.cancel_btn)
+        actions_row.addWidget(self.watch_btn)
         actions_row.addWidget(self.patch_btn)
         actions_row.addWidget(self.apply_btn)
+        actions_row.addWidget(self.rollback_btn)
         actions_row.addWidget(self.export_btn)
         actions_row.addStretch(1)
 
         splitter = QtWidgets.QSplitter(QtCore.Qt.Horizontal)
         splitter.addWidget(self.results_table)
-        splitter.addWidget(self.diff_view)
+        diff_panel = QtWidgets.QWidget()
+        diff_layout = QtWidgets.QVBoxLayout(diff_panel)
+        diff_layout.setContentsMargins(0, 0, 0, 0)
+        diff_layout.addWidget(self.diff_file_combo)
+        diff_layout.addWidget(self.diff_view)
+        splitter.addWidget(diff_panel)
         splitter.setSizes([500, 600])
 
         layout = QtWidgets.QVBoxLayout(central)
@@ -81,6 +107,7 @@ class MainWindow(QtWidgets.QMainWindow):
         layout.addWidget(self.lang_label)
         layout.addLayout(options_row)
         layout.addLayout(actions_row)
+        layout.addWidget(self.filter_input)
         layout.addWidget(splitter)
         layout.addWidget(self.status_label)
 
@@ -88,9 +115,15 @@ class MainWindow(QtWidgets.QMainWindow):
 
         self.browse_btn.clicked.connect(self.on_browse)
         self.analyze_btn.clicked.connect(self.on_analyze)
+        self.cancel_btn.clicked.connect(self.on_cancel_scan)
+        self.watch_btn.toggled.connect(self.on_watch_toggled)
         self.patch_btn.clicked.connect(self.on_generate_patch)
         self.apply_btn.clicked.connect(self.on_apply_patch)
+        self.rollback_btn.clicked.connect(self.on_rollback)
         self.export_btn.clicked.connect(self.on_export_report)
+        self.filter_input.textChanged.connect(self.findings_proxy.setFilterFixedString)
+        self.diff_file_combo.currentIndexChanged.connect(self.on_diff_file_changed)
+        self.results_table.selectionModel().currentRowChanged.connect(self.on_finding_selected)
 
     def on_browse(self):
         path = QtWidgets.QFileDialog.getExistingDirectory(self, "Select project")
@@ -110,30 +143,71 @@ class MainWindow(QtWidgets.QMainWindow):
         if not project:
             self.status_label.setText("Select a project folder")
             return
+        self.scan_result = None
+        self.patch_plan = None
+        self.patch_result = None
+        self._show_patch_files()
+        self.findings_model.clear()
         self.status_label.setText("Scanning...")
-        worker = Worker(self.engine.scan_project, project, self._options())
+        self.analyze_btn.setEnabled(False)
+        self.cancel_btn.setEnabled(True)
+        worker = ScanWorker(self.engine.iter_scan(project, self._options()))
+        worker.signals.progress.connect(self.on_scan_progress)
         worker.signals.finished.connect(self.on_scan_finished)
         worker.signals.error.connect(self.on_worker_error)
+        self.scan_worker = worker
         self.thread_pool.start(worker)
 
+    def on_cancel_scan(self):
+        if self.scan_worker:
+            self.scan_worker.cancel()
+            self.status_label.setText("Cancelling...")
+
+    def on_scan_progress(self, chunk):
+        findings, files_done = chunk
+        self.findings_model.append_findings(findings)
+        self.status_label.setText(f"Scanning... files: {files_done}, findings: {self.findings_model.rowCount()}")
+
     def on_scan_finished(self, result):
         self.scan_result = result
-        self.patch_plan = None
-        self.patch_result = None
-        self.diff_view.setPlainText("")
-        self.results_table.setRowCount(0)
-        for finding in result.findings:
-            row = self.results_table.rowCount()
-            self.results_table.insertRow(row)
-            self.results_table.setItem(row, 0, QtWidgets.QTableWidgetItem(finding.severity.value))
-            self.results_table.setItem(row, 1, QtWidgets.QTableWidgetItem(finding.rule_id))
-            self.results_table.setItem(row, 2, QtWidgets.QTableWidgetItem(finding.file_path))
-            self.results_table.setItem(row, 3, QtWidgets.QTableWidgetItem(str(finding.line)))
-            self.results_table.setItem(row, 4, QtWidgets.QTableWidgetItem(finding.message))
-            self.results_table.setItem(row, 5, QtWidgets.QTableWidgetItem("yes" if finding.fixable else "no"))
+        self.scan_worker = None
+        self.watch_worker = None
+        self.analyze_btn.setEnabled(True)
+        self.cancel_btn.setEnabled(False)
         langs = ", ".join(sorted(result.language_stats.keys())) or "-"
         self.lang_label.setText(f"Languages: {langs}")
-        self.status_label.setText(f"Findings: {len(result.findings)}")
+        if result.cancelled:
+            self.status_label.setText(f"Scan cancelled. Findings: {len(result.findings)}")
+        else:
+            self.status_label.setText(f"Findings: {len(result.findings)}")
+
+    def on_watch_toggled(self, checked):
+        if not checked:
+            if self.watch_worker:
+                self.watch_worker.stop()
+                self.watch_worker = None
+            self.analyze_btn.setEnabled(True)
+            self.status_label.setText("Watch stopped")
+            return
+        project = self.path_input.text().strip()
+        if not project:
+            self.status_label.setText("Select a project folder")
+            self.watch_btn.setChecked(False)
+            return
+        self.analyze_btn.setEnabled(False)
+        self.status_label.setText("Watching...")
+        worker = WatchWorker(self.engine.watch(project, self._options()))
+        worker.signals.progress.connect(self.on_watch_delta)
+        worker.signals.error.connect(self.on_worker_error)
+        self.watch_worker = worker
+        self.thread_pool.start(worker)
+
+    def on_watch_delta(self, update):
+        delta, findings = update
+        self.findings_model.set_findings(findings)
+        self.status_label.setText(
+            f"Watching: {len(findings)} findings (+{len(delta.added)} / -{len(delta.resolved)})"
+        )
 
     def on_generate_patch(self):
         if not self.scan_result:
@@ -147,15 +221,42 @@ class MainWindow(QtWidgets.QMainWindow):
 
     def on_patch_generated(self, plan):
         self.patch_plan = plan
-        self.diff_view.setPlainText(plan.diff)
+        self._show_patch_files()
         self.status_label.setText(f"Patch ready. Files: {len(plan.file_changes)}")
 
+    def _show_patch_files(self):
+        # Only the selected file's diff is rendered; it is computed on first
+        # display rather than for the whole plan at once.
+        self.diff_file_combo.blockSignals(True)
+        self.diff_file_combo.clear()
+        if self.patch_plan:
+            self.diff_file_combo.addItems([change.file_path for change in self.patch_plan.file_changes])
+        self.diff_file_combo.blockSignals(False)
+        self.on_diff_file_changed(self.diff_file_combo.currentIndex())
+
+    def on_diff_file_changed(self, index):
+        if not self.patch_plan or index < 0:
+            self.diff_view.setPlainText("")
+            return
+        self.diff_view.setPlainText(self.patch_plan.file_changes[index].diff)
+
+    def on_finding_selected(self, current, _previous):
+        if not self.patch_plan or not current.isValid():
+            return
+        row = self.findings_proxy.mapToSource(current).row()
+        index = self.diff_file_combo.findText(self.findings_model.finding(row).file_path)
+        if index >= 0:
+            self.diff_file_combo.setCurrentIndex(index)
+
     def on_apply_patch(self):
         if not self.patch_plan:
             self.status_label.setText("Generate patch first")
             return
         self.status_label.setText("Applying patch...")
-        worker = Worker(self.engine.apply_patch, self.patch_plan, self.backup_check.isChecked())
+        worker = Worker(
+            self.engine.apply_patch, self.patch_plan, self.backup_check.isChecked(),
+            transactional=self.transactional_check.isChecked(),
+        )
         worker.signals.finished.connect(self.on_patch_applied)
         worker.signals.error.connect(self.on_worker_error)
         self.thread_pool.start(worker)
@@ -167,6 +268,19 @@ class MainWindow(QtWidgets.QMainWindow):
         else:
             self.status_label.setText("Patch applied")
 
+    def on_rollback(self):
+        self.status_label.setText("Rolling back...")
+        worker = Worker(self.engine.rollback_patch)
+        worker.signals.finished.connect(self.on_rolled_back)
+        worker.signals.error.connect(self.on_worker_error)
+        self.thread_pool.start(worker)
+
+    def on_rolled_back(self, result):
+        if result.errors:
+            self.status_label.setText(f"Rollback finished with errors: {result.errors[0]}")
+        else:
+            self.status_label.setText(f"Restored {len(result.applied_files)} files")
+
     def on_export_report(self):
         if not self.scan_result:
             self.status_label.setText("Run analysis first")
@@ -185,6 +299,10 @@ class MainWindow(QtWidgets.QMainWindow):
         self.status_label.setText(f"Report saved in {report_paths.output_dir}")
 
     def on_worker_error(self, trace):
+        self.scan_worker = None
+        self.watch_worker = None
+        self.analyze_btn.setEnabled(True)
+        self.cancel_btn.setEnabled(False)
         self.status_label.setText("Error - check console")
         print(trace)
 
@@ -197,4 +315,5 @@ def main():
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     main()
@@ -1,11 +1,12 @@
-﻿import traceback
+﻿import time
+import traceback
 from PySide6 import QtCore
 
 
 class WorkerSignals(QtCore.QObject):
     finished = QtCore.Signal(object)
     error = QtCore.Signal(str)
-    progress = QtCore.Signal(str)
+    progress = QtCore.Signal(object)
 
 
 class Worker(QtCore.QRunnable):
@@ -23,3 +24,67 @@ class Worker(QtCore.QRunnable):
             self.signals.finished.emit(result)
         except Exception:
             self.signals.error.emit(traceback.format_exc())
+
+
+class WatchWorker(QtCore.QRunnable):
+    """Runs a ProjectWatcher, emitting ``(delta, findings)`` for each change.
+
+    ``findings`` is the full list after the delta, taken on the worker thread
+    so the GUI never reads the watcher while it updates.
+    """
+
+    def __init__(self, watcher):
+        super().__init__()
+        self.watcher = watcher
+        self.signals = WorkerSignals()
+
+    def stop(self):
+        self.watcher.stop()
+
+    @QtCore.Slot()
+    def run(self):
+        try:
+            delta = self.watcher.start()
+            self.signals.progress.emit((delta, self.watcher.findings()))
+            for delta in self.watcher.deltas():
+                self.signals.progress.emit((delta, self.watcher.findings()))
+            self.signals.finished.emit(None)
+        except Exception:
+            self.signals.error.emit(traceback.format_exc())
+
+
+class ScanWorker(QtCore.QRunnable):
+    """Runs a ScanStream and emits findings in batches while it scans.
+
+    ``progress`` carries ``(findings, files_done)`` chunks, flushed every
+    ``batch_size`` findings or ``interval`` seconds, whichever comes first.
+    """
+
+    def __init__(self, stream, batch_size=500, interval=0.1):
+        super().__init__()
+        self.stream = stream
+        self.batch_size = batch_size
+        self.interval = interval
+        self.signals = WorkerSignals()
+
+    def cancel(self):
+        self.stream.cancel()
+
+    @QtCore.Slot()
+    def run(self):
+        try:
+            chunk = []
+            files_done = 0
+            last_emit = time.monotonic()
+            for event in self.stream:
+                chunk.extend(event.findings)
+                files_done = event.files_done
+                now = time.monotonic()
+                if len(chunk) >= self.batch_size or now - last_emit >= self.interval:
+                    self.signals.progress.emit((chunk, files_done))
+                    chunk = []
+                    last_emit = now
+            self.signals.progress.emit((chunk, files_done))
+            self.signals.finished.emit(self.stream.result)
+        except Exception:
+            self.signals.error.emit(traceback.format_exc())
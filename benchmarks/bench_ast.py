@@ -0,0 +1,46 @@
+﻿"""Compare the AST-backed Python rules against their line regexes.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_ast --files 1000
+"""
+import argparse
+import dataclasses
+import json
+
+from benchmarks.bench_rules import _best_of, scan_ruleset
+from benchmarks.corpus import build_corpus
+from core.rules import get_python_rules
+from core.rules.ruleset import RuleSet
+
+
+def run(files=1000, lines_per_file=200, vuln_ratio=0.01, repeat=3):
+    rules = get_python_rules()
+    regex_rules = [dataclasses.replace(rule, ast_check=None) for rule in rules]
+    # Every file of the dense corpus holds a literal, so each one is parsed.
+    results = {}
+    for name, ratio in (("typical", vuln_ratio), ("dense", 0.2), ("clean", 0.0)):
+        corpus = build_corpus(files, lines_per_file, ratio, js_ratio=0.0)
+        regex_time, regex_count = _best_of(lambda: scan_ruleset(RuleSet(regex_rules), corpus), repeat)
+        ast_time, ast_count = _best_of(lambda: scan_ruleset(RuleSet(rules), corpus), repeat)
+        results[name] = {
+            "vuln_ratio": ratio,
+            "findings": {"regex": regex_count, "ast": ast_count},
+            "files_per_sec": {"regex": round(files / regex_time, 1), "ast": round(files / ast_time, 1)},
+            "ast_cost_factor": round(ast_time / regex_time, 2),
+        }
+    return {"files": files, "lines_per_file": lines_per_file, "corpora": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=1000)
+    parser.add_argument("--lines", type=int, default=200)
+    parser.add_argument("--vuln-ratio", type=float, default=0.01)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    print(json.dumps(run(args.files, args.lines, args.vuln_ratio, args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
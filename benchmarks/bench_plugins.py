@@ -0,0 +1,104 @@
+﻿"""Time plugin loading with many plugins installed.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_plugins --plugins 40 --rules 5
+
+``eager`` imports every plugin, as building a Scanner used to; ``cold``
+builds a registry without a manifest (every plugin is imported once to be
+described); ``warm`` builds one from the manifest, which is what a new
+process pays. ``python_scan`` scans a small Python-only project with the
+warm registry and reports how many plugins that imported.
+"""
+import argparse
+import json
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from core.plugins import MANIFEST_NAME, PluginRegistry
+from core.rules.ruleset import RuleSet
+
+LANGUAGES = ("python", "javascript")
+
+PLUGIN_TEMPLATE = """from core.models import Severity
+from core.plugins import PluginSpec
+from core.rules.spec import RuleSpec, compile_rules
+
+PLUGIN = PluginSpec(
+    name={name!r},
+    rules=compile_rules([{rules}]),
+    fixers={{}},
+)
+"""
+
+RULE_TEMPLATE = """
+    RuleSpec(
+        id={rule_id!r}, title="Marker", description="Marker", severity=Severity.LOW,
+        cwe=None, owasp=None, languages={{{language!r}}}, message="marker",
+        pattern=r"{marker}\\(", finding_message="marker call",
+    ),"""
+
+
+def _write_plugins(plugins_dir: Path, plugins, rules):
+    for idx in range(plugins):
+        language = LANGUAGES[idx % len(LANGUAGES)]
+        specs = "".join(
+            RULE_TEMPLATE.format(rule_id=f"B{idx:03d}{rule:02d}", language=language, marker=f"marker_{idx}_{rule}")
+            for rule in range(rules)
+        )
+        plugin_dir = plugins_dir / f"plugin_{idx:03d}"
+        plugin_dir.mkdir(parents=True)
+        (plugin_dir / "plugin.py").write_text(PLUGIN_TEMPLATE.format(name=plugin_dir.name, rules=specs), encoding="utf-8")
+
+
+def _time(fn, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return round(statistics.median(samples) * 1000, 2)
+
+
+def run(plugins=40, rules=5, runs=5):
+    with tempfile.TemporaryDirectory() as tmp:
+        plugins_dir = Path(tmp) / "plugins"
+        _write_plugins(plugins_dir, plugins, rules)
+        manifest = plugins_dir / MANIFEST_NAME
+
+        def cold():
+            manifest.unlink(missing_ok=True)
+            PluginRegistry(plugins_dir)
+
+        eager_ms = _time(lambda: PluginRegistry(plugins_dir).load_all(), runs)
+        cold_ms = _time(cold, runs)
+        PluginRegistry(plugins_dir)
+        warm_ms = _time(lambda: PluginRegistry(plugins_dir), runs)
+
+        registry = PluginRegistry(plugins_dir)
+        ruleset = RuleSet(registry.rules())
+        start = time.perf_counter()
+        for idx in range(50):
+            ruleset.scan(f"mod_{idx}.py", f"import os\nmarker_0_0(x)\nvalue = {idx}\n", "python")
+        scan_ms = round((time.perf_counter() - start) * 1000, 2)
+        return {
+            "plugins": plugins,
+            "rules_per_plugin": rules,
+            "milliseconds": {"eager": eager_ms, "cold": cold_ms, "warm": warm_ms},
+            "python_scan": {"milliseconds": scan_ms, "plugins_imported": len(registry.loaded())},
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--plugins", type=int, default=40)
+    parser.add_argument("--rules", type=int, default=5)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    print(json.dumps(run(args.plugins, args.rules, args.runs), indent=2))
+
+
+if __name__ == "__main__":
+    main()
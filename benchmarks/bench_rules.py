@@ -0,0 +1,73 @@
+﻿"""Compare per-rule scanning against the combined RuleSet pass.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_rules --files 2000
+"""
+import argparse
+import json
+import time
+
+from benchmarks.corpus import build_corpus
+from core.rules import get_builtin_rules
+from core.rules.ruleset import RuleSet
+
+
+def scan_per_rule(rules, corpus):
+    count = 0
+    for file_path, text, language in corpus:
+        for rule in rules:
+            if language in rule.languages:
+                count += len(rule.scan(file_path, text))
+    return count
+
+
+def scan_ruleset(ruleset, corpus):
+    count = 0
+    for file_path, text, language in corpus:
+        count += len(ruleset.scan(file_path, text, language))
+    return count
+
+
+def _best_of(fn, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def run(files=1000, lines_per_file=200, vuln_ratio=0.01, repeat=3):
+    corpus = build_corpus(files, lines_per_file, vuln_ratio)
+    rules = get_builtin_rules()
+    ruleset = RuleSet(rules)
+    per_rule_time, per_rule_count = _best_of(lambda: scan_per_rule(rules, corpus), repeat)
+    ruleset_time, ruleset_count = _best_of(lambda: scan_ruleset(ruleset, corpus), repeat)
+    return {
+        "files": files,
+        "lines_per_file": lines_per_file,
+        "vuln_ratio": vuln_ratio,
+        "findings": {"per_rule": per_rule_count, "ruleset": ruleset_count},
+        "files_per_sec": {
+            "per_rule": round(files / per_rule_time, 1),
+            "ruleset": round(files / ruleset_time, 1),
+        },
+        "speedup": round(per_rule_time / ruleset_time, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=1000)
+    parser.add_argument("--lines", type=int, default=200)
+    parser.add_argument("--vuln-ratio", type=float, default=0.01)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    print(json.dumps(run(args.files, args.lines, args.vuln_ratio, args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+﻿"""Time how long the headless CLI takes to start and scan a tiny project.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_startup --runs 20
+
+Every command runs in a fresh interpreter, as it would from a pre-commit
+hook. ``imports`` lists the slowest modules ``scan`` loads, from
+``python -X importtime``.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+HEAVY_MODULES = ("PySide6", "difflib", "subprocess", "sqlite3", "multiprocessing", "core.report", "core.tooling")
+
+
+def _time_command(args, runs):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [str(ROOT), os.environ.get("PYTHONPATH")])))
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *args], cwd=ROOT, env=env, capture_output=True, check=False)
+        samples.append(time.perf_counter() - start)
+    return {"min": round(min(samples), 4), "median": round(statistics.median(samples), 4)}
+
+
+def _imports(project, top):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [str(ROOT), os.environ.get("PYTHONPATH")])))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "app.cli", "scan", project, "--fail-on", "never"],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=False,
+    )
+    modules = []
+    for line in proc.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            modules.append((parts[2].rstrip(), int(parts[1])))
+    names = {name.strip() for name, _ in modules}
+    slowest = sorted(modules, key=lambda item: item[1], reverse=True)[:top]
+    return {
+        "slowest_cumulative_us": {name.strip(): us for name, us in slowest},
+        "heavy_loaded": sorted(name for name in HEAVY_MODULES if name in names),
+    }
+
+
+def run(runs=20, top=10):
+    with tempfile.TemporaryDirectory() as tmp:
+        (Path(tmp) / "app.py").write_text("import os\nos.system('ls ' + name)\n", encoding="utf-8")
+        return {
+            "python": sys.version.split()[0],
+            "runs": runs,
+            "seconds": {
+                "interpreter": _time_command(["-c", "pass"], runs),
+                "import_engine": _time_command(["-c", "import core.engine"], runs),
+                "cli_help": _time_command(["-m", "app.cli", "--help"], runs),
+                "cli_scan": _time_command(["-m", "app.cli", "scan", tmp, "--fail-on", "never"], runs),
+            },
+            "imports": _imports(tmp, top),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+    print(json.dumps(run(args.runs, args.top), indent=2))
+
+
+if __name__ == "__main__":
+    main()
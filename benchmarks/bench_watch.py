@@ -0,0 +1,87 @@
+﻿"""Measure save-to-delta latency of watch mode.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_watch --files 2000 --saves 20
+
+Each save happens at a random moment of the poll period. ``resave``
+saves the same file again and again, as an editor does; ``first_save``
+saves a different file each time. Without watchdog only ``resave`` is
+expected to stay under 100 ms; ``first_save`` waits for the next walk
+of the tree.
+"""
+import argparse
+import json
+import queue
+import random
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from benchmarks.corpus import generate_corpus
+from core.config import ScanOptions
+from core.engine import ScanEngine
+from core.watch import POLL_INTERVAL
+
+
+def _median_max(latencies):
+    return {
+        "median": round(statistics.median(latencies) * 1000, 1),
+        "max": round(max(latencies) * 1000, 1),
+    }
+
+
+def run(files=2000, saves=20, poll_interval=POLL_INTERVAL, use_watchdog=None, seed=1234):
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        generate_corpus(tmp, files=files)
+        target = Path(tmp) / "watched.py"
+        target.write_text("x = 1\n", encoding="utf-8")
+        others = sorted(Path(tmp).rglob("*.py"))[:saves]
+        watcher = ScanEngine().watch(tmp, ScanOptions(), poll_interval=poll_interval, use_watchdog=use_watchdog)
+        start = time.perf_counter()
+        watcher.start()
+        initial = time.perf_counter() - start
+        deltas = queue.Queue()
+        thread = threading.Thread(target=lambda: [deltas.put(d) for d in watcher.deltas()], daemon=True)
+        thread.start()
+        latencies = {"resave": [], "first_save": []}
+
+        def save(path, body, kind):
+            time.sleep(rng.uniform(0, poll_interval))
+            saved = time.perf_counter()
+            path.write_text(body, encoding="utf-8")
+            deltas.get(timeout=10)
+            latencies[kind].append(time.perf_counter() - saved)
+
+        try:
+            for index in range(saves):
+                body = "requests.get(url, verify=False)\n" if index % 2 == 0 else "x = 1\n"
+                save(target, body, "resave")
+            for path in others:
+                save(path, path.read_text(encoding="utf-8") + "x = 1\n", "first_save")
+        finally:
+            watcher.stop()
+            thread.join()
+    return {
+        "files": files,
+        "backend": "watchdog" if watcher.use_watchdog else "polling",
+        "poll_interval": poll_interval,
+        "initial_scan_seconds": round(initial, 4),
+        "latency_ms": {kind: _median_max(values) for kind, values in latencies.items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--saves", type=int, default=20)
+    parser.add_argument("--poll-interval", type=float, default=POLL_INTERVAL)
+    args = parser.parse_args()
+    print(json.dumps(run(args.files, args.saves, args.poll_interval), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+﻿"""Deterministic synthetic corpus for scanner benchmarks."""
+import random
+from pathlib import Path
+
+PY_CLEAN = [
+    "def handler(request):",
+    "    value = request.args.get('q', '')",
+    "    items = [x for x in range(10) if x % 2]",
+    "    return {'value': value, 'items': items}",
+    "",
+    "class Service:",
+    "    def __init__(self, client):",
+    "        self.client = client",
+]
+PY_VULN = [
+    "    subprocess.run([\"ls\", path], shell=True)",
+    "    os.system(\"rm \" + path)",
+    "    token = random.choice(alphabet)",
+    "    cfg = yaml.load(text)",
+    "    cursor.execute(\"SELECT * FROM t WHERE id = \" + ident)",
+    "    requests.get(url, verify=False)",
+    "    obj = pickle.loads(blob)",
+]
+JS_CLEAN = [
+    "function render(items) {",
+    "  const list = items.map((item) => item.name);",
+    "  return list.join(', ');",
+    "}",
+    "",
+    "export const config = { retries: 3, timeout: 1000 };",
+]
+JS_VULN = [
+    "  el.innerHTML = \"loading\";",
+    "  el.innerHTML = userInput;",
+    "  eval(payload);",
+    "  const id = Math.random().toString(36);",
+    "  db.query(\"SELECT * FROM users WHERE id = \" + id);",
+    "  document.write(banner);",
+]
+MINIFIED_CHUNK = "function a(b){return b.map(function(c){return c+1})};var d=a([1,2,3]);"
+
+
+def _lines(rng, clean, vuln, count, vuln_ratio):
+    return [rng.choice(vuln) if rng.random() < vuln_ratio else rng.choice(clean) for _ in range(count)]
+
+
+def build_corpus(files, lines_per_file=200, vuln_ratio=0.01, js_ratio=0.5, seed=1234):
+    """Returns ``[(rel_path, text, language)]`` without touching the disk."""
+    rng = random.Random(seed)
+    corpus = []
+    for idx in range(files):
+        if rng.random() < js_ratio:
+            text = "\n".join(_lines(rng, JS_CLEAN, JS_VULN, lines_per_file, vuln_ratio))
+            corpus.append((f"web/pkg_{idx % 50}/file_{idx}.js", text, "javascript"))
+        else:
+            text = "\n".join(_lines(rng, PY_CLEAN, PY_VULN, lines_per_file, vuln_ratio))
+            corpus.append((f"src/pkg_{idx % 50}/file_{idx}.py", text, "python"))
+    return corpus
+
+
+def generate_corpus(
+    root, files=500, lines_per_file=200, vuln_ratio=0.01, js_ratio=0.5,
+    large_files=0, large_file_bytes=2_000_000, minified_vuln=True, seed=1234,
+):
+    """Writes a corpus under ``root`` and returns a manifest describing it.
+
+    ``large_files`` adds single-line minified bundles of about
+    ``large_file_bytes`` each; with ``minified_vuln`` every other bundle ends
+    with a vulnerable statement.
+    """
+    root = Path(root)
+    total_bytes = 0
+    corpus = build_corpus(files, lines_per_file, vuln_ratio, js_ratio, seed)
+    for rel_path, text, _ in corpus:
+        path = root / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text + "\n", encoding="utf-8")
+        total_bytes += len(text) + 1
+    for idx in range(large_files):
+        body = MINIFIED_CHUNK * (large_file_bytes // len(MINIFIED_CHUNK))
+        if minified_vuln and idx % 2 == 0:
+            body += "eval(window.name);"
+        path = root / "dist_bundles" / f"bundle_{idx}.min.js"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(body, encoding="utf-8")
+        total_bytes += len(body)
+    return {
+        "files": files,
+        "large_files": large_files,
+        "lines_per_file": lines_per_file,
+        "vuln_ratio": vuln_ratio,
+        "js_ratio": js_ratio,
+        "seed": seed,
+        "bytes": total_bytes,
+    }
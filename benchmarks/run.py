@@ -0,0 +1,128 @@
+﻿"""Scanner benchmark suite.
+
+Generates a synthetic corpus and times the main pipeline stages, printing
+the results as JSON so they can be compared release to release:
+
+    python -m benchmarks.run --files 2000 --large-files 2 --output bench.json
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.corpus import generate_corpus
+from core.config import ScanOptions
+from core.engine import ScanEngine
+from core.languages import detect_language
+from core.utils import read_text_file, relative_path, walk_files
+
+
+def _timed(fn, repeat=1):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return round(best, 4), result
+
+
+def _revision():
+    try:
+        proc = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5,
+            cwd=Path(__file__).resolve().parent,
+        )
+        return proc.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def _load_texts(root):
+    texts = []
+    for entry in walk_files(root):
+        path = Path(entry.path)
+        language = detect_language(path)
+        if language != "other":
+            texts.append((relative_path(path, root), read_text_file(path), language))
+    return texts
+
+
+def run_suite(files=500, lines_per_file=200, vuln_ratio=0.01, js_ratio=0.5,
+              large_files=0, large_file_bytes=2_000_000, repeat=3, parallel=False, profile=False):
+    with tempfile.TemporaryDirectory(prefix="securepatch-bench-") as tmp:
+        root = Path(tmp)
+        corpus = generate_corpus(
+            root, files=files, lines_per_file=lines_per_file, vuln_ratio=vuln_ratio,
+            js_ratio=js_ratio, large_files=large_files, large_file_bytes=large_file_bytes,
+        )
+        options = ScanOptions(
+            use_external_tools=False, no_touch_business_logic=False, parallel=parallel, profile=profile,
+        )
+        engine = ScanEngine()
+        timings = {}
+
+        timings["scan"], result = _timed(lambda: engine.scan_project(str(root), options), repeat)
+        texts = _load_texts(root)
+        rules = {}
+        for rule in engine.scanner.rules:
+            rule_texts = [(p, t) for p, t, lang in texts if lang in rule.languages]
+            seconds, found = _timed(lambda: sum(len(rule.scan(p, t)) for p, t in rule_texts), repeat)
+            rules[rule.id] = {"seconds": seconds, "findings": found}
+        timings["rules"] = rules
+        timings["generate_patch"], plan = _timed(lambda: engine.generate_patch(result, options), repeat)
+        timings["write_reports"], _ = _timed(lambda: engine.export_report(str(root), result, plan, None), repeat)
+        timings["apply_patch"], applied = _timed(lambda: engine.apply_patch(plan, True))
+
+        scanned = sum(result.language_stats.values())
+        report = {
+            "revision": _revision(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "corpus": corpus,
+            "results": {
+                "findings": len(result.findings),
+                "files_scanned": scanned,
+                "files_changed": len(plan.file_changes),
+                "files_applied": len(applied.applied_files),
+            },
+            "files_per_sec": round(scanned / timings["scan"], 1) if timings["scan"] else None,
+            "timings": timings,
+        }
+        if result.profile is not None:
+            report["profile"] = result.profile.to_dict()
+        return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=500)
+    parser.add_argument("--lines", type=int, default=200)
+    parser.add_argument("--vuln-ratio", type=float, default=0.01)
+    parser.add_argument("--js-ratio", type=float, default=0.5)
+    parser.add_argument("--large-files", type=int, default=0)
+    parser.add_argument("--large-file-bytes", type=int, default=2_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--parallel", action="store_true")
+    parser.add_argument("--profile", action="store_true", help="include the scan's phase and rule profile")
+    parser.add_argument("--output", help="write the JSON results to this file instead of stdout")
+    args = parser.parse_args(argv)
+    report = run_suite(
+        files=args.files, lines_per_file=args.lines, vuln_ratio=args.vuln_ratio, js_ratio=args.js_ratio,
+        large_files=args.large_files, large_file_bytes=args.large_file_bytes, repeat=args.repeat,
+        parallel=args.parallel, profile=args.profile,
+    )
+    data = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(data + "\n", encoding="utf-8")
+    else:
+        print(data)
+
+
+if __name__ == "__main__":
+    main()
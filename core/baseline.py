@@ -0,0 +1,94 @@
+﻿import hashlib
+import json
+import os
+import re
+from pathlib import Path
+
+BASELINE_FILE_NAME = ".securepatch-baseline.json"
+BASELINE_VERSION = 1
+INLINE_MARKER = "securepatch:"
+
+_INLINE = re.compile(r"(?:#|//|/\*)\s*securepatch:\s*ignore\b(?:\[([^\]]*)\])?")
+
+
+def fingerprint(finding) -> str:
+    """Identifies a finding independently of its line number.
+
+    Made of the rule id, the ``/``-separated path and a hash of the snippet
+    with its whitespace collapsed, so it survives lines being added above
+    the finding or re-indented. Identical lines of one file share it.
+    """
+    snippet = " ".join(finding.snippet.split())
+    digest = hashlib.sha256(snippet.encode("utf-8")).hexdigest()[:16]
+    return f"{finding.rule_id}:{finding.file_path.replace(os.sep, '/')}:{digest}"
+
+
+def inline_suppressions(text: str):
+    """Maps line numbers to the rule ids a ``securepatch: ignore[...]`` comment
+    on that line suppresses, or to None for a bare ``securepatch: ignore``."""
+    if INLINE_MARKER not in text:
+        return {}
+    found = {}
+    for line_no, line in enumerate(text.splitlines(), 1):
+        if INLINE_MARKER not in line:
+            continue
+        match = _INLINE.search(line)
+        if match:
+            ids = match.group(1)
+            found[line_no] = None if ids is None else {rule_id.strip() for rule_id in ids.split(",") if rule_id.strip()}
+    return found
+
+
+def drop_inline_suppressed(findings, text: str):
+    """``findings`` of one file without those its inline comments suppress."""
+    suppressed = inline_suppressions(text) if findings else None
+    if not suppressed:
+        return findings
+    kept = []
+    for finding in findings:
+        if finding.line in suppressed:
+            ids = suppressed[finding.line]
+            if ids is None or finding.rule_id in ids:
+                continue
+        kept.append(finding)
+    return kept
+
+
+def baseline_path(project_root: Path, path=None) -> Path:
+    return Path(path) if path else Path(project_root) / BASELINE_FILE_NAME
+
+
+def load_baseline(path: Path) -> frozenset:
+    """Fingerprints of the accepted findings in a baseline file; empty if there is none."""
+    try:
+        with open(path, "r", encoding="utf-8") as handle:
+            data = json.load(handle)
+    except FileNotFoundError:
+        return frozenset()
+    if data.get("version") != BASELINE_VERSION:
+        raise ValueError(f"{path}: unsupported baseline version {data.get('version')!r}")
+    return frozenset(entry["fingerprint"] for entry in data.get("findings", ()))
+
+
+def write_baseline(path: Path, findings) -> int:
+    """Records ``findings`` as accepted and returns how many entries were written.
+
+    Entries keep the rule, path and snippet next to each fingerprint so the
+    file can be reviewed; they are sorted to keep diffs of it small.
+    """
+    entries = {}
+    for finding in findings:
+        key = fingerprint(finding)
+        if key not in entries:
+            entries[key] = {
+                "fingerprint": key,
+                "rule_id": finding.rule_id,
+                "file_path": finding.file_path.replace(os.sep, "/"),
+                "snippet": finding.snippet,
+            }
+    data = {"version": BASELINE_VERSION, "findings": [entries[key] for key in sorted(entries)]}
+    path = Path(path)
+    temp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    temp.write_text(json.dumps(data, indent=1) + "\n", encoding="utf-8")
+    os.replace(temp, path)
+    return len(entries)
@@ -0,0 +1,171 @@
+﻿import hashlib
+import json
+import sqlite3
+from dataclasses import fields
+from pathlib import Path
+from types import CodeType
+from typing import List
+
+from core.models import Finding, Severity
+
+CACHE_VERSION = "3"
+CACHE_DIR_NAME = ".securepatch"
+CACHE_FILE_NAME = "scan-cache.sqlite"
+
+_FINDING_FIELDS = [f.name for f in fields(Finding)]
+_SEVERITY_INDEX = _FINDING_FIELDS.index("severity")
+
+
+def _const_parts(value):
+    # Nested code objects (lambdas, comprehensions) repr with their memory
+    # address, and set order depends on the hash seed, so both are spelled
+    # out in a form that is the same in every process.
+    if isinstance(value, CodeType):
+        return _code_parts(value)
+    if isinstance(value, tuple):
+        return [_const_parts(item) for item in value]
+    if isinstance(value, frozenset):
+        return sorted(repr(item) for item in value)
+    return repr(value)
+
+
+def _code_parts(code):
+    return [code.co_code.hex(), list(code.co_names), [_const_parts(value) for value in code.co_consts]]
+
+
+def _function_parts(fn):
+    parts = [getattr(fn, "__module__", None), getattr(fn, "__qualname__", None)]
+    code = getattr(fn, "__code__", None)
+    if code is not None:
+        parts.append(_code_parts(code))
+    return parts
+
+
+def ruleset_fingerprint(rules) -> str:
+    """Hashes everything about ``rules`` that can change what they report."""
+    digest = hashlib.sha256(CACHE_VERSION.encode("utf-8"))
+    for rule in rules:
+        parts = [
+            rule.id, rule.title, rule.description, rule.severity.value, rule.cwe, rule.owasp,
+            sorted(rule.languages), rule.message, rule.fixer_id, list(rule.literals or ()),
+        ]
+        # Plugin rules not imported yet are identified by their plugin
+        # file's size and mtime rather than by importing them to hash code.
+        stamp = getattr(rule, "source_stamp", None)
+        if stamp is not None:
+            parts.append(list(stamp))
+            digest.update(json.dumps(parts, default=str).encode("utf-8"))
+            continue
+        if rule.line_pattern:
+            guard = rule.line_pattern.guard
+            parts.extend([
+                rule.line_pattern.regex.pattern, rule.line_pattern.regex.flags, rule.line_pattern.message,
+                guard.pattern if guard else None, guard.flags if guard else None, rule.line_pattern.code_only,
+            ])
+        if rule.ast_check:
+            guard = rule.ast_check.guard
+            parts.extend([
+                [node_type.__name__ for node_type in rule.ast_check.node_types], list(rule.ast_check.literals),
+                guard.pattern if guard else None, guard.flags if guard else None,
+            ])
+            parts.extend(_function_parts(rule.ast_check.check))
+        parts.extend(_function_parts(rule.scan))
+        wrapped = getattr(rule.scan, "__wrapped__", None)
+        if wrapped is not None:
+            parts.extend(_function_parts(wrapped))
+        digest.update(json.dumps(parts, default=str).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _encode_findings(findings) -> str:
+    rows = [[getattr(f, name) for name in _FINDING_FIELDS] for f in findings]
+    return json.dumps(rows, separators=(",", ":"))
+
+
+def _decode_findings(data: str):
+    findings = []
+    for row in json.loads(data):
+        row[_SEVERITY_INDEX] = Severity(row[_SEVERITY_INDEX])
+        findings.append(Finding(*row))
+    return findings
+
+
+class ScanCache:
+    """Per-file scan results stored in SQLite under the project.
+
+    Entries are keyed by relative path and validated by size and mtime; when
+    those changed the hash of the raw content decides whether the stored findings are
+    still valid. A different ruleset fingerprint drops every entry.
+    """
+
+    def __init__(self, db_path: Path, fingerprint: str):
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.db_path = db_path
+        self._conn = sqlite3.connect(str(db_path))
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            "path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, hash TEXT, "
+            "language TEXT, findings TEXT, error TEXT)"
+        )
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'fingerprint'").fetchone()
+        if not row or row[0] != fingerprint:
+            self._conn.execute("DELETE FROM files")
+            self._conn.execute("INSERT OR REPLACE INTO meta VALUES ('fingerprint', ?)", (fingerprint,))
+            self._conn.commit()
+        self._entries = {
+            path: (size, mtime_ns, digest)
+            for path, size, mtime_ns, digest in self._conn.execute(
+                "SELECT path, size, mtime_ns, hash FROM files"
+            )
+        }
+        self._pending: List[tuple] = []
+        self._touched: List[tuple] = []
+
+    def lookup(self, rel_path: str, size: int, mtime_ns: int):
+        """Returns ``(language, findings, error)`` if the file is unchanged, else None."""
+        entry = self._entries.get(rel_path)
+        if not entry or entry[0] != size or entry[1] != mtime_ns:
+            return None
+        return self._load(rel_path)
+
+    def known_hash(self, rel_path: str):
+        entry = self._entries.get(rel_path)
+        return entry[2] if entry else None
+
+    def _load(self, rel_path: str):
+        language, findings, error = self._conn.execute(
+            "SELECT language, findings, error FROM files WHERE path = ?", (rel_path,)
+        ).fetchone()
+        return language, _decode_findings(findings), error
+
+    def revalidate(self, rel_path: str, size: int, mtime_ns: int):
+        """Marks an entry whose content hash still matches as fresh and returns it."""
+        digest = self._entries[rel_path][2]
+        self._entries[rel_path] = (size, mtime_ns, digest)
+        self._touched.append((size, mtime_ns, rel_path))
+        return self._load(rel_path)
+
+    def store(self, rel_path, size, mtime_ns, digest, language, findings, error):
+        self._entries[rel_path] = (size, mtime_ns, digest)
+        self._pending.append((rel_path, size, mtime_ns, digest, language, _encode_findings(findings), error))
+
+    def prune(self, seen_paths):
+        stale = [(path,) for path in self._entries if path not in seen_paths]
+        for (path,) in stale:
+            del self._entries[path]
+        self._conn.executemany("DELETE FROM files WHERE path = ?", stale)
+
+    def close(self):
+        with self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?)", self._pending)
+            self._conn.executemany("UPDATE files SET size = ?, mtime_ns = ? WHERE path = ?", self._touched)
+        self._conn.close()
+        self._pending = []
+        self._touched = []
+
+
+def open_cache(project_root: Path, rules, cache_path=None) -> ScanCache:
+    db_path = Path(cache_path) if cache_path else project_root / CACHE_DIR_NAME / CACHE_FILE_NAME
+    return ScanCache(db_path, ruleset_fingerprint(rules))
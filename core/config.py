@@ -1,4 +1,5 @@
 ﻿from dataclasses import dataclass
+from typing import Optional
 
 DEFAULT_EXCLUDES = {
     ".git",
@@ -13,9 +14,12 @@ DEFAULT_EXCLUDES = {
     ".pytest_cache",
     ".mypy_cache",
     "reports",
+    ".securepatch",
 }
 
-MAX_FILE_SIZE_BYTES = 5_000_000
+MAX_FILE_SIZE_BYTES = 32_000_000
+MMAP_THRESHOLD_BYTES = 1_000_000
+BINARY_SNIFF_BYTES = 8192
 
 PY_EXTENSIONS = {".py"}
 JS_EXTENSIONS = {".js", ".jsx", ".ts", ".tsx"}
@@ -28,3 +32,21 @@ class ScanOptions:
     no_auto_fix: bool = False
     no_touch_business_logic: bool = True
     use_external_tools: bool = True
+    tool_timeout: float = 60
+    parallel: bool = False
+    parallel_walk: bool = False
+    use_ignore_files: bool = True
+    workers: int = 0
+    batch_size: int = 200
+    use_cache: bool = False
+    cache_path: Optional[str] = None
+    profile: bool = False
+    profile_top_n: int = 10
+    cprofile_path: Optional[str] = None
+    # Scan only the files changed since this git ref (see core.gitdiff) and,
+    # with changed_lines_only, report only findings on changed lines.
+    git_base: Optional[str] = None
+    changed_lines_only: bool = False
+    # Hide the findings recorded in the project's baseline (see core.baseline).
+    use_baseline: bool = True
+    baseline_path: Optional[str] = None
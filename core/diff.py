@@ -1,10 +1,67 @@
-﻿import difflib
-from pathlib import Path
+﻿import os
+
+DIFF_CONTEXT = 3
+
+
+def _format_range(start: int, stop: int) -> str:
+    # Same range notation as difflib.unified_diff.
+    beginning = start + 1
+    length = stop - start
+    if length == 1:
+        return str(beginning)
+    if not length:
+        beginning -= 1
+    return f"{beginning},{length}"
+
+
+def _replacement_diff(original_lines, updated_lines, file_path: str, context: int) -> str:
+    changed = [i for i, (old, new) in enumerate(zip(original_lines, updated_lines)) if old != new]
+    if not changed:
+        return ""
+    # Runs of changed lines less than 2 * context apart share a hunk.
+    groups = []
+    first = last = changed[0]
+    for index in changed[1:]:
+        if index - last - 1 > 2 * context:
+            groups.append((first, last))
+            first = index
+        last = index
+    groups.append((first, last))
+
+    out = [f"--- a/{file_path}", f"+++ b/{file_path}"]
+    total = len(original_lines)
+    for first, last in groups:
+        start = max(0, first - context)
+        stop = min(total, last + 1 + context)
+        span = _format_range(start, stop)
+        out.append(f"@@ -{span} +{span} @@")
+        index = start
+        while index < stop:
+            if original_lines[index] == updated_lines[index]:
+                out.append(" " + original_lines[index])
+                index += 1
+                continue
+            end = index
+            while end < stop and original_lines[end] != updated_lines[end]:
+                end += 1
+            out.extend("-" + line for line in original_lines[index:end])
+            out.extend("+" + line for line in updated_lines[index:end])
+            index = end
+    return "\n".join(out)
 
 
 def unified_diff(original_text: str, updated_text: str, file_path: str) -> str:
+    """Unified diff of two versions of ``file_path``.
+
+    When both versions have the same number of lines, as with fixers that
+    rewrite lines in place, lines are compared pairwise and the hunks are
+    built directly instead of running difflib's sequence matcher.
+    """
     original_lines = original_text.splitlines()
     updated_lines = updated_text.splitlines()
+    if len(original_lines) == len(updated_lines):
+        return _replacement_diff(original_lines, updated_lines, file_path, DIFF_CONTEXT)
+    import difflib
     diff_lines = difflib.unified_diff(
         original_lines,
         updated_lines,
@@ -13,3 +70,29 @@ def unified_diff(original_text: str, updated_text: str, file_path: str) -> str:
         lineterm="",
     )
     return "\n".join(diff_lines)
+
+
+def _diff_batch(batch):
+    return [unified_diff(original, updated, file_path) for original, updated, file_path in batch]
+
+
+def compute_diffs(file_changes, workers=0, batch_size=200):
+    """Fills in the diff of every FileChange that does not have one yet.
+
+    Changes are split in batches of ``batch_size`` diffed in a process pool
+    of ``workers`` processes (all CPUs when 0); with a single batch they are
+    diffed in place.
+    """
+    pending = [change for change in file_changes if change._diff is None]
+    batches = [pending[start:start + batch_size] for start in range(0, len(pending), batch_size)]
+    if len(batches) <= 1:
+        for change in pending:
+            change._diff = unified_diff(change.original_text, change.updated_text, change.file_path)
+        return
+    workers = min(workers or os.cpu_count() or 1, len(batches))
+    from concurrent.futures import ProcessPoolExecutor
+    payloads = [[(c.original_text, c.updated_text, c.file_path) for c in batch] for batch in batches]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for batch, diffs in zip(batches, executor.map(_diff_batch, payloads)):
+            for change, diff in zip(batch, diffs):
+                change._diff = diff
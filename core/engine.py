@@ -1,34 +1,61 @@
 ﻿from pathlib import Path
+from typing import Optional
 from core.scanner import Scanner
 from core.fixers import get_all_fixers
-from core.diff import unified_diff
+from core.fixers.base import apply_line_fixers
 from core.utils import hash_text, read_text_file
-from core.models import PatchPlan, PatchResult, FileChange
-from core.report import write_reports
+from core.models import PatchPlan, FileChange
+
+# Diff pools, the apply machinery and the report writers are imported by the
+# methods that need them, keeping ``import core.engine`` cheap for the CLI.
 
 
 class ScanEngine:
-    def __init__(self):
+    def __init__(self) -> None:
         self.scanner = Scanner()
         self.fixers = get_all_fixers()
-        self.project_root = None
+        self.project_root: Optional[Path] = None
 
     def scan_project(self, project_path: str, options):
         self.project_root = Path(project_path).resolve()
         return self.scanner.scan(project_path, options)
 
+    def iter_scan(self, project_path: str, options):
+        self.project_root = Path(project_path).resolve()
+        return self.scanner.iter_scan(project_path, options)
+
+    def watch(self, project_path: str, options, **kwargs):
+        """Returns a ProjectWatcher over the loaded scanner; see ``core.watch``."""
+        from core.watch import ProjectWatcher
+        self.project_root = Path(project_path).resolve()
+        return ProjectWatcher(self.scanner, project_path, options, **kwargs)
+
+    def write_baseline(self, project_path: str, scan_result, path=None):
+        """Accepts every finding of ``scan_result``; returns the baseline path and entry count."""
+        from core.baseline import baseline_path, write_baseline
+        target = baseline_path(Path(project_path).resolve(), path)
+        return target, write_baseline(target, scan_result.findings)
+
     def _resolve_path(self, rel_path: str) -> Path:
         if self.project_root:
             return (self.project_root / rel_path).resolve()
         return Path(rel_path).resolve()
 
     def generate_patch(self, scan_result, options):
+        """Builds a PatchPlan fixing the fixable findings of ``scan_result``.
+
+        Findings are grouped by file; each file is read and split once, and
+        line-based fixers only rewrite the lines their findings point at, in
+        a single pass. Fixers that work on the whole text run once per file.
+        Diffs are computed when first read from a FileChange, or up front in
+        a process pool when ``options.parallel`` is set and many files changed.
+        """
         if options.no_auto_fix:
-            return PatchPlan([], "", ["Auto-fix disabled"])
+            return PatchPlan([], ["Auto-fix disabled"])
 
         file_changes = []
         skipped = []
-        file_cache = {}
+        by_file = {}
 
         for finding in scan_result.findings:
             if not finding.fixable or not finding.fixer_id:
@@ -40,75 +67,82 @@ class ScanEngine:
             if options.no_touch_business_logic and fixer.touches_logic:
                 skipped.append(f"Skipped {finding.rule_id} due to no-touch-business-logic")
                 continue
+            by_file.setdefault(finding.file_path, []).append((finding.line, finding.rule_id, fixer))
 
-            rel_path = finding.file_path
-            full_path = self._resolve_path(rel_path)
-            if rel_path not in file_cache:
-                try:
-                    original_text = read_text_file(full_path)
-                except Exception as exc:
-                    skipped.append(f"{finding.file_path}: {exc}")
-                    continue
-                file_cache[rel_path] = {
-                    "original": original_text,
-                    "current": original_text,
-                    "explanations": [],
-                    "rules": [],
-                }
-
-            current_text = file_cache[rel_path]["current"]
-            result = fixer.apply(rel_path, current_text)
-            if not result:
-                skipped.append(f"Fixer {finding.fixer_id} skipped for {finding.file_path}")
+        for rel_path, targets in by_file.items():
+            try:
+                original_text = read_text_file(self._resolve_path(rel_path))
+            except Exception as exc:
+                skipped.append(f"{rel_path}: {exc}")
                 continue
-            file_cache[rel_path]["current"] = result.updated_text
-            file_cache[rel_path]["explanations"].extend(result.explanations)
-            file_cache[rel_path]["rules"].append(finding.rule_id)
-
-        diff_chunks = []
-        for rel_path, data in file_cache.items():
-            if data["current"] == data["original"]:
+            updated_text, explanations, rules = self._fix_file(rel_path, original_text, targets, skipped)
+            if updated_text == original_text:
                 continue
-            diff_chunks.append(unified_diff(data["original"], data["current"], rel_path))
             file_changes.append(FileChange(
                 file_path=rel_path,
-                original_text=data["original"],
-                updated_text=data["current"],
-                original_hash=hash_text(data["original"]),
-                line_explanations=data["explanations"],
-                applied_rules=data["rules"],
+                original_text=original_text,
+                updated_text=updated_text,
+                original_hash=hash_text(original_text),
+                line_explanations=explanations,
+                applied_rules=rules,
             ))
 
-        return PatchPlan(file_changes=file_changes, diff="\n".join(diff_chunks), skipped=skipped)
-
-    def apply_patch(self, patch_plan, create_backup: bool):
-        applied = []
-        backups = []
-        errors = []
-        backup_root = (self.project_root or Path(".")).resolve() / ".backup"
-
-        for change in patch_plan.file_changes:
-            full_path = self._resolve_path(change.file_path)
-            try:
-                current_text = read_text_file(full_path)
-            except Exception as exc:
-                errors.append(f"{change.file_path}: {exc}")
+        if options.parallel and len(file_changes) > options.batch_size:
+            from core.diff import compute_diffs
+            compute_diffs(file_changes, workers=options.workers, batch_size=options.batch_size)
+        return PatchPlan(file_changes=file_changes, skipped=skipped)
+
+    @staticmethod
+    def _fix_file(rel_path, text, targets, skipped):
+        """Applies the ``(line, rule_id, fixer)`` targets of one file."""
+        by_line = {}
+        whole_file = {}
+        for line_no, _, fixer in targets:
+            if not fixer.line_based:
+                whole_file.setdefault(fixer.fixer_id, fixer)
                 continue
-            if hash_text(current_text) != change.original_hash:
-                errors.append(f"{change.file_path}: file changed since scan")
-                continue
-
-            if create_backup:
-                backup_root.mkdir(parents=True, exist_ok=True)
-                safe_name = change.file_path.replace("/", "_").replace("\\", "_")
-                backup_path = backup_root / (safe_name + ".bak")
-                backup_path.write_text(current_text, encoding="utf-8")
-                backups.append(str(backup_path))
-
-            full_path.write_text(change.updated_text, encoding="utf-8")
-            applied.append(change.file_path)
-
-        return PatchResult(applied_files=applied, backups=backups, errors=errors)
+            fixers = by_line.setdefault(line_no, [])
+            if fixer not in fixers:
+                fixers.append(fixer)
+        text, explanations, fixed = apply_line_fixers(text, by_line)
+
+        applied = set()
+        for fixer_id, fixer in whole_file.items():
+            result = fixer.apply(rel_path, text)
+            if result:
+                text = result.updated_text
+                explanations.extend(result.explanations)
+                applied.add(fixer_id)
+
+        rules = []
+        for line_no, rule_id, fixer in targets:
+            if (line_no, fixer.fixer_id) in fixed or fixer.fixer_id in applied:
+                rules.append(rule_id)
+            else:
+                skipped.append(f"Fixer {fixer.fixer_id} skipped for {rel_path}")
+        return text, explanations, rules
+
+    def apply_patch(self, patch_plan, create_backup: bool, transactional: bool = False, workers: int = 0):
+        """Writes a PatchPlan to disk; see ``core.transaction.apply_changes``.
+
+        Backups go to the content-addressed archive under the project's
+        ``.securepatch`` directory and can be restored with ``rollback_patch``.
+        """
+        from core.transaction import apply_changes
+        return apply_changes(
+            patch_plan.file_changes, self._resolve_path, self._archive(),
+            create_backup=create_backup, transactional=transactional, workers=workers,
+        )
+
+    def rollback_patch(self, transaction_id=None):
+        """Restores the files changed by an apply, the latest one by default."""
+        from core.transaction import rollback
+        return rollback(self._archive(), self._resolve_path, transaction_id)
+
+    def _archive(self):
+        from core.transaction import open_archive
+        return open_archive((self.project_root or Path(".")).resolve())
 
     def export_report(self, project_path: str, scan_result, patch_plan, patch_result):
+        from core.report import write_reports
         return write_reports(project_path, scan_result, patch_plan, patch_result)
@@ -11,10 +11,72 @@ class FixResult:
 
 
 class Fixer:
-    def __init__(self, fixer_id: str, description: str, touches_logic: bool = False):
+    """Rewrites the lines a rule flagged.
+
+    Line-based fixers implement ``fix_line``, returning the new content of a
+    line (without its line break) or None when it should stay as is; ``apply``
+    then handles the whole file. Fixers that need the full text override
+    ``apply`` instead.
+    """
+
+    def __init__(self, fixer_id: str, description: str, touches_logic: bool = False,
+                 rule_id: str = "", explanation: str = ""):
         self.fixer_id = fixer_id
         self.description = description
         self.touches_logic = touches_logic
+        self.rule_id = rule_id
+        self.explanation = explanation
+
+    @property
+    def line_based(self) -> bool:
+        return type(self).fix_line is not Fixer.fix_line
 
-    def apply(self, file_path: str, text: str) -> Optional[FixResult]:
+    def fix_line(self, line: str) -> Optional[str]:
         raise NotImplementedError
+
+    def explain(self, line_no: int, line: str) -> LineExplanation:
+        return LineExplanation(line=line_no, content=line.strip(), explanation=self.explanation, rule_id=self.rule_id)
+
+    def apply(self, file_path: str, text: str, lines=None) -> Optional[FixResult]:
+        """Fixes every line of ``text``, or only the 1-based ``lines`` given."""
+        targets = range(1, len(text.splitlines()) + 1) if lines is None else lines
+        updated, explanations, _ = apply_line_fixers(text, {line_no: [self] for line_no in targets})
+        if not explanations:
+            return None
+        return FixResult(updated, explanations)
+
+
+def _split_ending(raw: str):
+    body = raw.splitlines()[0] if raw else ""
+    return body, raw[len(body):]
+
+
+def apply_line_fixers(text: str, targets):
+    """Runs line-based fixers over the lines of ``text`` they target, in one pass.
+
+    ``targets`` maps 1-based line numbers to the fixers to run there, in
+    order; each sees the line as left by the previous one. The file is split
+    once and only targeted lines are touched, so line breaks (including the
+    last one) are kept. Returns ``(updated_text, explanations, fixed)`` where
+    ``fixed`` holds the ``(line_no, fixer_id)`` pairs that changed a line.
+    """
+    lines = text.splitlines(keepends=True)
+    explanations = []
+    fixed = set()
+    for line_no in sorted(targets):
+        if not 1 <= line_no <= len(lines):
+            continue
+        body, ending = _split_ending(lines[line_no - 1])
+        original = body
+        for fixer in targets[line_no]:
+            updated = fixer.fix_line(body)
+            if updated is None or updated == body:
+                continue
+            body = updated
+            fixed.add((line_no, fixer.fixer_id))
+            explanations.append(fixer.explain(line_no, body))
+        if body != original:
+            lines[line_no - 1] = body + ending
+    if not fixed:
+        return text, explanations, fixed
+    return "".join(lines), explanations, fixed
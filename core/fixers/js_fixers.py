@@ -1,35 +1,24 @@
 ﻿import re
-from core.fixers.base import Fixer, FixResult
-from core.models import LineExplanation
+from core.fixers.base import Fixer
+
+_INNER_HTML_LITERAL = re.compile(r"(\.innerHTML\s*=\s*)(['\"])([^'\"]*)(\2)")
 
 
 class InnerHtmlToTextContentFixer(Fixer):
     def __init__(self):
-        super().__init__("JS_FIX_TEXTCONTENT", "Replace innerHTML with textContent for plain text")
+        super().__init__(
+            "JS_FIX_TEXTCONTENT", "Replace innerHTML with textContent for plain text",
+            rule_id="JS003", explanation="Use textContent to avoid HTML injection",
+        )
 
-    def apply(self, file_path, text):
-        lines = text.splitlines()
-        explanations = []
-        changed = False
-        pattern = re.compile(r"(\.innerHTML\s*=\s*)(['\"])([^'\"]*)(\2)")
-        for idx, line in enumerate(lines, start=1):
-            match = pattern.search(line)
-            if not match:
-                continue
-            content = match.group(3)
-            if "<" in content or "&" in content:
-                continue
-            lines[idx - 1] = line.replace(".innerHTML", ".textContent")
-            explanations.append(LineExplanation(
-                line=idx,
-                content=lines[idx - 1].strip(),
-                explanation="Use textContent to avoid HTML injection",
-                rule_id="JS003",
-            ))
-            changed = True
-        if not changed:
+    def fix_line(self, line):
+        match = _INNER_HTML_LITERAL.search(line)
+        if not match:
+            return None
+        content = match.group(3)
+        if "<" in content or "&" in content:
             return None
-        return FixResult("\n".join(lines), explanations)
+        return line.replace(".innerHTML", ".textContent")
 
 
 def get_js_fixers():
@@ -1,76 +1,46 @@
 ﻿import re
-from core.fixers.base import Fixer, FixResult
-from core.models import LineExplanation
+from core.fixers.base import Fixer
+
+_VERIFY_FALSE = re.compile(r"verify\s*=\s*False")
 
 
 class YamlSafeLoadFixer(Fixer):
     def __init__(self):
-        super().__init__("PY_FIX_YAML_SAFE_LOAD", "Replace yaml.load with yaml.safe_load")
+        super().__init__(
+            "PY_FIX_YAML_SAFE_LOAD", "Replace yaml.load with yaml.safe_load",
+            rule_id="PY004", explanation="Use yaml.safe_load to avoid unsafe deserialization",
+        )
 
-    def apply(self, file_path, text):
-        lines = text.splitlines()
-        explanations = []
-        changed = False
-        for idx, line in enumerate(lines, start=1):
-            if "yaml.load" in line and "safe_load" not in line:
-                lines[idx - 1] = line.replace("yaml.load", "yaml.safe_load")
-                explanations.append(LineExplanation(
-                    line=idx,
-                    content=lines[idx - 1].strip(),
-                    explanation="Use yaml.safe_load to avoid unsafe deserialization",
-                    rule_id="PY004",
-                ))
-                changed = True
-        if not changed:
-            return None
-        return FixResult("\n".join(lines), explanations)
+    def fix_line(self, line):
+        if "yaml.load" in line and "safe_load" not in line:
+            return line.replace("yaml.load", "yaml.safe_load")
+        return None
 
 
 class RequestsVerifyFixer(Fixer):
     def __init__(self):
-        super().__init__("PY_FIX_VERIFY_TRUE", "Enable TLS verification")
+        super().__init__(
+            "PY_FIX_VERIFY_TRUE", "Enable TLS verification",
+            rule_id="PY007", explanation="Enable TLS verification for requests",
+        )
 
-    def apply(self, file_path, text):
-        lines = text.splitlines()
-        explanations = []
-        changed = False
-        pattern = re.compile(r"verify\s*=\s*False")
-        for idx, line in enumerate(lines, start=1):
-            if pattern.search(line):
-                lines[idx - 1] = pattern.sub("verify=True", line)
-                explanations.append(LineExplanation(
-                    line=idx,
-                    content=lines[idx - 1].strip(),
-                    explanation="Enable TLS verification for requests",
-                    rule_id="PY007",
-                ))
-                changed = True
-        if not changed:
-            return None
-        return FixResult("\n".join(lines), explanations)
+    def fix_line(self, line):
+        if _VERIFY_FALSE.search(line):
+            return _VERIFY_FALSE.sub("verify=True", line)
+        return None
 
 
 class SubprocessShellFixer(Fixer):
     def __init__(self):
-        super().__init__("PY_FIX_SHELL_FALSE", "Disable shell=True when list args are used")
-
-    def apply(self, file_path, text):
-        lines = text.splitlines()
-        explanations = []
-        changed = False
-        for idx, line in enumerate(lines, start=1):
-            if "subprocess." in line and "shell=True" in line and "[" in line:
-                lines[idx - 1] = line.replace("shell=True", "shell=False")
-                explanations.append(LineExplanation(
-                    line=idx,
-                    content=lines[idx - 1].strip(),
-                    explanation="Disable shell execution when arguments are a list",
-                    rule_id="PY001",
-                ))
-                changed = True
-        if not changed:
-            return None
-        return FixResult("\n".join(lines), explanations)
+        super().__init__(
+            "PY_FIX_SHELL_FALSE", "Disable shell=True when list args are used",
+            rule_id="PY001", explanation="Disable shell execution when arguments are a list",
+        )
+
+    def fix_line(self, line):
+        if "subprocess." in line and "shell=True" in line and "[" in line:
+            return line.replace("shell=True", "shell=False")
+        return None
 
 
 def get_python_fixers():
@@ -0,0 +1,110 @@
+﻿import bisect
+import codecs
+import os
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+_HUNK = re.compile(r"^@@ -\d+(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+
+class GitError(Exception):
+    pass
+
+
+def _git(args, cwd):
+    import subprocess
+
+    try:
+        proc = subprocess.run(
+            ["git", "-c", "core.quotePath=false", *args],
+            cwd=cwd, capture_output=True, text=True, encoding="utf-8", errors="surrogateescape",
+        )
+    except OSError as exc:
+        raise GitError(f"git not available: {exc}") from exc
+    if proc.returncode != 0:
+        raise GitError(proc.stderr.strip() or f"git {args[0]} failed")
+    return proc.stdout
+
+
+def _diff_path(raw: str) -> str:
+    if raw.startswith('"'):
+        raw = codecs.escape_decode(raw[1:-1].encode("utf-8", "surrogateescape"))[0].decode("utf-8")
+    return raw[2:] if raw.startswith("b/") else raw
+
+
+def parse_changed_lines(diff: str):
+    """Maps each file of a ``git diff -U0`` to the line ranges it added or changed.
+
+    Ranges are inclusive ``(first, last)`` line numbers of the new version,
+    in order. A file that only lost lines maps to an empty list. Hunk
+    bodies are skipped by their line counts, so content lines that look
+    like ``+++ `` headers are never taken for one.
+    """
+    changes: Dict[str, Optional[List[Tuple[int, int]]]] = {}
+    ranges = None
+    old_left = new_left = 0
+    for line in diff.split("\n"):
+        if old_left > 0 or new_left > 0:
+            tag = line[:1]
+            if tag == "-":
+                old_left -= 1
+            elif tag == "+":
+                new_left -= 1
+            elif tag == " ":
+                old_left -= 1
+                new_left -= 1
+            continue
+        if line.startswith("+++ "):
+            target = line[4:]
+            if target == "/dev/null":
+                ranges = None
+                continue
+            ranges = changes.setdefault(_diff_path(target), [])
+        elif line.startswith("@@"):
+            match = _HUNK.match(line)
+            if not match:
+                continue
+            old_left = int(match.group(1)) if match.group(1) is not None else 1
+            start = int(match.group(2))
+            new_left = int(match.group(3)) if match.group(3) is not None else 1
+            if new_left and ranges is not None:
+                ranges.append((start, start + new_left - 1))
+    return changes
+
+
+def changed_lines(project_root: Path, base_ref: str, untracked=True):
+    """Files under ``project_root`` that were added or modified since ``base_ref``.
+
+    Compares the working tree with the merge base of ``base_ref`` and HEAD,
+    as a pull request would, and returns ``{relative path: ranges}`` as
+    ``parse_changed_lines`` does, with ``/``-separated paths relative to
+    ``project_root``. Deleted files are left out. With ``untracked`` new
+    files git does not ignore are included with ``None`` for their ranges
+    (every line is new). Raises GitError when git fails or is missing.
+    """
+    cwd = os.fspath(project_root)
+    try:
+        base = _git(["merge-base", base_ref, "HEAD"], cwd).strip()
+    except GitError:
+        # No common history (or no HEAD yet): diff against the ref itself.
+        base = _git(["rev-parse", "--verify", f"{base_ref}^{{commit}}"], cwd).strip()
+    diff = _git(
+        ["diff", "--no-color", "--no-ext-diff", "--no-textconv", "--find-renames", "--diff-filter=AMR",
+         "--relative", "-U0", base, "--"],
+        cwd,
+    )
+    changes = parse_changed_lines(diff)
+    if untracked:
+        for rel_path in _git(["ls-files", "--others", "--exclude-standard", "-z"], cwd).split("\0"):
+            if rel_path:
+                changes.setdefault(rel_path, None)
+    return changes
+
+
+def in_ranges(ranges, line: int) -> bool:
+    """Tells whether ``line`` falls in one of the sorted inclusive ``ranges``."""
+    if ranges is None:
+        return True
+    idx = bisect.bisect_right(ranges, (line, float("inf"))) - 1
+    return idx >= 0 and ranges[idx][0] <= line <= ranges[idx][1]
@@ -1,6 +1,11 @@
 ﻿from dataclasses import dataclass, field
 from enum import Enum
-from typing import Optional, List
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Optional, Protocol
+
+from core.diff import unified_diff
+
+if TYPE_CHECKING:
+    from core.profiling import ScanProfile
 
 
 class Severity(str, Enum):
@@ -10,7 +15,7 @@ class Severity(str, Enum):
     CRITICAL = "critical"
 
 
-@dataclass
+@dataclass(slots=True)
 class Finding:
     id: str
     title: str
@@ -44,22 +49,70 @@ class FileChange:
     original_hash: str
     line_explanations: List[LineExplanation] = field(default_factory=list)
     applied_rules: List[str] = field(default_factory=list)
+    _diff: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def diff(self) -> str:
+        """Unified diff of the change, computed on first access."""
+        if self._diff is None:
+            self._diff = unified_diff(self.original_text, self.updated_text, self.file_path)
+        return self._diff
+
+
+class FindingList(Protocol):
+    """What ``ScanResult.findings`` holds: a list of Finding or a FindingStore."""
+
+    def __len__(self) -> int: ...
+
+    def __iter__(self) -> Iterator[Finding]: ...
+
+    def __getitem__(self, index: int) -> Finding: ...
+
+    def extend(self, findings: Iterable[Finding]) -> None: ...
 
 
 @dataclass
 class ScanResult:
-    findings: List[Finding]
+    findings: FindingList
     language_stats: dict
     tools_used: List[str]
     errors: List[str]
+    tool_timings: dict = field(default_factory=dict)
+    cancelled: bool = False
+    profile: Optional["ScanProfile"] = None
+    # Findings left out because the baseline lists them.
+    suppressed: int = 0
+    # Absolute path of the scanned directory; finding paths are relative to it.
+    project_root: Optional[str] = None
+
+
+@dataclass
+class ScanEvent:
+    findings: List[Finding]
+    errors: List[str]
+    files_done: int
+    file_path: Optional[str] = None
+
+
+@dataclass
+class FindingsDelta:
+    """Findings that appeared or went away after ``files`` were rescanned."""
+    added: List[Finding]
+    resolved: List[Finding]
+    files: List[str]
+    errors: List[str] = field(default_factory=list)
 
 
 @dataclass
 class PatchPlan:
     file_changes: List[FileChange]
-    diff: str
     skipped: List[str]
 
+    @property
+    def diff(self) -> str:
+        """The diffs of every changed file joined together; prefer per-file ``FileChange.diff``."""
+        return "\n".join(change.diff for change in self.file_changes)
+
 
 @dataclass
 class PatchResult:
@@ -75,3 +128,6 @@ class ReportPaths:
     html_path: str
     json_path: str
     changelog_path: str
+    findings_path: Optional[str] = None
+    sarif_path: Optional[str] = None
+    columns_path: Optional[str] = None
@@ -0,0 +1,86 @@
+﻿import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from core.profiling import ScanProfile
+
+_worker_ruleset = None
+_worker_scan_file = None
+
+
+def _rule_specs(rules, default_rules):
+    """Describes ``rules`` so a worker process can rebuild them.
+
+    Builtin and plugin rules are closures and cannot be pickled, so they are
+    sent as an index into the worker's own ``default_rules()``. Any other rule
+    is pickled as is. Returns None if a rule can be neither.
+    """
+    default_index = {id(rule): idx for idx, rule in enumerate(default_rules)}
+    specs = []
+    for rule in rules:
+        idx = default_index.get(id(rule))
+        if idx is not None:
+            specs.append(("default", idx))
+            continue
+        try:
+            specs.append(("pickled", pickle.dumps(rule)))
+        except Exception:
+            return None
+    return specs
+
+
+def _init_worker(specs):
+    global _worker_ruleset, _worker_scan_file
+    from core.rules.ruleset import RuleSet
+    from core.scanner import default_rules, scan_file
+
+    defaults = default_rules()
+    rules = []
+    for kind, value in specs:
+        rules.append(defaults[value] if kind == "default" else pickle.loads(value))
+    _worker_ruleset = RuleSet(rules)
+    _worker_scan_file = scan_file
+
+
+def _scan_batch(root, hashing, top_n, batch):
+    root_path = Path(root)
+    profile = ScanProfile(top_n) if top_n is not None else None
+    outcomes = [
+        _worker_scan_file(_worker_ruleset, Path(path), root_path, hashing, known_hash, profile)
+        for path, known_hash in batch
+    ]
+    return outcomes, profile
+
+
+def scan_parallel(rules, default_rules, jobs, root, workers=0, batch_size=200, hashing=False, profile=None):
+    """Scans ``(path, known_hash)`` jobs in a process pool.
+
+    Yields the ``scan_file`` outcome of each job in order. Returns None when
+    the rules cannot be shipped to worker processes, in which case the caller
+    should scan serially. Worker timings are merged into ``profile``.
+    """
+    specs = _rule_specs(rules, default_rules)
+    if specs is None:
+        return None
+    batches = [
+        [(str(path), known_hash) for path, known_hash in jobs[start:start + batch_size]]
+        for start in range(0, len(jobs), batch_size)
+    ]
+    return _iter_outcomes(specs, batches, str(root), hashing, workers or os.cpu_count() or 1, profile)
+
+
+def _iter_outcomes(specs, batches, root, hashing, workers, profile):
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(batches)) or 1,
+        initializer=_init_worker,
+        initargs=(specs,),
+    ) as executor:
+        count = len(batches)
+        top_n = profile.top_n if profile is not None else None
+        for outcomes, batch_profile in executor.map(
+            _scan_batch, [root] * count, [hashing] * count, [top_n] * count, batches
+        ):
+            if batch_profile is not None:
+                profile.merge(batch_profile)
+            yield from outcomes
@@ -1,6 +1,17 @@
 ﻿import importlib.util
-from pathlib import Path
+import json
+import os
+import threading
 from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from core.models import Severity
+from core.rules.literals import rule_literals
+
+PLUGINS_DIR = Path(__file__).resolve().parent.parent / "plugins"
+MANIFEST_NAME = ".manifest.json"
+MANIFEST_VERSION = 1
 
 
 @dataclass
@@ -10,15 +21,223 @@ class PluginSpec:
     fixers: dict
 
 
+def _stamp(plugin_path: Path):
+    stat = plugin_path.stat()
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _describe(rule):
+    return {
+        "id": rule.id,
+        "title": rule.title,
+        "description": rule.description,
+        "severity": rule.severity.value,
+        "cwe": rule.cwe,
+        "owasp": rule.owasp,
+        "languages": sorted(rule.languages),
+        "message": rule.message,
+        "fixer_id": rule.fixer_id,
+        "literals": list(rule_literals(rule) or ()) or None,
+    }
+
+
+def _skip_rule(description):
+    from core.rules.base import Rule
+
+    return Rule(
+        id=description["id"], title=description["title"], description=description["description"],
+        severity=Severity(description["severity"]), cwe=description["cwe"], owasp=description["owasp"],
+        languages=set(description["languages"]), scan=lambda file_path, text: [],
+        message=description["message"], fixer_id=description["fixer_id"],
+    )
+
+
+class LazyRule:
+    """Stands in for a plugin rule described by the manifest.
+
+    Everything the manifest records is a plain attribute. The first access
+    to anything else (``scan``, ``line_pattern``, ``ast_check``), which
+    RuleSet only does when it plans a language the rule covers, imports the
+    plugin and forwards to the real rule.
+    """
+
+    def __init__(self, registry, plugin_dir: str, description):
+        self._registry = registry
+        self._plugin_dir = plugin_dir
+        self.id = description["id"]
+        self.title = description["title"]
+        self.description = description["description"]
+        self.severity = Severity(description["severity"])
+        self.cwe = description["cwe"]
+        self.owasp = description["owasp"]
+        self.languages = set(description["languages"])
+        self.message = description["message"]
+        self.fixer_id = description["fixer_id"]
+        self.literals = tuple(description["literals"]) if description["literals"] else None
+        self.source_stamp = registry.stamp(plugin_dir)
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self._registry.rule(self._plugin_dir, self.id), name)
+
+    def __repr__(self):
+        return f"LazyRule({self.id!r}, plugin={self._plugin_dir!r})"
+
+
+class PluginRegistry:
+    """Plugins under ``plugins_dir``, imported only when their rules are needed.
+
+    Each ``*/plugin.py`` is described in a JSON manifest (name, languages,
+    rule ids and fields, literals) kept next to the plugins and checked
+    against the size and mtime of every plugin file, so a plugin is only
+    imported to describe it when it is new or was edited. ``rules()`` then
+    returns a LazyRule per plugin rule. Modules are imported at most once per
+    registry. A plugin that fails to import is skipped and its error kept in
+    ``errors`` instead of breaking the scanner; its rules report nothing.
+    """
+
+    def __init__(self, plugins_dir: Path = PLUGINS_DIR):
+        self.plugins_dir = Path(plugins_dir)
+        self.manifest_path = self.plugins_dir / MANIFEST_NAME
+        self.errors: List[str] = []
+        self._lock = threading.RLock()
+        self._loaded: Dict[str, Optional[PluginSpec]] = {}
+        self._rules: Dict[str, dict] = {}
+        self._entries = self._read_entries()
+        self._lazy_rules = [
+            LazyRule(self, plugin_dir, description)
+            for plugin_dir, entry in self._entries.items()
+            for description in entry["rules"]
+        ]
+
+    def _plugin_path(self, plugin_dir: str) -> Path:
+        return self.plugins_dir / plugin_dir / "plugin.py"
+
+    def _read_manifest(self):
+        try:
+            manifest = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        if manifest.get("version") != MANIFEST_VERSION:
+            return {}
+        return manifest.get("plugins", {})
+
+    def _read_entries(self):
+        if not self.plugins_dir.is_dir():
+            return {}
+        cached = self._read_manifest()
+        entries = {}
+        changed = False
+        for plugin_path in sorted(self.plugins_dir.glob("*/plugin.py")):
+            plugin_dir = plugin_path.parent.name
+            try:
+                size, mtime_ns = _stamp(plugin_path)
+            except OSError:
+                continue
+            entry = cached.get(plugin_dir)
+            if entry is None or entry["size"] != size or entry["mtime_ns"] != mtime_ns:
+                changed = True
+                plugin = self._import(plugin_dir)
+                if plugin is None:
+                    continue
+                rules = [_describe(rule) for rule in plugin.rules]
+                entry = {
+                    "name": plugin.name,
+                    "size": size,
+                    "mtime_ns": mtime_ns,
+                    "languages": sorted({language for rule in rules for language in rule["languages"]}),
+                    "rules": rules,
+                }
+            entries[plugin_dir] = entry
+        if changed or entries.keys() != cached.keys():
+            self._write_manifest(entries)
+        return entries
+
+    def _write_manifest(self, entries):
+        # Best effort: a read-only install still works, it just describes
+        # its plugins again in every process.
+        data = json.dumps({"version": MANIFEST_VERSION, "plugins": entries}, indent=1)
+        temp = self.manifest_path.with_name(f"{MANIFEST_NAME}.{os.getpid()}.tmp")
+        try:
+            temp.write_text(data, encoding="utf-8")
+            os.replace(temp, self.manifest_path)
+        except OSError:
+            try:
+                temp.unlink()
+            except OSError:
+                pass
+
+    def _import(self, plugin_dir: str):
+        """Imports one plugin (once) and returns its PluginSpec, or None."""
+        with self._lock:
+            if plugin_dir in self._loaded:
+                return self._loaded[plugin_dir]
+            plugin = None
+            plugin_path = self._plugin_path(plugin_dir)
+            try:
+                spec = importlib.util.spec_from_file_location(f"securepatch_plugins.{plugin_dir}", plugin_path)
+                if spec is None or spec.loader is None:
+                    raise ImportError(f"cannot load {plugin_path}")
+                module = importlib.util.module_from_spec(spec)
+                spec.loader.exec_module(module)
+                plugin = getattr(module, "PLUGIN", None)
+            except Exception as exc:
+                self.errors.append(f"plugin {plugin_dir}: {exc}")
+            self._loaded[plugin_dir] = plugin
+            if plugin is not None:
+                self._rules[plugin_dir] = {rule.id: rule for rule in plugin.rules}
+            return plugin
+
+    def stamp(self, plugin_dir: str):
+        entry = self._entries[plugin_dir]
+        return plugin_dir, entry["size"], entry["mtime_ns"]
+
+    def rule(self, plugin_dir: str, rule_id: str):
+        """The real rule behind a LazyRule, importing its plugin if needed."""
+        if plugin_dir not in self._loaded:
+            self._import(plugin_dir)
+        rule = self._rules.get(plugin_dir, {}).get(rule_id)
+        if rule is None:
+            with self._lock:
+                rules = self._rules.setdefault(plugin_dir, {})
+                if rule_id not in rules:
+                    if self._loaded.get(plugin_dir) is not None:
+                        self.errors.append(f"plugin {plugin_dir}: rule {rule_id} no longer exists")
+                    description = next(d for d in self._entries[plugin_dir]["rules"] if d["id"] == rule_id)
+                    rules[rule_id] = _skip_rule(description)
+                rule = rules[rule_id]
+        return rule
+
+    def rules(self):
+        """A LazyRule for every plugin rule, in plugin directory order."""
+        return list(self._lazy_rules)
+
+    def loaded(self):
+        """Directories of the plugins imported so far."""
+        return sorted(plugin_dir for plugin_dir, plugin in self._loaded.items() if plugin is not None)
+
+    def manifest(self):
+        return {plugin_dir: dict(entry) for plugin_dir, entry in self._entries.items()}
+
+    def load_all(self):
+        """Imports every plugin and returns their PluginSpecs."""
+        plugins = [self._import(plugin_dir) for plugin_dir in self._entries]
+        return [plugin for plugin in plugins if plugin is not None]
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def plugin_registry() -> PluginRegistry:
+    """The registry of the bundled plugins directory, shared by every Scanner."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = PluginRegistry()
+        return _registry
+
+
 def load_plugins():
-    plugins_dir = Path(__file__).resolve().parent.parent / "plugins"
-    if not plugins_dir.exists():
-        return []
-    plugins = []
-    for plugin_path in plugins_dir.glob("*/plugin.py"):
-        spec = importlib.util.spec_from_file_location(plugin_path.stem, plugin_path)
-        module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(module)
-        if hasattr(module, "PLUGIN"):
-            plugins.append(module.PLUGIN)
-    return plugins
+    return plugin_registry().load_all()
@@ -0,0 +1,97 @@
+﻿import heapq
+import time
+from typing import Dict, List
+
+
+class ScanProfile:
+    """Timing counters collected during a scan when ``ScanOptions.profile`` is set.
+
+    Times are wall-clock seconds. In a parallel scan the read and rule times
+    are summed over the worker processes, so they can exceed ``total_seconds``.
+    """
+
+    def __init__(self, top_n: int = 10):
+        self.top_n = top_n
+        self.total_seconds = 0.0
+        self.walk_seconds = 0.0
+        self.read_seconds = 0.0
+        self.files = 0
+        self.rules: Dict[str, list] = {}
+        self.tools: Dict[str, float] = {}
+        self._slowest: List[tuple] = []
+
+    def add_rule(self, rule_id: str, seconds: float, matches: int):
+        entry = self.rules.get(rule_id)
+        if entry is None:
+            entry = self.rules[rule_id] = [0.0, 0]
+        entry[0] += seconds
+        entry[1] += matches
+
+    def add_file(self, rel_path: str, read_seconds: float, seconds: float):
+        self.files += 1
+        self.read_seconds += read_seconds
+        self._push_slowest((seconds, rel_path))
+
+    def _push_slowest(self, item):
+        if len(self._slowest) < self.top_n:
+            heapq.heappush(self._slowest, item)
+        elif item > self._slowest[0]:
+            heapq.heapreplace(self._slowest, item)
+
+    def timed_walk(self, entries):
+        """Re-yields ``entries`` adding the time spent producing them to the walk time."""
+        iterator = iter(entries)
+        while True:
+            start = time.perf_counter()
+            try:
+                entry = next(iterator)
+            except StopIteration:
+                self.walk_seconds += time.perf_counter() - start
+                return
+            self.walk_seconds += time.perf_counter() - start
+            yield entry
+
+    def merge(self, other: "ScanProfile"):
+        self.read_seconds += other.read_seconds
+        self.files += other.files
+        for rule_id, (seconds, matches) in other.rules.items():
+            self.add_rule(rule_id, seconds, matches)
+        for item in other._slowest:
+            self._push_slowest(item)
+
+    def slowest_files(self):
+        return [
+            {"file_path": rel_path, "seconds": round(seconds, 6)}
+            for seconds, rel_path in sorted(self._slowest, reverse=True)
+        ]
+
+    def to_dict(self) -> dict:
+        rules = sorted(self.rules.items(), key=lambda item: item[1][0], reverse=True)
+        return {
+            "total_seconds": round(self.total_seconds, 6),
+            "walk_seconds": round(self.walk_seconds, 6),
+            "read_seconds": round(self.read_seconds, 6),
+            "files_scanned": self.files,
+            "rules": {
+                rule_id: {"seconds": round(seconds, 6), "matches": matches}
+                for rule_id, (seconds, matches) in rules
+            },
+            "slowest_files": self.slowest_files(),
+            "tools": self.tools,
+        }
+
+
+class CProfileDump:
+    """Runs cProfile in the current thread and writes the stats to ``path``."""
+
+    def __init__(self, path):
+        import cProfile
+        self.path = path
+        self._profiler = cProfile.Profile()
+
+    def start(self):
+        self._profiler.enable()
+
+    def stop(self):
+        self._profiler.disable()
+        self._profiler.dump_stats(str(self.path))
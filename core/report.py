@@ -1,8 +1,20 @@
 ﻿import json
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import fields
 from datetime import datetime
+from json.encoder import encode_basestring_ascii
 from pathlib import Path
+from typing import Dict, List
 
-from core.models import ReportPaths
+from core.models import Finding, ReportPaths
+from core.sarif import write_sarif
+from core.store import FindingStore
+
+WRITE_BUFFER_BYTES = 1 << 20
+FINDING_KEYS = tuple(f.name for f in fields(Finding))
+_SEVERITY = FINDING_KEYS.index("severity")
+_COMPACT_KEYS = [f'"{key}":' for key in FINDING_KEYS]
+_INDENTED_KEYS: Dict[int, List[str]] = {}
 
 
 def _severity_counts(findings):
@@ -12,23 +24,42 @@ def _severity_counts(findings):
     return counts
 
 
-def _finding_to_dict(finding):
-    return {
-        "id": finding.id,
-        "title": finding.title,
-        "description": finding.description,
-        "severity": finding.severity.value,
-        "file_path": finding.file_path,
-        "line": finding.line,
-        "column": finding.column,
-        "cwe": finding.cwe,
-        "owasp": finding.owasp,
-        "rule_id": finding.rule_id,
-        "message": finding.message,
-        "snippet": finding.snippet,
-        "fixable": finding.fixable,
-        "fixer_id": finding.fixer_id,
-    }
+def _finding_row(finding):
+    return tuple(getattr(finding, name) for name in FINDING_KEYS)
+
+
+def finding_rows(findings):
+    """Yields the JSON-ready field values of each finding, in FINDING_KEYS order."""
+    rows = findings.rows() if isinstance(findings, FindingStore) else map(_finding_row, findings)
+    for row in rows:
+        yield row[:_SEVERITY] + (row[_SEVERITY].value,) + row[_SEVERITY + 1:]
+
+
+def _json_scalar(value):
+    # Same text json.dumps gives for the str/int/bool/None finding fields.
+    if isinstance(value, str):
+        return encode_basestring_ascii(value)
+    if value is None:
+        return "null"
+    if value is True:
+        return "true"
+    if value is False:
+        return "false"
+    return int.__repr__(value)
+
+
+def finding_json(row, depth):
+    """``_json_value`` of a finding dict, from its row."""
+    prefixes = _INDENTED_KEYS.get(depth)
+    if prefixes is None:
+        pad = "\n" + "  " * (depth + 1)
+        prefixes = _INDENTED_KEYS[depth] = [f'{pad}"{key}": ' for key in FINDING_KEYS]
+    body = ",".join([prefix + _json_scalar(value) for prefix, value in zip(prefixes, row)])
+    return "{" + body + "\n" + "  " * depth + "}"
+
+
+def finding_ndjson(row):
+    return "{" + ",".join([prefix + _json_scalar(value) for prefix, value in zip(_COMPACT_KEYS, row)]) + "}"
 
 
 def _explanations_by_file(file_changes):
@@ -45,100 +76,192 @@ def _explanations_by_file(file_changes):
     return data
 
 
-def write_reports(project_path: str, scan_result, patch_plan, patch_result):
-    timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-    output_dir = Path(project_path) / "reports" / timestamp
-    output_dir.mkdir(parents=True, exist_ok=True)
+def _write_lines(path, lines):
+    """Writes ``lines`` to ``path`` as ``"\\n".join(lines)`` would, without joining them."""
+    with open(path, "w", encoding="utf-8", buffering=WRITE_BUFFER_BYTES) as handle:
+        first = True
+        for line in lines:
+            if not first:
+                handle.write("\n")
+            handle.write(line)
+            first = False
 
-    summary = {
-        "findings": len(scan_result.findings),
-        "severity": _severity_counts(scan_result.findings),
-        "languages": scan_result.language_stats,
-        "tools": scan_result.tools_used,
-        "errors": scan_result.errors,
-    }
 
-    explanations = _explanations_by_file(patch_plan.file_changes if patch_plan else [])
+def _diff_parts(patch_plan):
+    # PatchPlan.diff joins these with "\n"; callers emit them one by one.
+    return (change.diff for change in patch_plan.file_changes)
 
-    json_report = {
-        "summary": summary,
-        "findings": [_finding_to_dict(f) for f in scan_result.findings],
-        "patch": {
-            "diff": patch_plan.diff if patch_plan else "",
-            "applied": patch_result.applied_files if patch_result else [],
-            "backups": patch_result.backups if patch_result else [],
-            "errors": patch_result.errors if patch_result else [],
-            "line_explanations": explanations,
-        },
-    }
 
-    markdown_lines = []
-    markdown_lines.append("# Security Scan Report")
-    markdown_lines.append("")
-    markdown_lines.append(f"Generated: {timestamp} UTC")
-    markdown_lines.append("")
-    markdown_lines.append("## Summary")
-    markdown_lines.append(f"Findings: {summary['findings']}")
-    markdown_lines.append("")
-    markdown_lines.append("| Severity | Count |")
-    markdown_lines.append("| --- | --- |")
+def _markdown_lines(timestamp, summary, scan_result, patch_plan, explanations):
+    yield "# Security Scan Report"
+    yield ""
+    yield f"Generated: {timestamp} UTC"
+    yield ""
+    yield "## Summary"
+    yield f"Findings: {summary['findings']}"
+    yield ""
+    yield "| Severity | Count |"
+    yield "| --- | --- |"
     for sev, count in summary["severity"].items():
-        markdown_lines.append(f"| {sev} | {count} |")
-    markdown_lines.append("")
-    markdown_lines.append(f"Languages: {summary['languages']}")
-    markdown_lines.append(f"Tools: {summary['tools']}")
-    markdown_lines.append("")
-    markdown_lines.append("## Findings")
+        yield f"| {sev} | {count} |"
+    yield ""
+    yield f"Languages: {summary['languages']}"
+    yield f"Tools: {summary['tools']}"
+    yield ""
+    yield "## Findings"
     for f in scan_result.findings:
-        markdown_lines.append(f"- [{f.severity.value}] {f.rule_id} {f.file_path}:{f.line} - {f.message}")
-    markdown_lines.append("")
-    markdown_lines.append("## Applied Changes")
+        yield f"- [{f.severity.value}] {f.rule_id} {f.file_path}:{f.line} - {f.message}"
+    yield ""
+    yield "## Applied Changes"
     if patch_plan and patch_plan.file_changes:
-        markdown_lines.append("```diff")
-        markdown_lines.append(patch_plan.diff)
-        markdown_lines.append("```")
+        yield "```diff"
+        yield from _diff_parts(patch_plan)
+        yield "```"
     else:
-        markdown_lines.append("No changes applied")
-    markdown_lines.append("")
-    markdown_lines.append("## Line by Line Explanation")
+        yield "No changes applied"
+    yield ""
+    yield "## Line by Line Explanation"
     if explanations:
         for file_path, items in explanations.items():
-            markdown_lines.append(f"### {file_path}")
+            yield f"### {file_path}"
             for item in items:
-                markdown_lines.append(f"- L{item['line']}: `{item['content']}` - {item['explanation']} ({item['rule']})")
+                yield f"- L{item['line']}: `{item['content']}` - {item['explanation']} ({item['rule']})"
     else:
-        markdown_lines.append("No line changes")
-
-    html_lines = []
-    html_lines.append("<html><head><meta charset='utf-8'><title>Security Report</title></head><body>")
-    html_lines.append("<h1>Security Scan Report</h1>")
-    html_lines.append(f"<p>Generated: {timestamp} UTC</p>")
-    html_lines.append("<h2>Summary</h2>")
-    html_lines.append(f"<pre>{json.dumps(summary, indent=2)}</pre>")
-    html_lines.append("<h2>Findings</h2><ul>")
+        yield "No line changes"
+
+
+def _html_lines(timestamp, summary, scan_result, patch_plan, explanations):
+    yield "<html><head><meta charset='utf-8'><title>Security Report</title></head><body>"
+    yield "<h1>Security Scan Report</h1>"
+    yield f"<p>Generated: {timestamp} UTC</p>"
+    yield "<h2>Summary</h2>"
+    yield f"<pre>{json.dumps(summary, indent=2)}</pre>"
+    yield "<h2>Findings</h2><ul>"
     for f in scan_result.findings:
-        html_lines.append(f"<li>[{f.severity.value}] {f.rule_id} {f.file_path}:{f.line} - {f.message}</li>")
-    html_lines.append("</ul>")
-    html_lines.append("<h2>Applied Changes</h2>")
-    html_lines.append("<pre>")
-    html_lines.append(patch_plan.diff if patch_plan else "")
-    html_lines.append("</pre>")
-    html_lines.append("<h2>Line by Line Explanation</h2>")
+        yield f"<li>[{f.severity.value}] {f.rule_id} {f.file_path}:{f.line} - {f.message}</li>"
+    yield "</ul>"
+    yield "<h2>Applied Changes</h2>"
+    yield "<pre>"
+    if patch_plan and patch_plan.file_changes:
+        yield from _diff_parts(patch_plan)
+    else:
+        yield ""
+    yield "</pre>"
+    yield "<h2>Line by Line Explanation</h2>"
     for file_path, items in explanations.items():
-        html_lines.append(f"<h3>{file_path}</h3><ul>")
+        yield f"<h3>{file_path}</h3><ul>"
         for item in items:
-            html_lines.append(f"<li>L{item['line']}: <code>{item['content']}</code> - {item['explanation']} ({item['rule']})</li>")
-        html_lines.append("</ul>")
-    html_lines.append("</body></html>")
+            yield f"<li>L{item['line']}: <code>{item['content']}</code> - {item['explanation']} ({item['rule']})</li>"
+        yield "</ul>"
+    yield "</body></html>"
+
+
+def _json_value(value, depth):
+    # json.dumps(indent=2) output for ``value`` nested ``depth`` levels deep;
+    # dumped strings never hold a raw newline, so re-indenting is safe.
+    return json.dumps(value, indent=2).replace("\n", "\n" + "  " * depth)
+
+
+def _write_json(path, summary, scan_result, patch_plan, patch_result, explanations):
+    """Writes the JSON report piece by piece, byte for byte as ``json.dumps(report, indent=2)``."""
+    with open(path, "w", encoding="utf-8", buffering=WRITE_BUFFER_BYTES) as handle:
+        handle.write('{\n  "summary": ')
+        handle.write(_json_value(summary, 1))
+        handle.write(',\n  "findings": ')
+        first = True
+        for row in finding_rows(scan_result.findings):
+            handle.write("[\n    " if first else ",\n    ")
+            handle.write(finding_json(row, 2))
+            first = False
+        handle.write("[]" if first else "\n  ]")
+
+        handle.write(',\n  "patch": {\n    "diff": "')
+        if patch_plan:
+            for index, part in enumerate(_diff_parts(patch_plan)):
+                if index:
+                    handle.write("\\n")
+                handle.write(json.dumps(part)[1:-1])
+        handle.write('"')
+        for key, value in (
+            ("applied", patch_result.applied_files if patch_result else []),
+            ("backups", patch_result.backups if patch_result else []),
+            ("errors", patch_result.errors if patch_result else []),
+            ("line_explanations", explanations),
+        ):
+            handle.write(f',\n    "{key}": ')
+            handle.write(_json_value(value, 2))
+        handle.write("\n  }")
+        if getattr(scan_result, "profile", None) is not None:
+            handle.write(',\n  "profile": ')
+            handle.write(_json_value(scan_result.profile.to_dict(), 1))
+        handle.write("\n}")
+
+
+def _write_ndjson(path, scan_result):
+    with open(path, "w", encoding="utf-8", newline="\n", buffering=WRITE_BUFFER_BYTES) as handle:
+        for row in finding_rows(scan_result.findings):
+            handle.write(finding_ndjson(row))
+            handle.write("\n")
+
+
+def _write_sarif(path, scan_result):
+    with open(path, "w", encoding="utf-8", buffering=WRITE_BUFFER_BYTES) as handle:
+        write_sarif(handle, finding_rows(scan_result.findings), scan_result.errors, scan_result.project_root)
+
+
+def _write_columns(path, scan_result):
+    findings = scan_result.findings
+    store = findings if isinstance(findings, FindingStore) else FindingStore(findings)
+    with open(path, "wb") as handle:
+        store.dump(handle)
+
+
+def write_reports(project_path: str, scan_result, patch_plan, patch_result):
+    """Writes the Markdown, HTML, JSON, NDJSON, SARIF and columnar reports of a scan.
+
+    Each report is streamed to its file as it is generated, all of them on
+    separate threads; findings and diffs are never gathered into one string.
+    ``findings.ndjson`` holds one compact JSON object per finding,
+    ``report.sarif`` is a SARIF 2.1.0 log and ``findings.spfc`` the columnar
+    FindingStore dump (read it back with ``FindingStore.load``). Reports go
+    under ``project_path``; SARIF locations are relative to the scanned
+    ``scan_result.project_root``, which may be elsewhere.
+    """
+    timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+    output_dir = Path(project_path) / "reports" / timestamp
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    summary = {
+        "findings": len(scan_result.findings),
+        "severity": _severity_counts(scan_result.findings),
+        "languages": scan_result.language_stats,
+        "tools": scan_result.tools_used,
+        "errors": scan_result.errors,
+    }
+
+    explanations = _explanations_by_file(patch_plan.file_changes if patch_plan else [])
 
     md_path = output_dir / "report.md"
     html_path = output_dir / "report.html"
     json_path = output_dir / "report.json"
+    findings_path = output_dir / "findings.ndjson"
+    sarif_path = output_dir / "report.sarif"
+    columns_path = output_dir / "findings.spfc"
     changelog_path = output_dir / "CHANGELOG_SECURITY.md"
 
-    md_path.write_text("\n".join(markdown_lines), encoding="utf-8")
-    html_path.write_text("\n".join(html_lines), encoding="utf-8")
-    json_path.write_text(json.dumps(json_report, indent=2), encoding="utf-8")
+    with ThreadPoolExecutor(max_workers=6, thread_name_prefix="securepatch-report") as executor:
+        jobs = [
+            executor.submit(_write_lines, md_path, _markdown_lines(
+                timestamp, summary, scan_result, patch_plan, explanations)),
+            executor.submit(_write_lines, html_path, _html_lines(
+                timestamp, summary, scan_result, patch_plan, explanations)),
+            executor.submit(_write_json, json_path, summary, scan_result, patch_plan, patch_result, explanations),
+            executor.submit(_write_ndjson, findings_path, scan_result),
+            executor.submit(_write_sarif, sarif_path, scan_result),
+            executor.submit(_write_columns, columns_path, scan_result),
+        ]
+        for job in jobs:
+            job.result()
 
     changelog_lines = [
         f"# Security Changelog {timestamp}",
@@ -155,4 +278,7 @@ def write_reports(project_path: str, scan_result, patch_plan, patch_result):
         html_path=str(html_path),
         json_path=str(json_path),
         changelog_path=str(changelog_path),
+        findings_path=str(findings_path),
+        sarif_path=str(sarif_path),
+        columns_path=str(columns_path),
     )
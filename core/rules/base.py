@@ -1,11 +1,44 @@
-﻿from dataclasses import dataclass
-from typing import Callable, List, Optional
+﻿from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Pattern, Tuple
 
 from core.models import Finding, Severity
 
 ScannerFn = Callable[[str, str], List[Finding]]
 
 
+@dataclass
+class LinePattern:
+    regex: Pattern
+    message: str
+    guard: Optional[Pattern] = None
+    # Match JavaScript lines with comments and string contents blanked out.
+    code_only: bool = False
+    # Whole-buffer search pattern, compiled on first use by core.rules.lines.
+    gate: object = field(default=None, init=False, repr=False, compare=False)
+    gate_ready: bool = field(default=False, init=False, repr=False, compare=False)
+
+    def matches(self, line: str, pos: int = 0) -> bool:
+        if not self.regex.search(line, pos):
+            return False
+        return self.guard is None or bool(self.guard.search(line))
+
+
+@dataclass
+class AstCheck:
+    """Matches Python syntax nodes instead of source lines.
+
+    ``check`` is called for every node of one of ``node_types`` and returns
+    the line to report, or None. A file is only parsed when it contains one
+    of ``literals``, so they must appear in any code the check can match.
+    ``guard``, like LinePattern's, is searched on the reported line.
+    """
+
+    node_types: Tuple[type, ...]
+    check: Callable[[object], Optional[int]]
+    literals: Tuple[str, ...]
+    guard: Optional[Pattern] = None
+
+
 @dataclass
 class Rule:
     id: str
@@ -18,3 +51,33 @@ class Rule:
     scan: ScannerFn
     message: str
     fixer_id: Optional[str]
+    line_pattern: Optional[LinePattern] = None
+    ast_check: Optional[AstCheck] = None
+    # Substrings one of which any file the rule reports on contains. When
+    # not declared they are derived from ast_check or line_pattern.
+    literals: Optional[Tuple[str, ...]] = None
+
+
+def make_finding(rule: Rule, file_path: str, line_no: int, line: str, message: Optional[str] = None) -> Finding:
+    """Builds the finding ``rule`` reports on one line.
+
+    ``message`` defaults to the line pattern's message, then the rule's.
+    """
+    if message is None:
+        message = rule.line_pattern.message if rule.line_pattern else rule.message
+    return Finding(
+        id=f"{rule.id}:{file_path}:{line_no}",
+        title=rule.title,
+        description=rule.description,
+        severity=rule.severity,
+        file_path=file_path,
+        line=line_no,
+        column=1,
+        cwe=rule.cwe,
+        owasp=rule.owasp,
+        rule_id=rule.id,
+        message=message,
+        snippet=line.strip(),
+        fixable=rule.fixer_id is not None,
+        fixer_id=rule.fixer_id,
+    )
@@ -0,0 +1,129 @@
+﻿import re
+
+# The characters str.splitlines() breaks on. Masking keeps them so line
+# numbers and offsets do not change. Strings, line comments and regex
+# literals end at any of them, which makes lexing a file and lexing its
+# lines joined with "\n" agree.
+_BREAKS = "\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029"
+_MASKABLE = re.compile(f"[^{_BREAKS}]")
+
+_CODE_STOP = re.compile(r"[/'\"`]")
+_EXPR_STOP = re.compile(r"[/'\"`{}]")
+_STRINGS = {
+    "'": re.compile(f"'(?:[^'\\\\{_BREAKS}]|\\\\[\\s\\S])*'?"),
+    '"': re.compile(f'"(?:[^"\\\\{_BREAKS}]|\\\\[\\s\\S])*"?'),
+}
+_LINE_COMMENT = re.compile(f"//[^{_BREAKS}]*")
+_BLOCK_COMMENT = re.compile(r"/\*[\s\S]*?(?:\*/|\Z)")
+_TEMPLATE_CHUNK = re.compile(r"(?:[^`\\$]|\\[\s\S]|\$(?!\{))*")
+_REGEX_BODY = re.compile(f"(?:[^\\\\/\\[{_BREAKS}]|\\\\.|\\[(?:[^\\]\\\\{_BREAKS}]|\\\\.)*\\])+/")
+_WORD_BEFORE = re.compile(r"[A-Za-z_$][\w$]*\Z")
+# Words after which a slash starts a regex literal rather than a division.
+_REGEX_KEYWORDS = {
+    "return", "typeof", "instanceof", "in", "of", "new", "delete", "void",
+    "throw", "case", "do", "else", "yield", "await",
+}
+
+
+def _regex_allowed(text, pos):
+    idx = pos - 1
+    while idx >= 0 and text[idx] in " \t\n\r\f\v":
+        idx -= 1
+    if idx < 0:
+        return True
+    prev = text[idx]
+    if prev in ")]}":
+        return False
+    if prev.isalnum() or prev in "_$":
+        word = _WORD_BEFORE.search(text, max(0, idx - 20), idx + 1)
+        return word is not None and word.group() in _REGEX_KEYWORDS
+    return True
+
+
+def js_literal_spans(text):
+    """Yields ``(kind, start, end)`` for the comments and literals of JS/TS source.
+
+    ``kind`` is "comment", "string", "template" or "regex"; for strings,
+    templates and regexes the span covers the contents between the
+    delimiters. ``${...}`` expressions inside template literals are code and
+    are lexed like the rest of the file. The lexer jumps from one quote,
+    slash or backtick to the next, so its cost follows the number of
+    literals rather than the size of the file.
+    """
+    pos = 0
+    end = len(text)
+    # One entry per template literal we are inside of: the brace depth of
+    # its current ${...} expression.
+    templates = []
+    while pos < end:
+        match = (_EXPR_STOP if templates else _CODE_STOP).search(text, pos)
+        if match is None:
+            return
+        pos = match.start()
+        ch = text[pos]
+        if ch in _STRINGS:
+            stop = _STRINGS[ch].match(text, pos).end()
+            closed = stop - pos > 1 and text[stop - 1] == ch
+            yield "string", pos + 1, stop - 1 if closed else stop
+            pos = stop
+            continue
+        if ch == "/" and text.startswith("//", pos):
+            stop = _LINE_COMMENT.match(text, pos).end()
+            yield "comment", pos, stop
+            pos = stop
+            continue
+        if ch == "/" and text.startswith("/*", pos):
+            stop = _BLOCK_COMMENT.match(text, pos).end()
+            yield "comment", pos, stop
+            pos = stop
+            continue
+        if ch == "{":
+            templates[-1] += 1
+            pos += 1
+        elif ch == "}":
+            if templates[-1]:
+                templates[-1] -= 1
+                pos += 1
+            else:
+                templates.pop()
+                pos = yield from _template_chunk(text, pos + 1, templates)
+        elif ch == "`":
+            pos = yield from _template_chunk(text, pos + 1, templates)
+        elif _regex_allowed(text, pos):
+            body = _REGEX_BODY.match(text, pos + 1)
+            if body is None:
+                pos += 1
+                continue
+            yield "regex", pos + 1, body.end() - 1
+            pos = body.end()
+        else:
+            pos += 1
+
+
+def _template_chunk(text, pos, templates):
+    stop = _TEMPLATE_CHUNK.match(text, pos).end()
+    yield "template", pos, stop
+    if text.startswith("${", stop):
+        templates.append(0)
+        return stop + 2
+    return stop + 1
+
+
+def mask_js(text):
+    """Returns ``text`` with comments and literal contents blanked out.
+
+    Line breaks survive and every other masked character becomes a space, so
+    offsets, line numbers and columns in the result match ``text``.
+    """
+    pieces = []
+    last = 0
+    for _, start, stop in js_literal_spans(text):
+        if stop <= start:
+            continue
+        pieces.append(text[last:start])
+        pieces.append(_MASKABLE.sub(" ", text[start:stop]))
+        last = stop
+    if not pieces:
+        return text
+    pieces.append(text[last:])
+    return "".join(pieces)
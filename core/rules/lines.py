@@ -0,0 +1,109 @@
+﻿import re
+
+from core.rules.base import make_finding
+from core.rules.js_lexer import mask_js
+
+# Constructs that can miss a line once it is searched as part of the whole
+# file (lookarounds at line edges, text anchors, back-references, named
+# groups). Rules using them are matched line by line.
+_UNSAFE_TOKENS = ("(?<!", "(?!", "(?P=", "(?P<", "\\A", "\\Z", "\\B")
+_BACKREF = re.compile(r"\\[1-9]")
+_SCOPED_FLAGS = ((re.IGNORECASE, "i"), (re.DOTALL, "s"), (re.VERBOSE, "x"), (re.ASCII, "a"))
+# Line breaks str.splitlines() knows besides "\n".
+_OTHER_BREAKS = re.compile("[\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]")
+
+
+def gate_source(pattern):
+    """Returns the source of a pattern that can search a whole "\\n" buffer
+    and hits every line ``pattern`` matches, or None if there is none."""
+    source = pattern.pattern
+    if not isinstance(source, str):
+        return None
+    if any(token in source for token in _UNSAFE_TOKENS) or _BACKREF.search(source):
+        return None
+    # A leading word boundary only narrows the match but stops the regex
+    # engine from scanning ahead for the literal after it; hits are
+    # confirmed against the full pattern anyway.
+    if source.startswith("\\b") and source[2:3].isalnum():
+        source = source[2:]
+    flags = "".join(letter for flag, letter in _SCOPED_FLAGS if pattern.flags & flag)
+    wrapped = f"(?{flags}:{source})" if flags else f"(?:{source})"
+    try:
+        re.compile(wrapped)
+    except re.error:
+        return None
+    return wrapped
+
+
+def pattern_gate(line_pattern):
+    """The compiled gate of a LinePattern, cached on it, or None."""
+    if not line_pattern.gate_ready:
+        source = gate_source(line_pattern.regex)
+        line_pattern.gate = re.compile(source, re.MULTILINE) if source is not None else None
+        line_pattern.gate_ready = True
+    return line_pattern.gate
+
+
+def line_buffer(text):
+    """Returns ``text`` with every line break as "\\n", numbered like splitlines().
+
+    Text that already only uses "\\n" comes back as is, without being split.
+    """
+    if _OTHER_BREAKS.search(text) is None:
+        return text
+    return "\n".join(text.splitlines())
+
+
+def gate_findings(rule, gate, file_path, code, source=None):
+    """Confirms the gate hits of ``rule`` in a line buffer.
+
+    ``code`` is the buffer to match; ``source``, when given, is the same-sized
+    buffer the snippets come from (``code`` is then a masked copy of it).
+    Only the lines the gate hits are ever sliced out.
+    """
+    found = []
+    end = len(code)
+    line_no = 1
+    pos = 0
+    match = gate.search(code)
+    while match is not None:
+        start = match.start()
+        line_no += code.count("\n", pos, start)
+        line_start = code.rfind("\n", 0, start) + 1
+        if line_start == end:
+            # An empty match after a trailing newline: splitlines() has no
+            # line there.
+            break
+        line_end = code.find("\n", start)
+        if line_end < 0:
+            line_end = end
+        line = code[line_start:line_end]
+        # The gate matches wherever the pattern does, so nothing on this line
+        # can match left of the first gate hit.
+        if rule.line_pattern.matches(line, start - line_start):
+            snippet = line if source is None else source[line_start:line_end]
+            found.append(make_finding(rule, file_path, line_no, snippet))
+        if line_end == end:
+            break
+        # Resume on the next line so a gate match spilling over a line break
+        # cannot hide a real match further down.
+        pos = line_end
+        match = gate.search(code, line_end + 1)
+    return found
+
+
+def scan_line_pattern(rule, file_path, text):
+    """Reports every line ``rule.line_pattern`` matches; the shared scan of
+    declarative rules."""
+    pattern = rule.line_pattern
+    buffer = line_buffer(text)
+    code = mask_js(buffer) if pattern.code_only else buffer
+    gate = pattern_gate(pattern)
+    if gate is not None:
+        return gate_findings(rule, gate, file_path, code, buffer if pattern.code_only else None)
+    source_lines = buffer.splitlines()
+    return [
+        make_finding(rule, file_path, idx, source_lines[idx - 1])
+        for idx, line in enumerate(code.splitlines(), start=1)
+        if pattern.matches(line)
+    ]
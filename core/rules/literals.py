@@ -0,0 +1,93 @@
+﻿import re
+import sys
+import warnings
+
+if sys.version_info >= (3, 11):
+    # Still the public name for re's parser, but deprecated since 3.11.
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        import sre_parse
+else:
+    import sre_parse
+
+# Literals shorter than this rule out too little to be worth a lookup.
+MIN_LITERAL_LENGTH = 3
+
+_ZERO_WIDTH = {"AT", "ASSERT", "ASSERT_NOT"}
+_REPEATS = {"MAX_REPEAT", "MIN_REPEAT", "POSSESSIVE_REPEAT"}
+
+
+def _best(options):
+    # Prefer the alternative whose shortest literal is longest, then the one
+    # with the fewest literals to look for.
+    return max(options, key=lambda lits: (min(len(lit) for lit in lits), -len(lits)), default=None)
+
+
+def _required(items):
+    """Returns a set of literals one of which every match of ``items`` contains."""
+    options = []
+    run = []
+    for op, av in items:
+        name = op.name
+        if name == "LITERAL":
+            run.append(chr(av))
+            continue
+        if name in _ZERO_WIDTH:
+            continue
+        if run:
+            options.append({"".join(run)})
+            run = []
+        found = None
+        if name == "SUBPATTERN":
+            _, add_flags, _, sub = av
+            if not add_flags & re.IGNORECASE:
+                found = _required(sub)
+        elif name == "BRANCH":
+            branches = [_required(branch) for branch in av[1]]
+            if all(branches):
+                found = set().union(*branches)
+        elif name in _REPEATS:
+            low, _, sub = av
+            if low >= 1:
+                found = _required(sub)
+        elif name == "ATOMIC_GROUP":
+            found = _required(av)
+        if found:
+            options.append(found)
+    if run:
+        options.append({"".join(run)})
+    return _best(options)
+
+
+def required_literals(pattern):
+    """Extracts literals from a compiled regex, at least one of which occurs
+    in any string it matches.
+
+    Returns a sorted tuple, or None when no useful set can be proven, e.g.
+    for case-insensitive patterns or when the literals are too short.
+    """
+    if not isinstance(pattern.pattern, str) or pattern.flags & re.IGNORECASE:
+        return None
+    try:
+        parsed = sre_parse.parse(pattern.pattern, pattern.flags)
+    except Exception:
+        return None
+    found = _required(list(parsed))
+    if not found or min(len(lit) for lit in found) < MIN_LITERAL_LENGTH:
+        return None
+    return tuple(sorted(found))
+
+
+def rule_literals(rule):
+    """Literals that must appear in a file for ``rule`` to report anything.
+
+    Declared ``Rule.literals`` win; otherwise they come from the AST check or
+    are extracted from the line pattern. None means the rule always runs.
+    """
+    if rule.literals:
+        return tuple(rule.literals)
+    if rule.ast_check is not None:
+        return tuple(rule.ast_check.literals) or None
+    if rule.line_pattern is not None:
+        return required_literals(rule.line_pattern.regex)
+    return None
@@ -0,0 +1,118 @@
+﻿import ast
+import re
+
+from core.rules.base import make_finding
+from core.rules.lines import scan_line_pattern
+
+# Line breaks as the Python tokenizer sees them. str.splitlines(), which
+# numbers lines everywhere else, also breaks on the characters below.
+_SOURCE_LINES = re.compile(r"\r\n|\r|\n")
+_EXTRA_BREAKS = re.compile("[\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]")
+
+
+def parse_python(text):
+    """Returns the module AST of ``text``, or None if it does not parse.
+
+    A leading byte order mark, which ``decode_text`` keeps, is skipped; it
+    does not change line numbers.
+    """
+    if text.startswith("\ufeff"):
+        text = text[1:]
+    try:
+        return ast.parse(text)
+    except (SyntaxError, ValueError, RecursionError, MemoryError):
+        return None
+
+
+def has_literals(rule, text) -> bool:
+    return any(literal in text for literal in rule.ast_check.literals)
+
+
+class AstRuleVisitor(ast.NodeVisitor):
+    """Runs the AST checks of several rules in a single walk of a tree.
+
+    Checks are grouped by node type, so each node costs one dict lookup plus
+    the checks that actually care about it.
+    """
+
+    def __init__(self, rules):
+        self.dispatch = {}
+        for rule in rules:
+            for node_type in rule.ast_check.node_types:
+                self.dispatch.setdefault(node_type, []).append(rule)
+        self.hits = {}
+
+    def visit(self, node):
+        rules = self.dispatch.get(type(node))
+        if rules:
+            for rule in rules:
+                line_no = rule.ast_check.check(node)
+                if line_no is not None:
+                    self.hits.setdefault(id(rule), set()).add(line_no)
+        for child in ast.iter_child_nodes(node):
+            self.visit(child)
+
+
+def _splitlines_numbers(text):
+    """Maps tokenizer line numbers to ``str.splitlines()`` ones, or None if equal.
+
+    A tokenizer line holding extra break characters spans several
+    splitlines lines; it maps to the last of them, where its code follows
+    a leading form feed.
+    """
+    if not _EXTRA_BREAKS.search(text):
+        return None
+    numbers = [0]
+    line_no = 0
+    for line in _SOURCE_LINES.split(text):
+        line_no += 1 + len(_EXTRA_BREAKS.findall(line))
+        numbers.append(line_no)
+    return numbers
+
+
+def run_ast_rules(rules, tree, text, make_finding):
+    """Returns ``{id(rule): [finding, ...]}`` for the rules that matched ``tree``.
+
+    Findings are ordered by line with at most one per rule and line, the same
+    shape a line regex produces. Lines are numbered as ``str.splitlines()``
+    numbers them, like the line patterns and fixers do.
+    ``make_finding(rule, line_no, line)`` builds each one.
+    """
+    visitor = AstRuleVisitor(rules)
+    visitor.visit(tree)
+    if not visitor.hits:
+        return {}
+    lines = text.splitlines()
+    numbers = _splitlines_numbers(text)
+    by_rule = {}
+    for rule in rules:
+        line_nos = visitor.hits.get(id(rule))
+        if not line_nos:
+            continue
+        if numbers is not None:
+            line_nos = {numbers[line_no] if line_no < len(numbers) else line_no for line_no in line_nos}
+        guard = rule.ast_check.guard
+        found = []
+        for line_no in sorted(line_nos):
+            line = lines[line_no - 1] if line_no <= len(lines) else ""
+            if guard is None or guard.search(line):
+                found.append(make_finding(rule, line_no, line))
+        if found:
+            by_rule[id(rule)] = found
+    return by_rule
+
+
+def scan_ast_rule(rule, file_path, text):
+    """Scans with one AST rule; unparsable files go through its line pattern."""
+    if not has_literals(rule, text):
+        return []
+    tree = parse_python(text)
+    if tree is not None:
+        try:
+            by_rule = run_ast_rules(
+                [rule], tree, text, lambda rule, line_no, line: make_finding(rule, file_path, line_no, line)
+            )
+            return by_rule.get(id(rule), [])
+        except RecursionError:
+            pass
+    return scan_line_pattern(rule, file_path, text) if rule.line_pattern else []
@@ -0,0 +1,202 @@
+﻿import re
+import time
+
+from core.rules.base import make_finding
+from core.rules.js_lexer import mask_js
+from core.rules.lines import gate_findings, line_buffer, pattern_gate, scan_line_pattern
+from core.rules.literals import rule_literals
+from core.rules.python_ast import parse_python, run_ast_rules
+
+# Bytes in which a str pattern and its bytes twin can disagree: anything
+# non-ASCII plus the control characters str.splitlines() treats as breaks.
+_UNSAFE_BYTES = re.compile(rb"[\x0b\x1c-\x1f\x80-\xff]")
+
+
+class _LanguagePlan:
+    def __init__(self, language, rules):
+        self.rules = rules
+        self.line_rules = []
+        self.standalone = []
+        self.ast_rules = []
+        for rule in rules:
+            if language == "python" and rule.ast_check is not None:
+                self.ast_rules.append(rule)
+                continue
+            gate = pattern_gate(rule.line_pattern) if rule.line_pattern else None
+            if gate is None:
+                self.standalone.append(rule)
+                continue
+            code_only = language == "javascript" and rule.line_pattern.code_only
+            self.line_rules.append((rule, gate, code_only))
+        self.literals = {}
+        for rule in rules:
+            literals = rule_literals(rule)
+            if literals:
+                self.literals[id(rule)] = literals
+        self.unfiltered = {id(rule) for rule in rules if id(rule) not in self.literals}
+        self.all_literals = sorted({lit for literals in self.literals.values() for lit in literals})
+        self._byte_gates = None
+        self._byte_gates_ready = False
+
+    def active(self, text):
+        """Ids of the rules whose literals occur in ``text``, plus those without any."""
+        found = {lit for lit in self.all_literals if lit in text}
+        if not found:
+            return self.unfiltered
+        active = set(self.unfiltered)
+        for rule_id, literals in self.literals.items():
+            if any(lit in found for lit in literals):
+                active.add(rule_id)
+        return active
+
+    def byte_literals(self):
+        """The literals as bytes if every rule has ASCII ones, else None."""
+        if self.unfiltered or not all(lit.isascii() for lit in self.all_literals):
+            return None
+        return [lit.encode("ascii") for lit in self.all_literals]
+
+    def byte_gates(self):
+        """Bytes versions of the line gates, or None if some rule needs text."""
+        if not self._byte_gates_ready:
+            self._byte_gates_ready = True
+            if self.standalone:
+                return None
+            gates = []
+            for _, gate, _ in self.line_rules:
+                source = gate.pattern
+                if not source.isascii() or "^" in source.replace("[^", "[") or "$" in source:
+                    return None
+                gates.append(re.compile(source.encode("ascii"), gate.flags & ~re.UNICODE))
+            for rule in self.ast_rules:
+                literals = self.literals.get(id(rule), ())
+                if not literals or not all(literal.isascii() for literal in literals):
+                    return None
+                gates.append(re.compile(b"|".join(re.escape(literal.encode("ascii")) for literal in literals)))
+            self._byte_gates = gates
+        return self._byte_gates
+
+
+class RuleSet:
+    """Runs every rule of a language over a file sharing a single line split.
+
+    Rules that declare a ``line_pattern`` are searched over the whole file at
+    once; only the lines a pattern hits are checked against the rule, so the
+    per-line Python loop disappears for files without matches. Everything
+    else falls back to ``Rule.scan``. Findings come back in the same order as
+    calling each rule's ``scan`` in turn. A rule only runs on files that
+    contain one of its literals (see ``rule_literals``); a file holding none
+    of them is not even split into lines. Python rules with an ``ast_check``
+    share a single parse of the file and one walk of its tree; files that do
+    not parse go through their line patterns instead. JavaScript rules whose
+    pattern is ``code_only`` share one masked copy of the file, lexed only
+    when one of their patterns hits the raw text. Given a ScanProfile, ``scan``
+    records the time and finding count of every rule.
+    """
+
+    def __init__(self, rules):
+        self.rules = list(rules)
+        self._plans = {}
+
+    def _plan(self, language):
+        plan = self._plans.get(language)
+        if plan is None:
+            plan = _LanguagePlan(language, [r for r in self.rules if language in r.languages])
+            self._plans[language] = plan
+        return plan
+
+    def scan(self, file_path, text, language, profile=None):
+        plan = self._plan(language)
+        if not plan.rules:
+            return []
+        active = plan.active(text)
+        if not active:
+            return []
+        standalone = [rule for rule in plan.standalone if id(rule) in active]
+        if profile is None:
+            by_rule = {id(rule): rule.scan(file_path, text) for rule in standalone}
+        else:
+            by_rule = {}
+            for rule in standalone:
+                start = time.perf_counter()
+                found = by_rule[id(rule)] = rule.scan(file_path, text)
+                profile.add_rule(rule.id, time.perf_counter() - start, len(found))
+        line_rules = [entry for entry in plan.line_rules if id(entry[0]) in active]
+        if line_rules:
+            by_rule.update(self._scan_lines(line_rules, file_path, text, profile))
+        ast_rules = [rule for rule in plan.ast_rules if id(rule) in active]
+        if ast_rules:
+            if profile is None:
+                by_rule.update(self._scan_ast(ast_rules, file_path, text))
+            else:
+                start = time.perf_counter()
+                found = self._scan_ast(ast_rules, file_path, text)
+                matches = sum(len(items) for items in found.values())
+                profile.add_rule("<python-ast>", time.perf_counter() - start, matches)
+                by_rule.update(found)
+        findings = []
+        for rule in plan.rules:
+            findings.extend(by_rule.get(id(rule), ()))
+        return findings
+
+    def needs_text(self, data, language) -> bool:
+        """Tells whether raw ``data`` has to be decoded for ``language`` rules.
+
+        When every rule has ASCII literals and none occurs in ``data`` the
+        answer is no. Otherwise, for pure ASCII content, the bytes twin of
+        every line gate matches wherever the str gate would, so if none of
+        them (nor any AST rule literal) hits, no rule can report anything and
+        decoding is skipped.
+        """
+        plan = self._plan(language)
+        if not plan.rules:
+            return False
+        literals = plan.byte_literals()
+        if literals is not None and not any(data.find(lit) >= 0 for lit in literals):
+            return False
+        gates = plan.byte_gates()
+        if gates is None or _UNSAFE_BYTES.search(data):
+            return True
+        return any(gate.search(data) for gate in gates)
+
+    def _scan_lines(self, line_rules, file_path, text, profile=None):
+        hits = {}
+        # One "\n"-separated buffer numbered like splitlines() serves every
+        # rule; for most files it is the text itself.
+        buffer = line_buffer(text)
+        code = None
+        for rule, gate, code_only in line_rules:
+            start = time.perf_counter() if profile is not None else None
+            if not code_only:
+                found = gate_findings(rule, gate, file_path, buffer)
+            elif gate.search(buffer) is None:
+                found = []
+            else:
+                if code is None:
+                    lex_start = time.perf_counter() if profile is not None else None
+                    code = mask_js(buffer)
+                    if profile is not None:
+                        lexed = time.perf_counter()
+                        profile.add_rule("<js-lexer>", lexed - lex_start, 0)
+                        start += lexed - lex_start
+                found = gate_findings(rule, gate, file_path, code, buffer)
+            if profile is not None:
+                profile.add_rule(rule.id, time.perf_counter() - start, len(found))
+            if found:
+                hits[id(rule)] = found
+        return hits
+
+    def _scan_ast(self, active, file_path, text):
+        tree = parse_python(text)
+        if tree is not None:
+            try:
+                return run_ast_rules(
+                    active, tree, text, lambda rule, line_no, line: make_finding(rule, file_path, line_no, line)
+                )
+            except RecursionError:
+                pass
+        hits = {}
+        for rule in active:
+            found = scan_line_pattern(rule, file_path, text) if rule.line_pattern else []
+            if found:
+                hits[id(rule)] = found
+        return hits
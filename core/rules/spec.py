@@ -0,0 +1,84 @@
+﻿import re
+from dataclasses import dataclass
+from typing import Callable, Optional, Pattern, Tuple, Union
+
+from core.models import Severity
+from core.rules.base import AstCheck, LinePattern, Rule
+from core.rules.lines import scan_line_pattern
+from core.rules.python_ast import scan_ast_rule
+
+
+@dataclass
+class RuleSpec:
+    """Declarative definition of a pattern rule.
+
+    ``pattern`` (and the optional ``guard``, searched on the same line) may
+    be a string compiled with ``flags`` or an already compiled regex. The
+    findings use ``finding_message``, falling back to ``message``. The
+    compiled rule scans with the shared line core unless an ``ast_check``
+    or a custom ``scan(rule, file_path, text)`` is given.
+    """
+
+    id: str
+    title: str
+    description: str
+    severity: Severity
+    cwe: Optional[str]
+    owasp: Optional[str]
+    languages: set
+    message: str
+    pattern: Union[str, Pattern]
+    finding_message: Optional[str] = None
+    guard: Optional[Union[str, Pattern]] = None
+    flags: int = 0
+    fixer_id: Optional[str] = None
+    code_only: bool = False
+    ast_check: Optional[AstCheck] = None
+    literals: Optional[Tuple[str, ...]] = None
+    scan: Optional[Callable] = None
+
+    def compile(self) -> Rule:
+        rule = Rule(
+            id=self.id,
+            title=self.title,
+            description=self.description,
+            severity=self.severity,
+            cwe=self.cwe,
+            owasp=self.owasp,
+            languages=set(self.languages),
+            scan=_unbound_scan,
+            message=self.message,
+            fixer_id=self.fixer_id,
+            line_pattern=LinePattern(
+                _compile(self.pattern, self.flags),
+                self.finding_message or self.message,
+                guard=_compile(self.guard, 0) if self.guard is not None else None,
+                code_only=self.code_only,
+            ),
+            ast_check=self.ast_check,
+            literals=self.literals,
+        )
+        scan = self.scan or (scan_ast_rule if self.ast_check else scan_line_pattern)
+        rule.scan = _bind(scan, rule)
+        return rule
+
+
+def _unbound_scan(file_path: str, text: str) -> list:
+    # Replaced by compile() once the rule it scans with exists.
+    raise RuntimeError("rule scan is not bound yet")
+
+
+def _compile(pattern, flags):
+    return pattern if isinstance(pattern, re.Pattern) else re.compile(pattern, flags)
+
+
+def _bind(scan, rule):
+    def rule_scan(file_path, text):
+        return scan(rule, file_path, text)
+
+    rule_scan.__wrapped__ = scan
+    return rule_scan
+
+
+def compile_rules(specs):
+    return [spec.compile() for spec in specs]
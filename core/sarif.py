@@ -0,0 +1,78 @@
+﻿import json
+import os
+from json.encoder import encode_basestring_ascii as _string
+from pathlib import Path
+
+SARIF_VERSION = "2.1.0"
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+TOOL_NAME = "SecurePatch"
+
+SEVERITY_LEVELS = {"critical": "error", "high": "error", "medium": "warning", "low": "note"}
+
+
+def _rule_descriptor(rule_id, title, description, severity, cwe, owasp):
+    properties = {"severity": severity}
+    # SARIF tags are strings; Bandit reports its CWE ids as integers.
+    tags = [str(tag) for tag in (cwe, owasp) if tag]
+    if tags:
+        properties["tags"] = tags
+    return {
+        "id": rule_id,
+        "name": title,
+        "shortDescription": {"text": title},
+        "fullDescription": {"text": description or title},
+        "defaultConfiguration": {"level": SEVERITY_LEVELS.get(severity, "warning")},
+        "properties": properties,
+    }
+
+
+def write_sarif(handle, findings, errors=(), project_path=None):
+    """Streams ``findings`` to text ``handle`` as a SARIF 2.1.0 log with a single run.
+
+    ``findings`` are rows in Finding field order with the severity as a
+    string (see ``report.finding_rows``). Each rule is described once in
+    ``tool.driver.rules`` and results point at it by ``ruleIndex``. Results
+    are formatted directly as compact JSON and written as they come, so the
+    run lists them before the tool. Scan ``errors`` become tool execution
+    notifications. Relative finding paths are resolved against ``SRCROOT``,
+    ``project_path``; absolute ones (from external tools) become file URIs.
+    """
+    rule_index = {}
+    rules = []
+    handle.write(f'{{"version":"{SARIF_VERSION}","$schema":"{SARIF_SCHEMA}","runs":[{{"results":[')
+    first = True
+    for (_, title, description, severity, file_path, line, column,
+         cwe, owasp, rule_id, message, snippet, _, _) in findings:
+        index = rule_index.get(rule_id)
+        if index is None:
+            index = rule_index[rule_id] = len(rules)
+            rules.append(_rule_descriptor(rule_id, title, description, severity, cwe, owasp))
+        level = SEVERITY_LEVELS.get(severity, "warning")
+        if os.path.isabs(file_path):
+            location = f'"uri":{_string(Path(file_path).as_uri())}'
+        else:
+            uri = _string(file_path.replace("\\", "/"))
+            location = f'"uri":{uri},"uriBaseId":"SRCROOT"'
+        snippet_part = f',"snippet":{{"text":{_string(snippet)}}}' if snippet else ""
+        result = (
+            f'{{"ruleId":{_string(rule_id)},"ruleIndex":{index},"level":"{level}",'
+            f'"message":{{"text":{_string(message)}}},'
+            f'"locations":[{{"physicalLocation":{{"artifactLocation":{{{location}}},'
+            f'"region":{{"startLine":{max(line, 1)},"startColumn":{max(column, 1)}{snippet_part}}}}}}}]}}'
+        )
+        if not first:
+            handle.write(",")
+        handle.write(result)
+        first = False
+    handle.write("],")
+    run = {
+        "tool": {"driver": {"name": TOOL_NAME, "rules": rules}},
+        "invocations": [{
+            "executionSuccessful": not errors,
+            "toolExecutionNotifications": [{"level": "error", "message": {"text": error}} for error in errors],
+        }],
+    }
+    if project_path is not None:
+        run["originalUriBaseIds"] = {"SRCROOT": {"uri": Path(project_path).resolve().as_uri() + "/"}}
+    handle.write(json.dumps(run, separators=(",", ":"))[1:])
+    handle.write("]}")
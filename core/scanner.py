@@ -1,45 +1,326 @@
-﻿from pathlib import Path
+﻿import time
+from pathlib import Path
 
-from core.config import TEXT_EXTENSIONS
+from core.baseline import drop_inline_suppressed, fingerprint
+from core.config import MMAP_THRESHOLD_BYTES, TEXT_EXTENSIONS
 from core.languages import detect_language
 from core.rules import get_builtin_rules
-from core.plugins import load_plugins
-from core.utils import read_text_file, relative_path, safe_walk
-from core.models import ScanResult
-from core.tooling import run_external_tools
+from core.rules.ruleset import RuleSet
+from core.plugins import plugin_registry
+from core.utils import decode_text, hash_bytes, open_text_bytes, relative_path
+from core.walker import select_files, walk_files
+from core.models import ScanEvent, ScanResult
+from core.store import FindingStore
+from core.profiling import CProfileDump, ScanProfile
+
+# The process pool, SQLite cache and external tool runner are imported where
+# they are used, so a plain serial scan does not pay for loading them.
+
+
+def default_rules(plugins=None):
+    """Builtin rules followed by plugin rules.
+
+    Without ``plugins`` the rules of the bundled plugins come from the shared
+    registry as LazyRules, so no plugin is imported until a file of one of
+    its languages is scanned.
+    """
+    rules = get_builtin_rules()
+    if plugins is None:
+        rules.extend(plugin_registry().rules())
+    else:
+        for plugin in plugins:
+            rules.extend(plugin.rules)
+    return rules
+
+
+def scan_file(ruleset, path: Path, root: Path, hashing=False, known_hash=None, profile=None):
+    """Scans one file and returns ``(language, findings, error, digest)``.
+
+    With ``hashing`` the hash of the raw content is returned as ``digest``,
+    and findings are None when it equals ``known_hash`` (a cached result
+    still applies). Large files are scanned from a memory map and only
+    decoded when a rule might match them. Findings on lines carrying a
+    ``securepatch: ignore`` comment are dropped. A ScanProfile in
+    ``profile`` receives the read and rule times of the file.
+    """
+    started = time.perf_counter() if profile is not None else 0.0
+    try:
+        with open_text_bytes(path) as data:
+            digest = hash_bytes(data) if hashing else None
+            if digest is not None and digest == known_hash:
+                return None, None, None, digest
+            language = detect_language(path)
+            if language == "other":
+                text = None
+            elif len(data) >= MMAP_THRESHOLD_BYTES and not ruleset.needs_text(data, language):
+                text = None
+            else:
+                text = decode_text(data)
+    except Exception as exc:
+        return None, [], f"{path}: {exc}", None
+    rel_path = relative_path(path, root)
+    if profile is None:
+        findings = []
+        if text is not None:
+            findings = drop_inline_suppressed(ruleset.scan(rel_path, text, language), text)
+        return language, findings, None, digest
+    read_done = time.perf_counter()
+    findings = []
+    if text is not None:
+        findings = drop_inline_suppressed(ruleset.scan(rel_path, text, language, profile), text)
+    profile.add_file(rel_path, read_done - started, time.perf_counter() - started)
+    return language, findings, None, digest
+
+
+def _on_changed_lines(findings, ranges):
+    from core.gitdiff import in_ranges
+
+    return [finding for finding in findings if in_ranges(ranges, finding.line)]
+
+
+def _in_changes(findings, root, changed, line_ranges):
+    """External tool findings limited to the changed files (and lines)."""
+    root = root.resolve()
+    changed = {str(Path(rel_path)) for rel_path in changed}
+    kept = []
+    for finding in findings:
+        rel_path = relative_path(Path(finding.file_path).resolve(), root)
+        if rel_path not in changed:
+            continue
+        if line_ranges is not None and not _on_changed_lines([finding], line_ranges.get(rel_path, [])):
+            continue
+        kept.append(finding)
+    return kept
 
 
 class Scanner:
     def __init__(self):
-        self.rules = get_builtin_rules()
-        self.plugins = load_plugins()
-        for plugin in self.plugins:
-            self.rules.extend(plugin.rules)
+        self.registry = plugin_registry()
+        self.rules = default_rules()
+        self._default_rules = list(self.rules)
+        self.ruleset = RuleSet(self.rules)
+
+    @property
+    def plugins(self):
+        return self.registry.load_all()
 
     def scan(self, project_path: str, options):
-        root = Path(project_path)
-        findings = []
-        language_stats = {}
-        errors = []
+        stream = self.iter_scan(project_path, options)
+        for _ in stream:
+            pass
+        return stream.result
 
-        for path in safe_walk(root):
-            if path.suffix.lower() not in TEXT_EXTENSIONS:
-                continue
+    def iter_scan(self, project_path: str, options):
+        """Returns a ScanStream yielding a ScanEvent per scanned file."""
+        if self.ruleset.rules != self.rules:
+            self.ruleset = RuleSet(self.rules)
+        return ScanStream(self, project_path, options)
+
+    def _iter_outcomes(self, root, options, cache, profile=None, changed=None):
+        """Yields ``(path, (language, findings, error))`` per file in walk order.
+
+        Given the ``/``-separated relative paths in ``changed`` only those
+        files are scanned, in that order, and the cache keeps its other entries.
+        """
+        if changed is None:
+            entries = walk_files(
+                root, TEXT_EXTENSIONS,
+                use_ignore_files=options.use_ignore_files, parallel=options.parallel_walk,
+            )
+        else:
+            entries = select_files(root, changed, TEXT_EXTENSIONS, use_ignore_files=options.use_ignore_files)
+        if profile is not None:
+            entries = profile.timed_walk(entries)
+        seen = set()
+        hashing = cache is not None
+
+        if not options.parallel:
+            for entry in entries:
+                path = Path(entry.path)
+                cached, job = self._plan(path, entry, root, cache, seen)
+                if job is None:
+                    yield path, cached
+                    continue
+                outcome = scan_file(self.ruleset, path, root, hashing, job[4], profile)
+                yield path, self._finish(job, outcome, cache)
+        else:
+            paths = []
+            planned = []
+            for entry in entries:
+                path = Path(entry.path)
+                paths.append(path)
+                planned.append(self._plan(path, entry, root, cache, seen))
+            jobs = [job for _, job in planned if job is not None]
+            results = None
+            if len(jobs) > options.batch_size:
+                from core.parallel import scan_parallel
+                results = scan_parallel(
+                    self.rules, self._default_rules, [(job[0], job[4]) for job in jobs], root,
+                    workers=options.workers, batch_size=options.batch_size, hashing=hashing,
+                    profile=profile,
+                )
+            if results is None:
+                results = (scan_file(self.ruleset, job[0], root, hashing, job[4], profile) for job in jobs)
+            for path, (cached, job) in zip(paths, planned):
+                if job is None:
+                    yield path, cached
+                    continue
+                yield path, self._finish(job, next(results), cache)
+
+        if cache and changed is None:
+            cache.prune(seen)
+
+    def _plan(self, path, entry, root, cache, seen):
+        """Returns ``(cached_outcome, None)`` or ``(None, job)`` for a file to read.
+
+        A job is ``(path, rel_path, size, mtime_ns, known_hash)``.
+        """
+        if cache is None:
+            return None, (path, None, None, None, None)
+        rel_path = relative_path(path, root)
+        seen.add(rel_path)
+        try:
+            stat = entry.stat()
+        except OSError as exc:
+            return (None, [], f"{path}: {exc}"), None
+        cached = cache.lookup(rel_path, stat.st_size, stat.st_mtime_ns)
+        if cached is not None:
+            return cached, None
+        return None, (path, rel_path, stat.st_size, stat.st_mtime_ns, cache.known_hash(rel_path))
+
+    def _finish(self, job, outcome, cache):
+        language, findings, error, digest = outcome
+        if cache is None or error:
+            return language, findings, error
+        _, rel_path, size, mtime_ns, _ = job
+        if findings is None:
+            return cache.revalidate(rel_path, size, mtime_ns)
+        cache.store(rel_path, size, mtime_ns, digest, language, findings, error)
+        return language, findings, error
+
+
+class ScanStream:
+    """Iterates a scan file by file.
+
+    Each step yields a ScanEvent with the findings of one file; a last event
+    carries the external tool findings. ``result`` holds the ScanResult
+    accumulated so far and is complete once iteration ends. ``cancel()``
+    stops the scan after the file in progress, along with any external tool
+    still running. With ``options.git_base`` only
+    the files changed since that ref are scanned; the first step raises a
+    GitError if git cannot tell which. With ``options.use_baseline`` the
+    findings listed in the project baseline are dropped as each file is
+    scanned and only counted in ``result.suppressed``. With ``options.profile`` the
+    result carries a ScanProfile, and ``options.cprofile_path`` dumps cProfile
+    stats of the scanning thread there once iteration ends.
+    """
+
+    def __init__(self, scanner, project_path: str, options):
+        self.scanner = scanner
+        self.project_path = project_path
+        self.options = options
+        self.result = ScanResult(FindingStore(), {}, [], [], project_root=str(Path(project_path).resolve()))
+        if options.profile:
+            self.result.profile = ScanProfile(options.profile_top_n)
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def __iter__(self):
+        dump = CProfileDump(self.options.cprofile_path) if self.options.cprofile_path else None
+        started = time.perf_counter()
+        if dump:
+            dump.start()
+        try:
+            yield from self._iter_events()
+        finally:
+            if dump:
+                dump.stop()
+            if self.result.profile is not None:
+                self.result.profile.total_seconds = time.perf_counter() - started
+
+    def _iter_events(self):
+        root = Path(self.project_path)
+        result = self.result
+        files_done = 0
+        changed = None
+        line_ranges = None
+        if self.options.git_base:
+            from core.gitdiff import changed_lines
+            changes = changed_lines(root.resolve(), self.options.git_base)
+            changed = sorted(changes)
+            if self.options.changed_lines_only:
+                line_ranges = {str(Path(rel_path)): ranges for rel_path, ranges in changes.items()}
+        baseline = frozenset()
+        if self.options.use_baseline:
+            from core.baseline import baseline_path, load_baseline
             try:
-                text = read_text_file(path)
-            except Exception as exc:
-                errors.append(f"{path}: {exc}")
-                continue
-            language = detect_language(path)
-            language_stats[language] = language_stats.get(language, 0) + 1
-            if language == "other":
-                continue
-            for rule in self.rules:
-                if language in rule.languages:
-                    findings.extend(rule.scan(relative_path(path, root), text))
+                baseline = load_baseline(baseline_path(root.resolve(), self.options.baseline_path))
+            except (OSError, ValueError, KeyError) as exc:
+                result.errors.append(f"baseline not applied: {exc}")
+        cache = None
+        if self.options.use_cache:
+            from core.cache import open_cache
+            cache = open_cache(root.resolve(), self.scanner.rules, self.options.cache_path)
+        tools = None
+        if self.options.use_external_tools:
+            from core.tooling import start_external_tools
+            tools = start_external_tools(self.project_path, self.options)
+        outcomes = self.scanner._iter_outcomes(root, self.options, cache, result.profile, changed)
+        completed = False
+        try:
+            for path, (language, findings, error) in outcomes:
+                files_done += 1
+                rel_path = relative_path(path, root)
+                if error:
+                    result.errors.append(error)
+                    yield ScanEvent([], [error], files_done, rel_path)
+                else:
+                    if line_ranges is not None:
+                        findings = _on_changed_lines(findings, line_ranges.get(rel_path, []))
+                    if baseline and findings:
+                        findings = self._drop_baselined(findings, baseline)
+                    result.language_stats[language] = result.language_stats.get(language, 0) + 1
+                    result.findings.extend(findings)
+                    yield ScanEvent(findings, [], files_done, rel_path)
+                if self._cancelled:
+                    break
+            completed = not self._cancelled
+        finally:
+            if cache:
+                cache.close()
+            # Cancelled, failed or closed early: the tools' results are not
+            # wanted, so stop their processes rather than let them run on.
+            if tools is not None and not completed:
+                tools.cancel()
 
-        tools_used, tool_findings, tool_errors = run_external_tools(project_path, options)
-        findings.extend(tool_findings)
-        errors.extend(tool_errors)
+        # Wait for the tools in short steps: a cancel() from another thread
+        # (the GUI's Cancel button) must not wait for tool_timeout.
+        if tools is not None and completed:
+            while not tools.join():
+                if self._cancelled:
+                    tools.cancel()
+                    break
+        if self._cancelled:
+            result.cancelled = True
+            result.errors.append("Scan cancelled")
+            return
+        result.errors.extend(self.scanner.registry.errors)
+        tools_used, tool_findings, tool_errors, tool_timings = tools.result() if tools else ([], [], [], {})
+        if changed is not None:
+            tool_findings = _in_changes(tool_findings, root, changed, line_ranges)
+        if baseline and tool_findings:
+            tool_findings = self._drop_baselined(tool_findings, baseline)
+        result.findings.extend(tool_findings)
+        result.errors.extend(tool_errors)
+        result.tools_used.extend(tools_used)
+        result.tool_timings.update(tool_timings)
+        if result.profile is not None:
+            result.profile.tools = dict(tool_timings)
+        yield ScanEvent(tool_findings, tool_errors, files_done)
 
-        return ScanResult(findings, language_stats, tools_used, errors)
+    def _drop_baselined(self, findings, baseline):
+        kept = [finding for finding in findings if fingerprint(finding) not in baseline]
+        self.result.suppressed += len(findings) - len(kept)
+        return kept
@@ -0,0 +1,284 @@
+﻿import json
+import struct
+import sys
+from array import array
+from dataclasses import fields
+
+from core.models import Finding, Severity
+
+SNIPPET_BLOCK = 4096
+COLUMNS_MAGIC = b"SPFC"
+COLUMNS_VERSION = 1
+
+_META_FIELDS = ("title", "description", "severity", "cwe", "owasp", "rule_id", "message", "fixable", "fixer_id")
+_FIELDS = tuple(f.name for f in fields(Finding))
+_HEADER = struct.Struct("<4sHI")
+_SEVERITY_META = _META_FIELDS.index("severity")
+
+
+def _little_endian(values):
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_little_endian(typecode, data):
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values
+
+
+class FindingView:
+    """Read-only, Finding-compatible view of one row of a FindingStore."""
+
+    __slots__ = ("_store", "_index")
+
+    def __init__(self, store, index):
+        self._store = store
+        self._index = index
+
+    def _meta(self):
+        return self._store._meta[self._store._meta_ids[self._index]]
+
+    @property
+    def id(self):
+        return self._store._id(self._index)
+
+    @property
+    def title(self):
+        return self._meta()[0]
+
+    @property
+    def description(self):
+        return self._meta()[1]
+
+    @property
+    def severity(self):
+        return self._meta()[2]
+
+    @property
+    def file_path(self):
+        return self._store._files[self._store._file_ids[self._index]]
+
+    @property
+    def line(self):
+        return self._store._lines[self._index]
+
+    @property
+    def column(self):
+        return self._store._columns[self._index]
+
+    @property
+    def cwe(self):
+        return self._meta()[3]
+
+    @property
+    def owasp(self):
+        return self._meta()[4]
+
+    @property
+    def rule_id(self):
+        return self._meta()[5]
+
+    @property
+    def message(self):
+        return self._meta()[6]
+
+    @property
+    def snippet(self):
+        return self._store._snippet(self._index)
+
+    @property
+    def fixable(self):
+        return self._meta()[7]
+
+    @property
+    def fixer_id(self):
+        return self._meta()[8]
+
+    def to_finding(self) -> Finding:
+        return Finding(*(getattr(self, name) for name in _FIELDS))
+
+    def __eq__(self, other):
+        if not isinstance(other, (FindingView, Finding)):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in _FIELDS)
+
+    def __repr__(self):
+        return f"FindingView({self.id!r})"
+
+
+class FindingStore:
+    """Columnar container for findings.
+
+    Rule metadata (title, description, severity, CWE/OWASP, message and fixer)
+    and file paths are interned once; each finding only costs a few array
+    slots plus its snippet, which is packed into shared string blocks. Ids
+    that follow the usual ``rule:path:line`` form are rebuilt on access.
+    Indexing and iteration return FindingView objects, so code written
+    against Finding keeps working.
+    """
+
+    def __init__(self, findings=()):
+        self._meta = []
+        self._meta_index = {}
+        self._files = []
+        self._file_index = {}
+        self._meta_ids = array("I")
+        self._file_ids = array("I")
+        self._lines = array("i")
+        self._columns = array("i")
+        self._custom_ids = {}
+        self._snippet_blocks = []
+        self._snippet_starts = array("I")
+        self._open_snippets = []
+        self.extend(findings)
+
+    def append(self, finding):
+        meta = tuple(getattr(finding, name) for name in _META_FIELDS)
+        meta_id = self._meta_index.get(meta)
+        if meta_id is None:
+            meta_id = self._meta_index[meta] = len(self._meta)
+            self._meta.append(meta)
+        file_path = finding.file_path
+        file_id = self._file_index.get(file_path)
+        if file_id is None:
+            file_id = self._file_index[file_path] = len(self._files)
+            self._files.append(file_path)
+        index = len(self._lines)
+        if finding.id != f"{finding.rule_id}:{file_path}:{finding.line}":
+            self._custom_ids[index] = finding.id
+        self._meta_ids.append(meta_id)
+        self._file_ids.append(file_id)
+        self._lines.append(finding.line)
+        self._columns.append(finding.column)
+        self._open_snippets.append(finding.snippet)
+        if len(self._open_snippets) == SNIPPET_BLOCK:
+            self._seal_snippets()
+
+    def extend(self, findings):
+        for finding in findings:
+            self.append(finding)
+
+    def _seal_snippets(self):
+        offset = 0
+        for snippet in self._open_snippets:
+            self._snippet_starts.append(offset)
+            offset += len(snippet)
+        self._snippet_blocks.append("".join(self._open_snippets))
+        self._open_snippets = []
+
+    def _snippet(self, index):
+        block_no, pos = divmod(index, SNIPPET_BLOCK)
+        if block_no >= len(self._snippet_blocks):
+            return self._open_snippets[pos]
+        block = self._snippet_blocks[block_no]
+        start = self._snippet_starts[index]
+        end = self._snippet_starts[index + 1] if pos + 1 < SNIPPET_BLOCK else len(block)
+        return block[start:end]
+
+    def _id(self, index):
+        custom = self._custom_ids.get(index)
+        if custom is not None:
+            return custom
+        rule_id = self._meta[self._meta_ids[index]][5]
+        return f"{rule_id}:{self._files[self._file_ids[index]]}:{self._lines[index]}"
+
+    def rows(self):
+        """Yields every finding as a tuple of its fields, in Finding order, without building views."""
+        meta_table = self._meta
+        files = self._files
+        for index in range(len(self._lines)):
+            title, description, severity, cwe, owasp, rule_id, message, fixable, fixer_id = (
+                meta_table[self._meta_ids[index]]
+            )
+            yield (
+                self._id(index), title, description, severity, files[self._file_ids[index]],
+                self._lines[index], self._columns[index], cwe, owasp, rule_id, message,
+                self._snippet(index), fixable, fixer_id,
+            )
+
+    def dump(self, handle):
+        """Writes the store to a binary ``handle`` in its columnar form.
+
+        After a fixed header and a small JSON document with the interned
+        rule metadata and file paths, every column is a little-endian array
+        and the snippet blocks one UTF-8 blob, so ``load`` restores the store
+        without a per-finding parse.
+        """
+        block_lengths = array("I", (len(block) for block in self._snippet_blocks))
+        open_lengths = array("I", (len(snippet) for snippet in self._open_snippets))
+        blob = ("".join(self._snippet_blocks) + "".join(self._open_snippets)).encode("utf-8")
+        columns = [
+            self._meta_ids, self._file_ids, self._lines, self._columns,
+            self._snippet_starts, block_lengths, open_lengths,
+        ]
+        header = json.dumps({
+            "count": len(self),
+            "meta": [meta[:_SEVERITY_META] + (meta[_SEVERITY_META].value,) + meta[_SEVERITY_META + 1:]
+                     for meta in self._meta],
+            "files": self._files,
+            "custom_ids": {str(index): finding_id for index, finding_id in self._custom_ids.items()},
+            "columns": [[column.typecode, len(column) * column.itemsize] for column in columns],
+            "snippets": len(blob),
+        }, separators=(",", ":")).encode("utf-8")
+        handle.write(_HEADER.pack(COLUMNS_MAGIC, COLUMNS_VERSION, len(header)))
+        handle.write(header)
+        for column in columns:
+            handle.write(_little_endian(column))
+        handle.write(blob)
+
+    @classmethod
+    def load(cls, handle):
+        """Reads a store written by ``dump``."""
+        magic, version, header_size = _HEADER.unpack(handle.read(_HEADER.size))
+        if magic != COLUMNS_MAGIC or version != COLUMNS_VERSION:
+            raise ValueError("Not a findings column file")
+        header = json.loads(handle.read(header_size))
+        store = cls()
+        store._meta = [
+            tuple(meta[:_SEVERITY_META]) + (Severity(meta[_SEVERITY_META]),) + tuple(meta[_SEVERITY_META + 1:])
+            for meta in header["meta"]
+        ]
+        store._meta_index = {meta: index for index, meta in enumerate(store._meta)}
+        store._files = header["files"]
+        store._file_index = {path: index for index, path in enumerate(store._files)}
+        store._custom_ids = {int(index): finding_id for index, finding_id in header["custom_ids"].items()}
+        (store._meta_ids, store._file_ids, store._lines, store._columns,
+         store._snippet_starts, block_lengths, open_lengths) = (
+            _from_little_endian(typecode, handle.read(size)) for typecode, size in header["columns"]
+        )
+        text = handle.read(header["snippets"]).decode("utf-8")
+        offset = 0
+        for length in block_lengths:
+            store._snippet_blocks.append(text[offset:offset + length])
+            offset += length
+        for length in open_lengths:
+            store._open_snippets.append(text[offset:offset + length])
+            offset += length
+        return store
+
+    def __len__(self):
+        return len(self._lines)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [FindingView(self, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("finding index out of range")
+        return FindingView(self, index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield FindingView(self, index)
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def __repr__(self):
+        return f"FindingStore({len(self)} findings)"
@@ -1,7 +1,11 @@
 ﻿import json
 import shutil
 import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from pathlib import Path
+from typing import Set
 
 from core.models import Finding, Severity
 
@@ -16,19 +20,47 @@ def _map_severity(value: str) -> Severity:
     return mapping.get(value.upper(), Severity.MEDIUM)
 
 
-def _run_tool(cmd, cwd):
+# Seconds a cancelled tool gets to exit after SIGTERM before it is killed.
+CANCEL_GRACE = 2.0
+# Longest a join() waits, so callers can react to a cancel in between.
+JOIN_STEP = 0.1
+
+# The ExternalToolRun a tool thread works for, so _run_tool can register
+# its process without every tool function passing it along.
+_current = threading.local()
+
+
+class ToolTimeout(Exception):
+    pass
+
+
+def _run_tool(cmd, cwd, timeout=60):
+    run = getattr(_current, "run", None)
     try:
-        proc = subprocess.run(cmd, cwd=cwd, capture_output=True, text=True, timeout=60)
-        return proc.returncode, proc.stdout, proc.stderr
+        proc = subprocess.Popen(cmd, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
     except Exception as exc:
         return 1, "", str(exc)
-
-
-def run_bandit(project_path: str):
+    if run is not None and not run._track(proc):
+        proc.kill()
+        proc.communicate()
+        return 1, "", f"{cmd[0]} cancelled"
+    try:
+        out, err = proc.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired as exc:
+        proc.kill()
+        proc.communicate()
+        raise ToolTimeout(f"{cmd[0]} timed out after {timeout}s") from exc
+    finally:
+        if run is not None:
+            run._untrack(proc)
+    return proc.returncode, out, err
+
+
+def run_bandit(project_path: str, timeout=60):
     if not shutil.which("bandit"):
         return [], "bandit not found"
     cmd = ["bandit", "-r", project_path, "-f", "json"]
-    code, out, err = _run_tool(cmd, project_path)
+    code, out, err = _run_tool(cmd, project_path, timeout)
     if code != 0:
         return [], err or "bandit failed"
     data = json.loads(out)
@@ -53,11 +85,11 @@ def run_bandit(project_path: str):
     return findings, None
 
 
-def run_semgrep(project_path: str):
+def run_semgrep(project_path: str, timeout=60):
     if not shutil.which("semgrep"):
         return [], "semgrep not found"
     cmd = ["semgrep", "--config=auto", "--json", "--metrics=off", project_path]
-    code, out, err = _run_tool(cmd, project_path)
+    code, out, err = _run_tool(cmd, project_path, timeout)
     if code not in (0, 1):
         return [], err or "semgrep failed"
     data = json.loads(out) if out else {}
@@ -83,11 +115,11 @@ def run_semgrep(project_path: str):
     return findings, None
 
 
-def run_eslint(project_path: str):
+def run_eslint(project_path: str, timeout=60):
     if not shutil.which("eslint"):
         return [], "eslint not found"
     cmd = ["eslint", "-f", "json", project_path]
-    code, out, err = _run_tool(cmd, project_path)
+    code, out, err = _run_tool(cmd, project_path, timeout)
     if code not in (0, 1):
         return [], err or "eslint failed"
     data = json.loads(out) if out else []
@@ -113,32 +145,111 @@ def run_eslint(project_path: str):
     return findings, None
 
 
-def run_external_tools(project_path: str, options):
-    tools_used = []
-    findings = []
-    errors = []
-    if not options.use_external_tools:
-        return tools_used, findings, errors
-
-    bandit_findings, bandit_error = run_bandit(project_path)
-    if bandit_error:
-        errors.append(bandit_error)
-    else:
-        tools_used.append("bandit")
-        findings.extend(bandit_findings)
-
-    semgrep_findings, semgrep_error = run_semgrep(project_path)
-    if semgrep_error:
-        errors.append(semgrep_error)
-    else:
-        tools_used.append("semgrep")
-        findings.extend(semgrep_findings)
-
-    eslint_findings, eslint_error = run_eslint(project_path)
-    if eslint_error:
-        errors.append(eslint_error)
-    else:
-        tools_used.append("eslint")
-        findings.extend(eslint_findings)
+EXTERNAL_TOOLS = [
+    ("bandit", run_bandit),
+    ("semgrep", run_semgrep),
+    ("eslint", run_eslint),
+]
+
+
+def _timed_run(run, name, fn, project_path, timeout):
+    start = time.perf_counter()
+    timed_out = False
+    _current.run = run
+    try:
+        findings, error = fn(project_path, timeout)
+    except ToolTimeout as exc:
+        findings, error, timed_out = [], str(exc), True
+    except Exception as exc:
+        findings, error = [], f"{name}: {exc}"
+    finally:
+        _current.run = None
+    timing = {"seconds": round(time.perf_counter() - start, 3), "timed_out": timed_out}
+    return findings, error, timing
+
+
+class ExternalToolRun:
+    """External tools running concurrently in background threads.
+
+    The tools start as soon as the run is created so they overlap with the
+    builtin scan; ``result()`` waits for all of them. ``cancel()`` stops
+    them instead: their processes are terminated (killed if they linger)
+    and their threads joined.
+    """
+
+    def __init__(self, project_path: str, options):
+        self._futures = []
+        self._lock = threading.Lock()
+        self._processes: Set[subprocess.Popen] = set()
+        self._cancelled = False
+        self._executor = None
+        if not options.use_external_tools:
+            return
+        self._executor = ThreadPoolExecutor(max_workers=len(EXTERNAL_TOOLS), thread_name_prefix="securepatch-tool")
+        for name, fn in EXTERNAL_TOOLS:
+            future = self._executor.submit(_timed_run, self, name, fn, project_path, options.tool_timeout)
+            self._futures.append((name, future))
+        self._executor.shutdown(wait=False)
+
+    def _track(self, proc) -> bool:
+        with self._lock:
+            if self._cancelled:
+                return False
+            self._processes.add(proc)
+            return True
+
+    def _untrack(self, proc):
+        with self._lock:
+            self._processes.discard(proc)
+
+    def _signal(self, kill):
+        with self._lock:
+            processes = list(self._processes)
+        for proc in processes:
+            try:
+                proc.kill() if kill else proc.terminate()
+            except OSError:
+                pass
+
+    def cancel(self):
+        """Stops every tool still running and waits for their threads."""
+        with self._lock:
+            self._cancelled = True
+        if self._executor is None:
+            return
+        for _, future in self._futures:
+            future.cancel()
+        self._signal(kill=False)
+        futures = [future for _, future in self._futures]
+        if wait(futures, timeout=CANCEL_GRACE).not_done:
+            self._signal(kill=True)
+        self._executor.shutdown(wait=True)
+
+    def join(self, timeout=JOIN_STEP) -> bool:
+        """Waits up to ``timeout`` seconds for the tools; True once all have finished."""
+        return not wait([future for _, future in self._futures], timeout=timeout).not_done
+
+    def result(self):
+        """Returns ``(tools_used, findings, errors, timings)`` in tool order."""
+        tools_used = []
+        findings = []
+        errors = []
+        timings = {}
+        for name, future in self._futures:
+            tool_findings, error, timing = future.result()
+            timings[name] = timing
+            if error:
+                errors.append(error)
+            else:
+                tools_used.append(name)
+                findings.extend(tool_findings)
+        return tools_used, findings, errors, timings
+
+
+def start_external_tools(project_path: str, options) -> ExternalToolRun:
+    return ExternalToolRun(project_path, options)
 
+
+def run_external_tools(project_path: str, options):
+    tools_used, findings, errors, _ = start_external_tools(project_path, options).result()
     return tools_used, findings, errors
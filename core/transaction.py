@@ -0,0 +1,231 @@
+﻿import json
+import os
+import stat
+import tempfile
+import time
+import uuid
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from core.cache import CACHE_DIR_NAME
+from core.models import PatchResult
+from core.utils import decode_text, hash_bytes, hash_text
+
+BACKUP_DIR_NAME = "backups"
+TEMP_SUFFIX = ".securepatch-tmp"
+APPLY_WORKERS = 8
+
+
+def _write_temp(path: Path, data: bytes, mode=None, durable=False) -> str:
+    """Writes ``data`` to a new temporary file next to ``path`` and returns its name."""
+    fd, temp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=TEMP_SUFFIX)
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(data)
+            if durable:
+                handle.flush()
+                os.fsync(handle.fileno())
+        if mode is not None:
+            os.chmod(temp, mode)
+    except BaseException:
+        _discard(temp)
+        raise
+    return temp
+
+
+def _atomic_write(path: Path, data: bytes, mode=None, durable=False):
+    os.replace(_write_temp(path, data, mode, durable), path)
+
+
+def _discard(temp):
+    try:
+        os.unlink(temp)
+    except OSError:
+        pass
+
+
+class BackupArchive:
+    """Content-addressed store of the files a patch replaced.
+
+    Each original is kept once, zlib-compressed under ``objects/`` and named
+    by the SHA-256 of its bytes, however many files or applies share it. A
+    JSON manifest per apply under ``transactions/`` maps the touched paths to
+    their objects, which is all ``rollback`` needs.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.objects = root / "objects"
+        self.transactions = root / "transactions"
+
+    def _object_path(self, digest: str) -> Path:
+        return self.objects / digest[:2] / digest
+
+    def put(self, data: bytes) -> str:
+        digest = hash_bytes(data)
+        path = self._object_path(digest)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            _atomic_write(path, zlib.compress(data, 1))
+        return digest
+
+    def get(self, digest: str) -> bytes:
+        return zlib.decompress(self._object_path(digest).read_bytes())
+
+    def manifest_path(self, transaction_id: str) -> Path:
+        return self.transactions / f"{transaction_id}.json"
+
+    def save_manifest(self, manifest) -> Path:
+        self.transactions.mkdir(parents=True, exist_ok=True)
+        path = self.manifest_path(manifest["id"])
+        _atomic_write(path, json.dumps(manifest, indent=1).encode("utf-8"), durable=True)
+        return path
+
+    def load_manifest(self, transaction_id: str):
+        return json.loads(self.manifest_path(transaction_id).read_text(encoding="utf-8"))
+
+    def latest(self):
+        """The most recent manifest that can still be rolled back, or None."""
+        if not self.transactions.is_dir():
+            return None
+        manifests = []
+        for path in self.transactions.glob("*.json"):
+            try:
+                manifest = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                continue
+            if manifest.get("state") in ("prepared", "committed"):
+                manifests.append(manifest)
+        return max(manifests, key=lambda m: m["created"], default=None)
+
+
+def open_archive(project_root: Path) -> BackupArchive:
+    return BackupArchive(project_root / CACHE_DIR_NAME / BACKUP_DIR_NAME)
+
+
+def _prepare(change, full_path: Path, archive, keep_original):
+    """Checks one file against the plan and stages its new content in a temp file."""
+    data = full_path.read_bytes()
+    if hash_text(decode_text(data)) != change.original_hash:
+        raise ValueError("file changed since scan")
+    backup = archive.put(data) if keep_original else None
+    updated = change.updated_text.encode("utf-8")
+    temp = _write_temp(full_path, updated, stat.S_IMODE(os.stat(full_path).st_mode))
+    return {
+        "path": change.file_path,
+        "backup": backup,
+        "updated_hash": hash_bytes(updated),
+        "temp": temp,
+    }
+
+
+def _restore(entry, full_path: Path, archive):
+    mode = stat.S_IMODE(os.stat(full_path).st_mode) if full_path.exists() else None
+    _atomic_write(full_path, archive.get(entry["backup"]), mode)
+
+
+def apply_changes(changes, resolve, archive, create_backup=True, transactional=False, workers=APPLY_WORKERS):
+    """Writes FileChanges to disk, each file through a temp file and ``os.replace``.
+
+    Files are checked, backed up and staged concurrently; only then are the
+    staged files moved into place, so no file is ever left half-written.
+    ``resolve`` maps a relative path to the file to patch. With
+    ``create_backup`` the originals go to ``archive``. With ``transactional``
+    the apply is all or nothing: any file that cannot be staged cancels the
+    whole patch, and a failure while moving files into place restores the
+    ones already replaced. Originals are always archived in that mode.
+    """
+    keep_original = create_backup or transactional
+
+    def prepare(change):
+        try:
+            return change, _prepare(change, resolve(change.file_path), archive, keep_original), None
+        except Exception as exc:
+            return change, None, f"{change.file_path}: {exc}"
+
+    with ThreadPoolExecutor(max_workers=workers or APPLY_WORKERS, thread_name_prefix="securepatch-apply") as executor:
+        staged = list(executor.map(prepare, changes))
+    errors = [error for _, _, error in staged if error]
+    entries = [entry for _, entry, _ in staged if entry]
+
+    if transactional and errors:
+        for entry in entries:
+            _discard(entry["temp"])
+        errors.append("Patch not applied: every file must apply cleanly in transactional mode")
+        return PatchResult(applied_files=[], backups=[], errors=errors)
+
+    manifest = None
+    backups = []
+    if keep_original and entries:
+        transaction_id = time.strftime("%Y%m%d-%H%M%S") + "-" + uuid.uuid4().hex[:8]
+        manifest = {"id": transaction_id, "created": time.time(), "state": "prepared", "files": entries}
+        backups.append(str(archive.save_manifest(manifest)))
+
+    applied = []
+    failed = False
+    for entry in entries:
+        if failed:
+            _discard(entry["temp"])
+            continue
+        try:
+            os.replace(entry["temp"], resolve(entry["path"]))
+            applied.append(entry)
+        except OSError as exc:
+            _discard(entry["temp"])
+            errors.append(f"{entry['path']}: {exc}")
+            failed = transactional
+
+    if failed:
+        for entry in applied:
+            try:
+                _restore(entry, resolve(entry["path"]), archive)
+            except Exception as exc:
+                errors.append(f"{entry['path']}: rollback failed: {exc}")
+        errors.append("Patch rolled back")
+        applied = []
+
+    if manifest is not None:
+        manifest["state"] = "rolled_back" if failed else "committed"
+        manifest["files"] = [{k: v for k, v in entry.items() if k != "temp"} for entry in applied]
+        archive.save_manifest(manifest)
+    return PatchResult(applied_files=[entry["path"] for entry in applied], backups=backups, errors=errors)
+
+
+def rollback(archive, resolve, transaction_id=None):
+    """Restores the files of a transaction (the latest one by default).
+
+    Files edited after the patch was applied are left alone and reported.
+    An apply interrupted before it finished can be rolled back the same way;
+    its leftover temp files are removed.
+    """
+    manifest = archive.load_manifest(transaction_id) if transaction_id else archive.latest()
+    if manifest is None:
+        return PatchResult(applied_files=[], backups=[], errors=["No patch to roll back"])
+    if manifest["state"] not in ("prepared", "committed"):
+        return PatchResult(applied_files=[], backups=[], errors=[f"Patch {manifest['id']} is {manifest['state']}"])
+
+    def restore(entry):
+        full_path = resolve(entry["path"])
+        if entry.get("temp"):
+            _discard(entry["temp"])
+        try:
+            current = hash_bytes(full_path.read_bytes())
+            if current == entry["backup"]:
+                return None, None
+            if current != entry["updated_hash"]:
+                return None, f"{entry['path']}: file changed since patch was applied"
+            _restore(entry, full_path, archive)
+            return entry["path"], None
+        except Exception as exc:
+            return None, f"{entry['path']}: {exc}"
+
+    with ThreadPoolExecutor(max_workers=APPLY_WORKERS, thread_name_prefix="securepatch-rollback") as executor:
+        outcomes = list(executor.map(restore, manifest["files"]))
+    manifest["state"] = "rolled_back"
+    archive.save_manifest(manifest)
+    return PatchResult(
+        applied_files=[path for path, _ in outcomes if path],
+        backups=[],
+        errors=[error for _, error in outcomes if error],
+    )
@@ -1,45 +1,66 @@
 ﻿import hashlib
+import mmap
+import os
+from contextlib import contextmanager
 from pathlib import Path
 
-from core.config import DEFAULT_EXCLUDES, MAX_FILE_SIZE_BYTES
+from core.config import BINARY_SNIFF_BYTES, MAX_FILE_SIZE_BYTES, MMAP_THRESHOLD_BYTES
+from core.walker import walk_files
+
+_TEXT_CHARS = bytes(bytearray({7, 8, 9, 10, 12, 13, 27} | set(range(0x20, 0x100))))
 
 
 def hash_text(text: str) -> str:
     return hashlib.sha256(text.encode("utf-8", errors="ignore")).hexdigest()
 
 
+def hash_bytes(data) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
 def is_binary_string(data: bytes) -> bool:
     if not data:
         return False
-    text_chars = bytearray({7, 8, 9, 10, 12, 13, 27} | set(range(0x20, 0x100)))
-    return bool(data.translate(None, text_chars))
+    return bool(data.translate(None, _TEXT_CHARS))
+
+
+@contextmanager
+def open_text_bytes(path: Path, max_bytes: int = MAX_FILE_SIZE_BYTES):
+    """Yields the raw content of a text file.
+
+    Small files are read into a bytes object; files of MMAP_THRESHOLD_BYTES
+    or more are memory-mapped read-only instead, so they cost no private
+    memory until decoded. Binary detection only looks at the first
+    BINARY_SNIFF_BYTES.
+    """
+    with open(path, "rb") as handle:
+        size = os.fstat(handle.fileno()).st_size
+        if size > max_bytes:
+            raise ValueError("File too large")
+        if size < MMAP_THRESHOLD_BYTES:
+            data = handle.read()
+            if is_binary_string(data[:BINARY_SNIFF_BYTES]):
+                raise ValueError("Binary file")
+            yield data
+            return
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if is_binary_string(mapped[:BINARY_SNIFF_BYTES]):
+                raise ValueError("Binary file")
+            yield mapped
+
+
+def decode_text(data) -> str:
+    return str(data, "utf-8", "replace")
 
 
 def read_text_file(path: Path, max_bytes: int = MAX_FILE_SIZE_BYTES) -> str:
-    if path.stat().st_size > max_bytes:
-        raise ValueError("File too large")
-    data = path.read_bytes()
-    if is_binary_string(data):
-        raise ValueError("Binary file")
-    return data.decode("utf-8", errors="replace")
+    with open_text_bytes(path, max_bytes) as data:
+        return decode_text(data)
 
 
 def safe_walk(root: Path):
-    for dirpath, dirnames, filenames in root.walk():
-        cleaned = []
-        for d in dirnames:
-            if d in DEFAULT_EXCLUDES:
-                continue
-            full = Path(dirpath) / d
-            if full.is_symlink():
-                continue
-            cleaned.append(d)
-        dirnames[:] = cleaned
-        for name in filenames:
-            path = Path(dirpath) / name
-            if path.is_symlink():
-                continue
-            yield path
+    for entry in walk_files(root):
+        yield Path(entry.path)
 
 
 def relative_path(path: Path, root: Path) -> str:
@@ -0,0 +1,244 @@
+﻿import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from core.config import DEFAULT_EXCLUDES
+
+IGNORE_FILE_NAMES = (".gitignore", ".securepatchignore")
+
+
+def _translate(pattern: str) -> str:
+    """Converts a gitignore glob (without leading/trailing slash) to a regex."""
+    out = []
+    i = 0
+    n = len(pattern)
+    while i < n:
+        ch = pattern[i]
+        if ch == "*":
+            if pattern.startswith("**/", i):
+                out.append("(?:.*/)?")
+                i += 3
+                continue
+            if pattern.startswith("**", i) and i + 2 == n:
+                out.append(".*")
+                i += 2
+                continue
+            out.append("[^/]*")
+        elif ch == "?":
+            out.append("[^/]")
+        elif ch == "[":
+            end = pattern.find("]", i + 1)
+            if end == -1:
+                out.append(re.escape(ch))
+            else:
+                body = pattern[i + 1:end]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                out.append(f"[{body}]")
+                i = end
+        elif ch == "\\" and i + 1 < n:
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(ch))
+        i += 1
+    return "".join(out)
+
+
+class IgnoreFile:
+    """Compiled patterns of one ignore file, relative to its directory."""
+
+    def __init__(self, lines):
+        self.rules = []
+        for raw in lines:
+            line = raw.rstrip("\n").rstrip("\r")
+            if not line.strip() or line.startswith("#"):
+                continue
+            if not line.endswith("\\ "):
+                line = line.rstrip()
+            negate = line.startswith("!")
+            if negate:
+                line = line[1:]
+            elif line.startswith("\\!") or line.startswith("\\#"):
+                line = line[1:]
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            if not line:
+                continue
+            anchored = "/" in line
+            line = line.lstrip("/")
+            prefix = "" if anchored else "(?:.*/)?"
+            regex = re.compile(f"{prefix}{_translate(line)}\\Z", re.DOTALL)
+            self.rules.append((regex, negate, dir_only))
+        # Without negations the outcome does not depend on rule order, so
+        # each kind of rule collapses into one alternation.
+        self._combined = None
+        if not any(negate for _, negate, _ in self.rules):
+            any_kind = [r.pattern for r, _, dir_only in self.rules if not dir_only]
+            dirs = [r.pattern for r, _, dir_only in self.rules if dir_only]
+            self._combined = (
+                re.compile("|".join(any_kind), re.DOTALL) if any_kind else None,
+                re.compile("|".join(dirs), re.DOTALL) if dirs else None,
+            )
+
+    @classmethod
+    def load(cls, path):
+        try:
+            with open(path, "r", encoding="utf-8", errors="replace") as handle:
+                return cls(handle.readlines())
+        except OSError:
+            return None
+
+    def match(self, rel_path: str, is_dir: bool):
+        """Returns True (ignored), False (re-included) or None (no rule applies)."""
+        if self._combined is not None:
+            any_kind, dirs = self._combined
+            if any_kind is not None and any_kind.match(rel_path):
+                return True
+            if is_dir and dirs is not None and dirs.match(rel_path):
+                return True
+            return None
+        for regex, negate, dir_only in reversed(self.rules):
+            if dir_only and not is_dir:
+                continue
+            if regex.match(rel_path):
+                return not negate
+        return None
+
+
+def _is_ignored(ignores, rel_path: str, is_dir: bool) -> bool:
+    # Deeper ignore files take precedence over the ones above them. Ignored
+    # directories are pruned, so their contents never get here, which is also
+    # why a file below an excluded directory cannot be re-included.
+    for base, ignore_file in reversed(ignores):
+        result = ignore_file.match(rel_path[len(base):], is_dir)
+        if result is not None:
+            return bool(result)
+    return False
+
+
+def _with_ignore_files(dir_path, rel_prefix, ignores, names=None):
+    """Adds the ignore files of one directory (those in ``names`` if given)."""
+    for name in IGNORE_FILE_NAMES:
+        if names is None or name in names:
+            ignore_file = IgnoreFile.load(os.path.join(dir_path, name))
+            if ignore_file and ignore_file.rules:
+                ignores = ignores + ((rel_prefix, ignore_file),)
+    return ignores
+
+
+def _list_dir(dir_path, rel_prefix, ignores, extensions, use_ignore_files):
+    try:
+        with os.scandir(dir_path) as it:
+            entries = list(it)
+    except OSError:
+        return [], []
+    if use_ignore_files:
+        ignores = _with_ignore_files(dir_path, rel_prefix, ignores, {entry.name for entry in entries})
+    files = []
+    subdirs = []
+    for entry in entries:
+        if entry.is_symlink():
+            continue
+        name = entry.name
+        if entry.is_dir():
+            if name in DEFAULT_EXCLUDES:
+                continue
+            rel = rel_prefix + name
+            if ignores and _is_ignored(ignores, rel, True):
+                continue
+            subdirs.append((entry.path, rel + "/", ignores))
+            continue
+        if extensions is not None and os.path.splitext(name)[1].lower() not in extensions:
+            continue
+        if ignores and _is_ignored(ignores, rel_prefix + name, False):
+            continue
+        files.append(entry)
+    return files, subdirs
+
+
+def walk_files(root, extensions=None, use_ignore_files=False, parallel=False, workers=8):
+    """Yields ``os.DirEntry`` objects for the files under ``root``.
+
+    Excluded and symlinked directories are pruned, symlinked files skipped and
+    names are filtered on ``extensions`` before any Path is built. With
+    ``use_ignore_files`` the ``.gitignore`` and ``.securepatchignore`` files
+    found along the way are honoured. With ``parallel`` directory listings are
+    prefetched on a thread pool; files still come out in the same order as a
+    serial walk (top-down, files of a directory before its subdirectories).
+    """
+    args = (extensions, use_ignore_files)
+    if not parallel:
+        stack = [(os.fspath(root), "", ())]
+        while stack:
+            dir_path, rel_prefix, ignores = stack.pop()
+            files, subdirs = _list_dir(dir_path, rel_prefix, ignores, *args)
+            yield from files
+            stack.extend(reversed(subdirs))
+        return
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="securepatch-walk") as executor:
+        stack = [executor.submit(_list_dir, os.fspath(root), "", (), *args)]
+        while stack:
+            files, subdirs = stack.pop().result()
+            yield from files
+            futures = [executor.submit(_list_dir, *subdir, *args) for subdir in subdirs]
+            stack.extend(reversed(futures))
+
+
+class FileEntry:
+    """The part of ``os.DirEntry`` the scanner uses, for a file found by name."""
+
+    __slots__ = ("path", "name")
+
+    def __init__(self, path: str):
+        self.path = path
+        self.name = os.path.basename(path)
+
+    def stat(self):
+        return os.stat(self.path, follow_symlinks=False)
+
+    def is_symlink(self):
+        return os.path.islink(self.path)
+
+
+def select_files(root, rel_paths, extensions=None, use_ignore_files=False):
+    """Yields a FileEntry per path of ``rel_paths`` that ``walk_files`` would yield.
+
+    ``rel_paths`` are ``/``-separated and relative to ``root``; they come out
+    in the given order. Only the directories leading to them are checked
+    against the excludes and searched for ignore files, so this costs
+    nothing like a walk of a large tree.
+    """
+    root = os.fspath(root)
+    dirs = {}
+
+    def ignores_for(rel_prefix):
+        # None when the directory would have been pruned.
+        if rel_prefix in dirs:
+            return dirs[rel_prefix]
+        ignores = ()
+        if rel_prefix:
+            parent, _, name = rel_prefix[:-1].rpartition("/")
+            ignores = ignores_for(parent + "/" if parent else "")
+            if ignores is not None and (
+                name in DEFAULT_EXCLUDES
+                or os.path.islink(os.path.join(root, rel_prefix[:-1]))
+                or (ignores and _is_ignored(ignores, rel_prefix[:-1], True))
+            ):
+                ignores = None
+        if ignores is not None and use_ignore_files:
+            ignores = _with_ignore_files(os.path.join(root, rel_prefix), rel_prefix, ignores)
+        dirs[rel_prefix] = ignores
+        return ignores
+
+    for rel_path in rel_paths:
+        rel_dir, _, name = rel_path.rpartition("/")
+        if extensions is not None and os.path.splitext(name)[1].lower() not in extensions:
+            continue
+        ignores = ignores_for(rel_dir + "/" if rel_dir else "")
+        if ignores is None or (ignores and _is_ignored(ignores, rel_path, False)):
+            continue
+        path = os.path.join(root, *rel_path.split("/"))
+        if os.path.isfile(path) and not os.path.islink(path):
+            yield FileEntry(path)
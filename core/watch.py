@@ -0,0 +1,263 @@
+﻿import dataclasses
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Optional, Set, Tuple
+
+from core.baseline import baseline_path, fingerprint, load_baseline
+from core.config import DEFAULT_EXCLUDES, TEXT_EXTENSIONS
+from core.models import FindingsDelta
+from core.scanner import scan_file
+from core.walker import walk_files
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # optional: stat polling is used instead
+    FileSystemEventHandler = object
+    Observer = None
+
+POLL_INTERVAL = 0.5
+DEBOUNCE = 0.02
+HOT_INTERVAL = 0.05
+HOT_FILES = 32
+
+
+def _finding_key(finding):
+    return finding.rule_id, finding.line, finding.column, finding.message, finding.snippet
+
+
+def _delta(old, new):
+    old_keys = {_finding_key(f) for f in old}
+    new_keys = {_finding_key(f) for f in new}
+    added = [f for f in new if _finding_key(f) not in old_keys]
+    resolved = [f for f in old if _finding_key(f) not in new_keys]
+    return added, resolved
+
+
+class _EventHandler(FileSystemEventHandler):
+    def __init__(self, watcher):
+        super().__init__()
+        self.watcher = watcher
+
+    def on_any_event(self, event):
+        if event.is_directory:
+            return
+        for path in (event.src_path, getattr(event, "dest_path", None)):
+            if path:
+                self.watcher._mark(os.fsdecode(path))
+
+
+class ProjectWatcher:
+    """Keeps the findings of a project up to date while its files change.
+
+    ``start()`` scans the whole tree once and returns every finding as added;
+    ``deltas()`` then yields a FindingsDelta each time files were saved,
+    created or removed, until ``stop()`` is called from another thread. Only
+    the touched files are read again, with the scanner's loaded ruleset.
+
+    Changes are picked up from ``watchdog`` events when that package is
+    installed and from stat snapshots of the tree taken every
+    ``poll_interval`` seconds otherwise (each snapshot walks the whole
+    tree, so keep it well above the debounce on large projects). Between
+    snapshots the ``HOT_FILES`` most recently changed files are checked
+    every ``HOT_INTERVAL`` seconds, so saving a file again is seen within
+    about 100 ms, but the first save of any other file can take up to
+    ``poll_interval``: only watchdog meets that target for every file. A
+    burst of changes is handled once no new change has shown up for
+    ``debounce`` seconds. With watchdog, new
+    files are filtered by extension and excluded directories but not by
+    ignore files. External tools are not run.
+    """
+
+    def __init__(self, scanner, project_path: str, options, poll_interval=POLL_INTERVAL,
+                 debounce=DEBOUNCE, use_watchdog=None):
+        self.scanner = scanner
+        self.root = Path(project_path).resolve()
+        self.options = dataclasses.replace(options, use_external_tools=False)
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self.use_watchdog = Observer is not None if use_watchdog is None else use_watchdog
+        self._findings: Dict[str, list] = {}
+        self._snapshot: Dict[str, Tuple[int, int]] = {}
+        self._baseline: FrozenSet[str] = frozenset()
+        self._stopped = threading.Event()
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._marked: Set[str] = set()
+        self._observer: Optional[Any] = None
+        self._hot: Dict[str, None] = {}
+        self._walked = 0.0
+
+    def _stat_tree(self):
+        snapshot = {}
+        # Walked paths all start with the root, so slicing gives the same
+        # relative path as relative_path() at a fraction of the cost.
+        prefix = len(os.path.join(os.fspath(self.root), ""))
+        for entry in walk_files(self.root, TEXT_EXTENSIONS, use_ignore_files=self.options.use_ignore_files):
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            snapshot[entry.path[prefix:]] = (stat.st_size, stat.st_mtime_ns)
+        return snapshot
+
+    def _stat_paths(self, rel_paths):
+        snapshot = {}
+        for rel_path in rel_paths:
+            try:
+                stat = os.stat(self.root / rel_path)
+            except OSError:
+                continue
+            snapshot[rel_path] = (stat.st_size, stat.st_mtime_ns)
+        return snapshot
+
+    def start(self) -> FindingsDelta:
+        """Scans the project and starts watching it."""
+        if self.use_watchdog and Observer is not None:
+            observer = Observer()
+            observer.schedule(_EventHandler(self), str(self.root), recursive=True)
+            observer.start()
+            self._observer = observer
+        # Taking the snapshot first means a file saved during the scan is
+        # seen as changed on the first poll instead of being missed.
+        self._snapshot = self._stat_tree()
+        self._walked = time.monotonic()
+        if self.options.use_baseline:
+            try:
+                self._baseline = load_baseline(baseline_path(self.root, self.options.baseline_path))
+            except (OSError, ValueError, KeyError):
+                self._baseline = frozenset()
+        result = self.scanner.scan(str(self.root), self.options)
+        self._findings = {}
+        for finding in result.findings:
+            self._findings.setdefault(finding.file_path, []).append(finding)
+        return FindingsDelta(list(result.findings), [], sorted(self._snapshot), list(result.errors))
+
+    def stop(self):
+        self._stopped.set()
+        self._wake.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+
+    def findings(self):
+        """All current findings, grouped by file."""
+        return [finding for findings in list(self._findings.values()) for finding in findings]
+
+    def _mark(self, path):
+        rel_path = os.path.relpath(path, self.root)
+        if rel_path not in self._snapshot:
+            parts = Path(rel_path).parts
+            if (os.path.splitext(rel_path)[1].lower() not in TEXT_EXTENSIONS
+                    or rel_path.startswith("..") or any(part in DEFAULT_EXCLUDES for part in parts)):
+                return
+        with self._lock:
+            self._marked.add(rel_path)
+        self._wake.set()
+
+    def _restat(self, rel_paths):
+        current = self._stat_paths(rel_paths)
+        changed = {path for path in rel_paths if current.get(path) != self._snapshot.get(path)}
+        self._snapshot.update(current)
+        for path in rel_paths:
+            if path not in current:
+                self._snapshot.pop(path, None)
+        return changed
+
+    def _remember(self, rel_paths):
+        for rel_path in rel_paths:
+            self._hot.pop(rel_path, None)
+            self._hot[rel_path] = None
+        while len(self._hot) > HOT_FILES:
+            del self._hot[next(iter(self._hot))]
+
+    def _changes(self, pending):
+        """Relative paths changed since the last call.
+
+        While changes are ``pending`` (waiting out the debounce) polling only
+        re-stats those files rather than walking the whole tree again, and
+        until ``poll_interval`` has passed since the last walk it only
+        re-stats the recently changed files.
+        """
+        if self._observer is not None:
+            with self._lock:
+                changed, self._marked = self._marked, set()
+            return changed
+        if pending:
+            return self._restat(pending)
+        if time.monotonic() - self._walked < self.poll_interval:
+            return self._restat(list(self._hot))
+        current = self._stat_tree()
+        self._walked = time.monotonic()
+        changed = {path for path, stat in current.items() if self._snapshot.get(path) != stat}
+        changed.update(path for path in self._snapshot if path not in current)
+        self._snapshot = current
+        return changed
+
+    def _wait(self, timeout):
+        if self._observer is not None:
+            self._wake.wait(timeout)
+            self._wake.clear()
+        else:
+            self._stopped.wait(timeout)
+
+    def deltas(self):
+        """Yields a FindingsDelta per debounced burst of changes."""
+        pending = set()
+        last_change = None
+        while not self._stopped.is_set():
+            changed = self._changes(pending)
+            now = time.monotonic()
+            if changed:
+                pending |= changed
+                last_change = now
+                self._remember(changed)
+            if pending and now - last_change >= self.debounce:
+                yield self.rescan(pending)
+                pending = set()
+                continue
+            if pending:
+                self._wait(self.debounce)
+            elif self._observer is None and self._hot:
+                self._wait(min(HOT_INTERVAL, max(0.0, self._walked + self.poll_interval - now)))
+            else:
+                self._wait(self.poll_interval)
+
+    def rescan(self, rel_paths) -> FindingsDelta:
+        """Scans ``rel_paths`` again and returns what changed in their findings.
+
+        A file that cannot be read keeps its previous findings; only the
+        error is reported for it.
+        """
+        added = []
+        resolved = []
+        errors = []
+        for rel_path in sorted(rel_paths):
+            path = self.root / rel_path
+            old = self._findings.get(rel_path, [])
+            if path.is_file():
+                _, new, error, _ = scan_file(self.scanner.ruleset, path, self.root)
+                if error:
+                    errors.append(error)
+                    continue
+                if self._baseline:
+                    new = [finding for finding in new if fingerprint(finding) not in self._baseline]
+                if self._observer is not None:
+                    try:
+                        stat = path.stat()
+                        self._snapshot[rel_path] = (stat.st_size, stat.st_mtime_ns)
+                    except OSError:
+                        pass
+            else:
+                new = []
+                self._snapshot.pop(rel_path, None)
+            file_added, file_resolved = _delta(old, new)
+            added.extend(file_added)
+            resolved.extend(file_resolved)
+            if new:
+                self._findings[rel_path] = new
+            else:
+                self._findings.pop(rel_path, None)
+        return FindingsDelta(added, resolved, sorted(rel_paths), errors)
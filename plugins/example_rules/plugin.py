@@ -1,35 +1,12 @@
 ﻿from core.plugins import PluginSpec
-from core.models import Finding, Severity
-from core.rules.base import Rule
-
-
-def sample_rule_scan(file_path, text):
-    findings = []
-    for idx, line in enumerate(text.splitlines(), start=1):
-        if "TODO:SECURITY" in line:
-            findings.append(Finding(
-                id=f"PLG001:{file_path}:{idx}",
-                title="Security TODO",
-                description="Security TODO marker found",
-                severity=Severity.LOW,
-                file_path=file_path,
-                line=idx,
-                column=1,
-                cwe=None,
-                owasp=None,
-                rule_id="PLG001",
-                message="TODO:SECURITY marker",
-                snippet=line.strip(),
-                fixable=False,
-                fixer_id=None,
-            ))
-    return findings
+from core.models import Severity
+from core.rules.spec import RuleSpec, compile_rules
 
 
 PLUGIN = PluginSpec(
     name="example_rules",
-    rules=[
-        Rule(
+    rules=compile_rules([
+        RuleSpec(
             id="PLG001",
             title="Security TODO",
             description="Security TODO marker",
@@ -37,10 +14,10 @@ PLUGIN = PluginSpec(
             cwe=None,
             owasp=None,
             languages={"python", "javascript"},
-            scan=sample_rule_scan,
             message="TODO security marker",
-            fixer_id=None,
-        )
-    ],
+            pattern=r"TODO:SECURITY",
+            finding_message="TODO:SECURITY marker",
+        ),
+    ]),
     fixers={},
 )
@@ -0,0 +1,52 @@
+﻿from app import cli
+from core.baseline import BASELINE_FILE_NAME, fingerprint
+from core.config import ScanOptions
+from core.scanner import Scanner
+
+VULN = "import os\nos.system('ls ' + name)\n"
+
+
+def _options(**kwargs):
+    return ScanOptions(use_external_tools=False, **kwargs)
+
+
+def test_inline_comments_suppress_listed_rules(tmp_path):
+    (tmp_path / "a.py").write_text(
+        "import os\n"
+        "os.system('ls ' + name)  # securepatch: ignore[PY002]\n"
+        "os.system('rm ' + name)  # securepatch: ignore[PY999]\n"
+        "os.system('cp ' + name)  # securepatch: ignore\n",
+        encoding="utf-8",
+    )
+    (tmp_path / "b.js").write_text(
+        "eval(userInput); // securepatch: ignore[JS003, JS001]\nel.innerHTML = data;\n", encoding="utf-8"
+    )
+    findings = Scanner().scan(str(tmp_path), _options()).findings
+    assert sorted((f.file_path, f.rule_id, f.line) for f in findings) == [
+        ("a.py", "PY002", 3), ("b.js", "JS003", 2),
+    ]
+
+
+def test_baseline_hides_accepted_findings_after_lines_move(tmp_path):
+    source = tmp_path / "app.py"
+    source.write_text(VULN, encoding="utf-8")
+    scanner = Scanner()
+    first = scanner.scan(str(tmp_path), _options())
+    assert [f.rule_id for f in first.findings] == ["PY002"]
+    assert cli.main(["baseline", str(tmp_path), "--base", "main"]) == cli.EXIT_ERROR
+    assert not (tmp_path / BASELINE_FILE_NAME).exists()
+    assert cli.main(["baseline", str(tmp_path)]) == cli.EXIT_OK
+    assert (tmp_path / BASELINE_FILE_NAME).exists()
+
+    source.write_text("import sys\n\n" + VULN.replace("os.system", "    os.system") + "os.system(cmd)\n", encoding="utf-8")
+    result = scanner.scan(str(tmp_path), _options())
+    assert [(f.rule_id, f.line, f.snippet) for f in result.findings] == [("PY002", 5, "os.system(cmd)")]
+    assert result.suppressed == 1
+    moved = scanner.scan(str(tmp_path), _options(use_baseline=False)).findings
+    assert fingerprint(moved[0]) == fingerprint(first.findings[0]) and moved[0].line != first.findings[0].line
+    assert len(moved) == 2
+
+    (tmp_path / BASELINE_FILE_NAME).write_text("not json", encoding="utf-8")
+    broken = scanner.scan(str(tmp_path), _options())
+    assert len(broken.findings) == 2
+    assert broken.errors[0].startswith("baseline not applied")
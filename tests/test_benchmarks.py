@@ -0,0 +1,21 @@
+﻿from benchmarks.corpus import generate_corpus
+from benchmarks.run import run_suite
+
+
+def test_generate_corpus_is_deterministic(tmp_path):
+    first = tmp_path / "a"
+    second = tmp_path / "b"
+    manifest = generate_corpus(first, files=6, lines_per_file=20, vuln_ratio=0.3, large_files=1, large_file_bytes=2000)
+    generate_corpus(second, files=6, lines_per_file=20, vuln_ratio=0.3, large_files=1, large_file_bytes=2000)
+    files_a = sorted(p.relative_to(first) for p in first.rglob("*") if p.is_file())
+    files_b = sorted(p.relative_to(second) for p in second.rglob("*") if p.is_file())
+    assert files_a == files_b and len(files_a) == 7
+    assert all((first / p).read_bytes() == (second / p).read_bytes() for p in files_a)
+    assert manifest["bytes"] == sum((first / p).stat().st_size for p in files_a)
+
+
+def test_run_suite_reports_every_stage():
+    report = run_suite(files=8, lines_per_file=30, vuln_ratio=0.3, repeat=1)
+    assert report["results"]["findings"] > 0
+    assert set(report["timings"]) == {"scan", "rules", "generate_patch", "write_reports", "apply_patch"}
+    assert "PY001" in report["timings"]["rules"]
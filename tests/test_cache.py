@@ -0,0 +1,90 @@
+﻿import dataclasses
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from core.cache import ScanCache, ruleset_fingerprint
+from core.config import ScanOptions
+from core.models import Severity
+from core.rules.base import Rule
+from core.scanner import Scanner
+
+
+def _counting_scanner(scanned):
+    def count_scan(file_path, text):
+        scanned.append(file_path)
+        return []
+
+    scanner = Scanner()
+    scanner.rules.append(Rule(
+        id="COUNT001",
+        title="count",
+        description="counts scanned files",
+        severity=Severity.LOW,
+        cwe=None,
+        owasp=None,
+        languages={"python"},
+        scan=count_scan,
+        message="count",
+        fixer_id=None,
+    ))
+    return scanner
+
+
+def test_cache_rescans_only_changed_files(tmp_path):
+    project = tmp_path / "project"
+    project.mkdir()
+    for idx in range(5):
+        (project / f"mod_{idx}.py").write_text("import os\nos.system(cmd)\n", encoding="utf-8")
+    options = ScanOptions(use_external_tools=False, use_cache=True)
+    scanned = []
+    scanner = _counting_scanner(scanned)
+
+    first = scanner.scan(str(project), options)
+    assert len(scanned) == 5
+    assert (project / ".securepatch" / "scan-cache.sqlite").exists()
+
+    scanned.clear()
+    second = scanner.scan(str(project), options)
+    assert scanned == []
+    assert [f.id for f in second.findings] == [f.id for f in first.findings]
+    assert second.findings[0].severity == Severity.HIGH
+
+    (project / "mod_1.py").write_text("import yaml\nyaml.load(s)\n", encoding="utf-8")
+    stat = (project / "mod_2.py").stat()
+    os.utime(project / "mod_2.py", ns=(stat.st_atime_ns, stat.st_mtime_ns + 5_000_000_000))
+    (project / "mod_4.py").unlink()
+    scanned.clear()
+    third = scanner.scan(str(project), options)
+    assert scanned == ["mod_1.py"]
+    assert sorted(f.rule_id for f in third.findings) == ["PY002", "PY002", "PY002", "PY004"]
+
+
+def test_cache_drops_entries_when_rules_change(tmp_path):
+    rules = Scanner().rules
+    db_path = tmp_path / "cache.sqlite"
+    cache = ScanCache(db_path, ruleset_fingerprint(rules))
+    cache.store("a.py", 1, 1, "hash", "python", [], None)
+    cache.close()
+
+    cache = ScanCache(db_path, ruleset_fingerprint(rules))
+    assert cache.lookup("a.py", 1, 1) == ("python", [], None)
+    cache.close()
+    cache = ScanCache(db_path, ruleset_fingerprint(rules[1:]))
+    assert cache.lookup("a.py", 1, 1) is None
+    cache.close()
+
+    idx = next(i for i, rule in enumerate(rules) if rule.line_pattern and rule.line_pattern.code_only)
+    masked = rules[idx]
+    unmasked = dataclasses.replace(masked, line_pattern=dataclasses.replace(masked.line_pattern, code_only=False))
+    assert ruleset_fingerprint(rules[:idx] + [unmasked] + rules[idx + 1:]) != ruleset_fingerprint(rules)
+
+
+def test_ruleset_fingerprint_is_the_same_in_a_new_process():
+    code = "from core.cache import ruleset_fingerprint; from core.scanner import Scanner; print(ruleset_fingerprint(Scanner().rules))"
+    proc = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True,
+        cwd=Path(__file__).resolve().parent.parent, check=True,
+    )
+    assert proc.stdout.strip() == ruleset_fingerprint(Scanner().rules)
@@ -0,0 +1,58 @@
+﻿import json
+import subprocess
+import sys
+from pathlib import Path
+
+from app import cli
+
+VULN = "import os, requests\nos.system('ls ' + name)\nrequests.get(url, verify=False)\n"
+
+
+def _project(tmp_path):
+    (tmp_path / "app.py").write_text(VULN, encoding="utf-8")
+    return str(tmp_path)
+
+
+def test_exit_code_follows_severity_threshold(tmp_path, capsys):
+    project = _project(tmp_path)
+    assert cli.main(["scan", project]) == cli.EXIT_FINDINGS
+    assert "app.py:2:1: [high] PY002" in capsys.readouterr().out
+    assert cli.main(["scan", project, "--fail-on", "critical"]) == cli.EXIT_OK
+    assert cli.main(["scan", str(tmp_path / "missing")]) == cli.EXIT_ERROR
+
+
+def test_machine_readable_formats(tmp_path, capsys):
+    project = _project(tmp_path)
+    cli.main(["scan", project, "--format", "json", "--fail-on", "never"])
+    findings = json.loads(capsys.readouterr().out)
+    cli.main(["scan", project, "--format", "ndjson", "--fail-on", "never"])
+    assert [json.loads(line) for line in capsys.readouterr().out.splitlines()] == findings
+    output = tmp_path / "out.sarif"
+    cli.main(["scan", project, "--format", "sarif", "--output", str(output), "--fail-on", "never"])
+    sarif = json.loads(output.read_text(encoding="utf-8"))
+    assert [r["ruleId"] for r in sarif["runs"][0]["results"]] == [f["rule_id"] for f in findings]
+
+
+def test_apply_fixes_and_rollback_restores(tmp_path, capsys):
+    project = _project(tmp_path)
+    assert cli.main(["patch", project, "--fail-on", "never"]) == cli.EXIT_OK
+    assert "+requests.get(url, verify=True)" in capsys.readouterr().out
+    # PY002 has no fixer, so the high finding remains after the apply.
+    assert cli.main(["apply", project, "--fail-on", "medium", "--transactional"]) == cli.EXIT_FINDINGS
+    assert cli.main(["apply", project, "--fail-on", "never"]) == cli.EXIT_OK
+    assert "verify=True" in (tmp_path / "app.py").read_text(encoding="utf-8")
+    assert cli.main(["rollback", project]) == cli.EXIT_OK
+    assert (tmp_path / "app.py").read_text(encoding="utf-8") == VULN
+
+
+def test_scan_does_not_import_gui_or_heavy_modules(tmp_path):
+    project = _project(tmp_path)
+    code = (
+        "import sys; from app import cli; cli.main(['scan', sys.argv[1], '--fail-on', 'never']); "
+        "print(sorted(m for m in ('PySide6', 'difflib', 'sqlite3', 'core.report', 'core.tooling') if m in sys.modules))"
+    )
+    proc = subprocess.run(
+        [sys.executable, "-c", code, project], capture_output=True, text=True,
+        cwd=Path(__file__).resolve().parent.parent, check=True,
+    )
+    assert proc.stdout.splitlines()[-1] == "[]"
@@ -1,4 +1,8 @@
-﻿from core.diff import unified_diff
+﻿import difflib
+import random
+
+from core.diff import compute_diffs, unified_diff
+from core.models import FileChange
 
 
 def test_unified_diff():
@@ -7,3 +11,31 @@ def test_unified_diff():
     diff = unified_diff(original, updated, "file.txt")
     assert "-a" in diff
     assert "+b" in diff
+
+
+def _difflib_diff(original, updated, path):
+    return "\n".join(difflib.unified_diff(
+        original.splitlines(), updated.splitlines(), f"a/{path}", f"b/{path}", lineterm="",
+    ))
+
+
+def test_line_replacement_diff_matches_difflib():
+    rng = random.Random(7)
+    for _ in range(50):
+        lines = [f"line {i}" for i in range(rng.randint(1, 60))]
+        updated = list(lines)
+        for index in rng.sample(range(len(lines)), rng.randint(0, min(6, len(lines)))):
+            updated[index] = lines[index] + " # fixed"
+        original_text = "\n".join(lines) + "\n"
+        updated_text = "\n".join(updated) + "\n"
+        assert unified_diff(original_text, updated_text, "f.py") == _difflib_diff(original_text, updated_text, "f.py")
+
+
+def test_file_change_diffs_are_computed_on_demand():
+    changes = [FileChange(f"f{i}.py", "a\nb\n", f"a\nb{i}\n", "") for i in range(5)]
+    assert all(change._diff is None for change in changes)
+    assert "+b3" in changes[3].diff
+    compute_diffs(changes, workers=2, batch_size=2)
+    assert [change.diff for change in changes] == [
+        _difflib_diff(c.original_text, c.updated_text, c.file_path) for c in changes
+    ]
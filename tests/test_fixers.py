@@ -1,5 +1,7 @@
 ﻿from core.fixers.python_fixers import YamlSafeLoadFixer, RequestsVerifyFixer, SubprocessShellFixer
 from core.fixers.js_fixers import InnerHtmlToTextContentFixer
+from core.config import ScanOptions
+from core.engine import ScanEngine
 
 
 def test_yaml_safe_load():
@@ -32,3 +34,35 @@ def test_inner_html_fix():
     result = fixer.apply("x.js", text)
     assert result
     assert "textContent" in result.updated_text
+
+
+def test_fixer_only_touches_target_lines():
+    text = "requests.get(a, verify=False)\r\nrequests.get(b, verify=False)\r\n"
+    result = RequestsVerifyFixer().apply("x.py", text, lines=[2])
+    assert result.updated_text == "requests.get(a, verify=False)\r\nrequests.get(b, verify=True)\r\n"
+    assert [item.line for item in result.explanations] == [2]
+
+
+def test_generate_patch_applies_every_fixer_in_one_pass(tmp_path):
+    source = "".join([
+        "import yaml, requests, subprocess\n",
+        "yaml.load(a); requests.get(u, verify=False)\n",
+        "subprocess.run([\"ls\"], shell=True)\n",
+        "requests.get(v, verify=False)\n",
+    ])
+    (tmp_path / "app.py").write_text(source, encoding="utf-8")
+    engine = ScanEngine()
+    options = ScanOptions(use_external_tools=False)
+    result = engine.scan_project(str(tmp_path), options)
+    plan = engine.generate_patch(result, options)
+    assert len(plan.file_changes) == 1
+    change = plan.file_changes[0]
+    assert change.updated_text == "".join([
+        "import yaml, requests, subprocess\n",
+        "yaml.safe_load(a); requests.get(u, verify=True)\n",
+        "subprocess.run([\"ls\"], shell=False)\n",
+        "requests.get(v, verify=True)\n",
+    ])
+    assert sorted(change.applied_rules) == ["PY001", "PY004", "PY007", "PY007"]
+    assert [item.line for item in change.line_explanations] == [2, 2, 3, 4]
+    assert not plan.skipped
@@ -0,0 +1,84 @@
+﻿import subprocess
+
+import pytest
+
+from app import cli
+from core.config import ScanOptions
+from core.gitdiff import GitError, changed_lines, in_ranges, parse_changed_lines
+from core.scanner import Scanner
+
+VULN = "import os\nos.system('ls ' + name)\n"
+
+
+def _git(repo, *args):
+    subprocess.run(
+        ["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+        cwd=repo, check=True, capture_output=True,
+    )
+
+
+def _repo(tmp_path):
+    repo = tmp_path / "repo"
+    (repo / "src").mkdir(parents=True)
+    (repo / "src" / "old.py").write_text(VULN, encoding="utf-8")
+    (repo / "src" / "edited.py").write_text("x = 1\n" + VULN, encoding="utf-8")
+    (repo / "gone.py").write_text("print('unrelated')\n", encoding="utf-8")
+    _git(repo, "init", "-q", "-b", "main")
+    _git(repo, "add", ".")
+    _git(repo, "commit", "-q", "-m", "base")
+    _git(repo, "checkout", "-q", "-b", "feature")
+    (repo / "src" / "edited.py").write_text("x = 1\n" + VULN + "os.system(cmd)\n", encoding="utf-8")
+    (repo / "src" / "added.py").write_text("y = 2\n" + VULN, encoding="utf-8")
+    _git(repo, "rm", "-q", "gone.py")
+    _git(repo, "add", ".")
+    _git(repo, "commit", "-q", "-m", "feature")
+    (repo / "untracked.py").write_text(VULN, encoding="utf-8")
+    return repo
+
+
+def test_parse_changed_lines_reads_new_side_ranges():
+    diff = (
+        "diff --git a/a.py b/a.py\n--- a/a.py\n+++ b/a.py\n"
+        "@@ -1 +1 @@\n-x\n+y\n@@ -5,2 +5,0 @@\n-p\n-q\n@@ -9,0 +8,3 @@\n+a\n+b\n+c\n"
+        "diff --git a/gone.py b/gone.py\n--- a/gone.py\n+++ /dev/null\n@@ -1 +0,0 @@\n-z\n"
+        'diff --git "a/sp\\tace.py" "b/sp\\tace.py"\n--- "a/sp\\tace.py"\n+++ "b/sp\\tace.py"\n@@ -0,0 +1,2 @@\n'
+    )
+    changes = parse_changed_lines(diff)
+    assert changes == {"a.py": [(1, 1), (8, 10)], "sp\tace.py": [(1, 2)]}
+    assert in_ranges(changes["a.py"], 9) and not in_ranges(changes["a.py"], 5)
+    assert in_ranges(None, 123)
+
+
+def test_content_lines_that_look_like_headers_stay_in_their_hunk():
+    diff = (
+        "diff --git a/a.py b/a.py\n--- a/a.py\n+++ b/a.py\n"
+        "@@ -1,2 +1,4 @@\n--- old\n+++ counter\n+++ b/other.py\n x\n+y\n"
+        "@@ -10 +12,0 @@\n-gone\n"
+        "@@ -20,0 +21 @@\n+z\n\\ No newline at end of file\n"
+    )
+    assert parse_changed_lines(diff) == {"a.py": [(1, 4), (21, 21)]}
+
+
+def test_scan_limited_to_files_and_lines_changed_since_base(tmp_path):
+    repo = _repo(tmp_path)
+    assert changed_lines(repo, "main") == {
+        "src/edited.py": [(4, 4)],
+        "src/added.py": [(1, 3)],
+        "untracked.py": None,
+    }
+
+    scanner = Scanner()
+    options = ScanOptions(use_external_tools=False, git_base="main")
+    files = scanner.scan(str(repo), options).findings
+    assert sorted({f.file_path.replace("\\", "/") for f in files}) == ["src/added.py", "src/edited.py", "untracked.py"]
+    assert [f.line for f in files if f.file_path.endswith("edited.py")] == [3, 4]
+
+    options.changed_lines_only = True
+    lines = scanner.scan(str(repo), options).findings
+    assert [f.line for f in lines if f.file_path.endswith("edited.py")] == [4]
+    assert len(lines) == len(files) - 1
+
+    with pytest.raises(GitError):
+        scanner.scan(str(repo), ScanOptions(use_external_tools=False, git_base="no-such-ref"))
+    assert cli.main(["scan", str(repo), "--base", "no-such-ref"]) == cli.EXIT_ERROR
+    assert cli.main(["scan", str(repo / "src"), "--base", "main", "--changed-lines", "--fail-on", "never"]) == cli.EXIT_OK
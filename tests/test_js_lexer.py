@@ -0,0 +1,42 @@
+﻿from core.rules import get_builtin_rules
+from core.rules.js_lexer import js_literal_spans, mask_js
+from core.rules.ruleset import RuleSet
+
+
+def test_mask_blanks_comments_and_literals_in_place():
+    text = (
+        "eval(x); // eval(y)\r\n"
+        "const s = \"eval(z)\"; /* eval(q)\n*/ t = `a ${eval(b)} c`;\n"
+        "r = /eval\\(/g; q = a / b / c;"
+    )
+    masked = mask_js(text)
+    assert len(masked) == len(text)
+    assert masked.splitlines() == [
+        "eval(x);           ",
+        "const s = \"       \";" + " " * 11,
+        "   t = `  ${eval(b)}  `;",
+        "r = /      /g; q = a / b / c;",
+    ]
+
+
+def test_literal_spans_report_kinds():
+    spans = list(js_literal_spans("a = 'x'; // c\nb = /re/.test(`t${'y'}`)"))
+    assert [kind for kind, _, _ in spans] == ["string", "comment", "regex", "template", "string", "template"]
+
+
+def test_js_rules_ignore_comments_and_strings():
+    rules = get_builtin_rules()
+    text = (
+        "// eval(legacy) and el.innerHTML = x were removed\n"
+        "const help = 'call document.write(x) to debug';\n"
+        "const key = \"sk_live_1234567890abcdefgh\";\n"
+        "el.innerHTML = render(`<b>${Math.random()}</b>`);\n"
+        "var b=function(){return 1};eval(payload);\n"
+    )
+    by_ruleset = RuleSet(rules).scan("app.js", text, "javascript")
+    per_rule = [f for rule in rules if "javascript" in rule.languages for f in rule.scan("app.js", text)]
+    assert [f.id for f in by_ruleset] == [f.id for f in per_rule]
+    assert sorted((f.rule_id, f.line) for f in by_ruleset) == [
+        ("JS001", 5), ("JS003", 4), ("JS004", 3), ("JS005", 4),
+    ]
+    assert by_ruleset[0].snippet == "var b=function(){return 1};eval(payload);"
@@ -0,0 +1,68 @@
+﻿from core.config import ScanOptions
+from core.models import Severity
+from core.rules.base import Rule
+from core.scanner import Scanner
+
+
+def _make_tree(root):
+    for idx in range(24):
+        (root / f"mod_{idx}.py").write_text(
+            "import os\nos.system(cmd)\nrequests.get(u, verify=False)\n" * (idx % 3),
+            encoding="utf-8",
+        )
+        (root / f"page_{idx}.js").write_text("el.innerHTML = x;\n", encoding="utf-8")
+    (root / "blob.py").write_bytes(b"\x00\x01\x02")
+
+
+def _summary(result):
+    return [f.id for f in result.findings], result.language_stats, result.errors
+
+
+def test_parallel_scan_matches_serial(tmp_path):
+    _make_tree(tmp_path)
+    scanner = Scanner()
+    serial = scanner.scan(str(tmp_path), ScanOptions(use_external_tools=False))
+    parallel = scanner.scan(str(tmp_path), ScanOptions(
+        use_external_tools=False, parallel=True, workers=2, batch_size=5,
+    ))
+    assert _summary(parallel) == _summary(serial)
+    assert len(serial.findings) > 24
+
+
+def test_parallel_scan_merges_worker_profiles(tmp_path):
+    _make_tree(tmp_path)
+    result = Scanner().scan(str(tmp_path), ScanOptions(
+        use_external_tools=False, parallel=True, workers=2, batch_size=5, profile=True,
+    ))
+    profile = result.profile.to_dict()
+    assert profile["files_scanned"] == 48
+    assert sum(rule["matches"] for rule in profile["rules"].values()) == len(result.findings)
+
+
+def test_parallel_scan_falls_back_for_unpicklable_rules(tmp_path):
+    _make_tree(tmp_path)
+    scanner = Scanner()
+    seen = []
+
+    def local_scan(file_path, text):
+        seen.append(file_path)
+        return []
+
+    scanner.rules.append(Rule(
+        id="LOCAL001",
+        title="local",
+        description="local rule",
+        severity=Severity.LOW,
+        cwe=None,
+        owasp=None,
+        languages={"python"},
+        scan=local_scan,
+        message="local",
+        fixer_id=None,
+    ))
+    result = scanner.scan(str(tmp_path), ScanOptions(
+        use_external_tools=False, parallel=True, workers=2, batch_size=5,
+    ))
+    assert result.language_stats == {"python": 24, "javascript": 24}
+    assert len(result.errors) == 1
+    assert len(seen) == 24
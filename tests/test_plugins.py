@@ -0,0 +1,97 @@
+﻿import os
+
+from core.plugins import PluginRegistry
+from core.rules.ruleset import RuleSet
+
+PLUGIN_SOURCE = """from core.models import Severity
+from core.plugins import PluginSpec
+from core.rules.spec import RuleSpec, compile_rules
+
+with open({log!r}, "a", encoding="utf-8") as log:
+    log.write({name!r} + "\\n")
+
+PLUGIN = PluginSpec(
+    name={name!r},
+    rules=compile_rules([
+        RuleSpec(
+            id={rule_id!r},
+            title="marker",
+            description="marker",
+            severity=Severity.LOW,
+            cwe=None,
+            owasp=None,
+            languages={{{language!r}}},
+            message="marker",
+            pattern=r"{marker}",
+            finding_message="marker found",
+        ),
+    ]),
+    fixers={{}},
+)
+"""
+
+
+def _write_plugin(plugins_dir, name, rule_id, language, marker):
+    plugin_dir = plugins_dir / name
+    plugin_dir.mkdir(parents=True, exist_ok=True)
+    log = str(plugins_dir.parent / "imports.log")
+    source = PLUGIN_SOURCE.format(name=name, rule_id=rule_id, language=language, marker=marker, log=log)
+    (plugin_dir / "plugin.py").write_text(source, encoding="utf-8")
+
+
+def _imports(plugins_dir):
+    """Plugins imported since the last call, in import order."""
+    log = plugins_dir.parent / "imports.log"
+    if not log.exists():
+        return []
+    names = log.read_text(encoding="utf-8").split()
+    log.unlink()
+    return names
+
+
+def test_manifest_lets_registry_import_plugins_only_for_their_language(tmp_path):
+    plugins_dir = tmp_path / "plugins"
+    _write_plugin(plugins_dir, "py_rules", "TPY001", "python", "PY_MARKER")
+    _write_plugin(plugins_dir, "js_rules", "TJS001", "javascript", "JS_MARKER")
+    first = PluginRegistry(plugins_dir)
+    assert _imports(plugins_dir) == ["js_rules", "py_rules"]
+    assert (plugins_dir / ".manifest.json").exists()
+    assert first.manifest()["py_rules"]["languages"] == ["python"]
+
+    registry = PluginRegistry(plugins_dir)
+    rules = registry.rules()
+    assert [rule.id for rule in rules] == ["TJS001", "TPY001"]
+    assert registry.loaded() == []
+    assert _imports(plugins_dir) == []
+
+    ruleset = RuleSet(rules)
+    findings = ruleset.scan("a.py", "x = 1  # PY_MARKER\n", "python")
+    assert [f.rule_id for f in findings] == ["TPY001"]
+    assert registry.loaded() == ["py_rules"]
+    ruleset.scan("b.py", "PY_MARKER\n", "python")
+    assert _imports(plugins_dir) == ["py_rules"]
+
+
+def test_edited_plugin_is_described_again(tmp_path):
+    plugins_dir = tmp_path / "plugins"
+    _write_plugin(plugins_dir, "rules", "TPY001", "python", "OLD_MARKER")
+    PluginRegistry(plugins_dir)
+    _write_plugin(plugins_dir, "rules", "TPY002", "python", "NEW_MARKER")
+    plugin_path = plugins_dir / "rules" / "plugin.py"
+    stat = plugin_path.stat()
+    os.utime(plugin_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    registry = PluginRegistry(plugins_dir)
+    assert [rule.id for rule in registry.rules()] == ["TPY002"]
+    assert registry.rules()[0].literals == ("NEW_MARKER",)
+
+
+def test_broken_plugin_is_skipped_and_reported(tmp_path):
+    plugins_dir = tmp_path / "plugins"
+    _write_plugin(plugins_dir, "good", "TPY001", "python", "PY_MARKER")
+    (plugins_dir / "broken").mkdir()
+    (plugins_dir / "broken" / "plugin.py").write_text("raise RuntimeError('boom')\n", encoding="utf-8")
+
+    registry = PluginRegistry(plugins_dir)
+    assert [rule.id for rule in registry.rules()] == ["TPY001"]
+    assert registry.errors == ["plugin broken: boom"]
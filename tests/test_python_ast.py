@@ -0,0 +1,64 @@
+﻿from core.config import ScanOptions
+from core.engine import ScanEngine
+from core.rules import get_builtin_rules
+from core.rules.ruleset import RuleSet
+
+
+def _scan(text):
+    rules = get_builtin_rules()
+    by_ruleset = RuleSet(rules).scan("mod.py", text, "python")
+    per_rule = [f for rule in rules if "python" in rule.languages for f in rule.scan("mod.py", text)]
+    assert [f.id for f in by_ruleset] == [f.id for f in per_rule]
+    return [(f.rule_id, f.line) for f in by_ruleset]
+
+
+def test_multiline_calls_are_reported_on_the_matching_line():
+    text = (
+        "import subprocess\n"
+        "subprocess.run(\n"
+        "    cmd,\n"
+        "    shell=True,\n"
+        ")\n"
+        "requests.get(\n"
+        "    url, verify=False)\n"
+    )
+    assert _scan(text) == [("PY001", 4), ("PY007", 7)]
+
+
+def test_comments_strings_and_safe_calls_are_ignored():
+    text = (
+        "# os.system(cmd) is what we used to do\n"
+        "HELP = 'never call pickle.loads(data) or yaml.load(s)'\n"
+        "conf = yaml.load(s, Loader=yaml.SafeLoader)\n"
+        "cursor.execute('SELECT * FROM t WHERE id = %s', (ident,))\n"
+        "cursor.execute(f'SELECT * FROM t WHERE id = {ident}')\n"
+    )
+    assert _scan(text) == [("PY006", 5)]
+
+
+def test_unparsable_files_fall_back_to_line_patterns():
+    text = "def broken(:\n    os.system(cmd)\n    token = random.choice(chars)\n"
+    assert _scan(text) == [("PY002", 2), ("PY003", 3)]
+
+
+def test_byte_order_mark_does_not_disable_ast_rules():
+    text = "﻿# os.system(cmd) is what we used to do\nHELP = 'never call pickle.loads(data)'\nos.system(cmd)\n"
+    assert _scan(text) == [("PY002", 3)]
+
+
+def test_verify_assigned_false_is_reported():
+    text = "session.verify = False\nverify: bool = False\nsession.verify = True\nrequests.get(url, verify=False)\n"
+    assert _scan(text) == [("PY007", 1), ("PY007", 2), ("PY007", 4)]
+
+
+def test_lines_numbered_like_splitlines_for_fixers_and_suppressions(tmp_path):
+    text = "import yaml\n\x0c\ndata = yaml.load(s)\nconf = yaml.load(t)  # securepatch: ignore[PY004]\n"
+    assert _scan(text) == [("PY004", 4), ("PY004", 5)]
+    (tmp_path / "conf.py").write_text(text, encoding="utf-8")
+    engine = ScanEngine()
+    options = ScanOptions(use_external_tools=False)
+    result = engine.scan_project(str(tmp_path), options)
+    # The comment on line 5 (as splitlines counts) suppresses that finding.
+    assert [(f.rule_id, f.line) for f in result.findings] == [("PY004", 4)]
+    plan = engine.generate_patch(result, options)
+    assert plan.file_changes[0].updated_text.splitlines()[3] == "data = yaml.safe_load(s)"
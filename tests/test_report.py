@@ -1,6 +1,11 @@
-﻿from pathlib import Path
+﻿import io
+import json
+from pathlib import Path
 from core.engine import ScanEngine
 from core.config import ScanOptions
+from core.models import Finding, Severity
+from core.report import finding_rows
+from core.sarif import write_sarif
 
 
 def test_report_generation(tmp_path):
@@ -11,3 +16,62 @@ def test_report_generation(tmp_path):
     report = engine.export_report(str(sample_dir), result, patch, None)
     assert Path(report.markdown_path).exists()
     assert Path(report.json_path).exists()
+
+
+def test_report_includes_scan_profile(tmp_path):
+    engine = ScanEngine()
+    sample_dir = Path("samples/js_vuln").resolve()
+    result = engine.scan_project(str(sample_dir), ScanOptions(use_external_tools=False, profile=True))
+    report = engine.export_report(str(tmp_path), result, None, None)
+    data = json.loads(Path(report.json_path).read_text(encoding="utf-8"))
+    assert data["profile"]["files_scanned"] == sum(result.language_stats.values())
+    assert "JS001" in data["profile"]["rules"]
+
+
+def test_streamed_reports_match_in_memory_rendering(tmp_path):
+    engine = ScanEngine()
+    options = ScanOptions(use_external_tools=False)
+    sample_dir = Path("samples/python_vuln").resolve()
+    result = engine.scan_project(str(sample_dir), options)
+    patch = engine.generate_patch(result, options)
+    report = engine.export_report(str(tmp_path), result, patch, None)
+    text = Path(report.json_path).read_text(encoding="utf-8")
+    data = json.loads(text)
+    assert text == json.dumps(data, indent=2)
+    assert data["patch"]["diff"] == patch.diff
+    lines = Path(report.findings_path).read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line) for line in lines] == data["findings"]
+    markdown = Path(report.markdown_path).read_text(encoding="utf-8")
+    assert f"```diff\n{patch.diff}\n```" in markdown
+
+
+def test_sarif_report_describes_each_rule_once(tmp_path):
+    engine = ScanEngine()
+    sample_dir = Path("samples/js_vuln").resolve()
+    result = engine.scan_project(str(sample_dir), ScanOptions(use_external_tools=False))
+    report = engine.export_report(str(tmp_path), result, None, None)
+    sarif = json.loads(Path(report.sarif_path).read_text(encoding="utf-8"))
+    assert sarif["version"] == "2.1.0"
+    run = sarif["runs"][0]
+    rules = run["tool"]["driver"]["rules"]
+    assert len(rules) == len({f.rule_id for f in result.findings})
+    assert len(run["results"]) == len(result.findings)
+    for finding, item in zip(result.findings, run["results"]):
+        assert rules[item["ruleIndex"]]["id"] == finding.rule_id == item["ruleId"]
+        region = item["locations"][0]["physicalLocation"]["region"]
+        assert region["startLine"] == finding.line
+    assert run["originalUriBaseIds"]["SRCROOT"]["uri"] == sample_dir.as_uri() + "/"
+
+
+def test_sarif_locates_tool_findings_by_absolute_path(tmp_path):
+    source = (tmp_path / "app.py").resolve()
+    finding = Finding(
+        id="BANDIT:B602", title="subprocess_popen_with_shell_equals_true", description="shell=True",
+        severity=Severity.HIGH, file_path=str(source), line=3, column=1, cwe=78, owasp=None,
+        rule_id="BANDIT:B602", message="shell=True", snippet="", fixable=False, fixer_id=None,
+    )
+    handle = io.StringIO()
+    write_sarif(handle, finding_rows([finding]), (), tmp_path)
+    run = json.loads(handle.getvalue())["runs"][0]
+    assert run["tool"]["driver"]["rules"][0]["properties"]["tags"] == ["78"]
+    assert run["results"][0]["locations"][0]["physicalLocation"]["artifactLocation"] == {"uri": source.as_uri()}
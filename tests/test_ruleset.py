@@ -0,0 +1,107 @@
+﻿import re
+from pathlib import Path
+
+from core.models import Severity
+from core.rules import get_builtin_rules
+from core.rules.base import Rule
+from core.rules.literals import required_literals
+from core.rules.ruleset import RuleSet
+from core.rules.spec import RuleSpec, compile_rules
+
+
+def _per_rule(rules, file_path, text, language):
+    findings = []
+    for rule in rules:
+        if language in rule.languages:
+            findings.extend(rule.scan(file_path, text))
+    return findings
+
+
+def _ids(findings):
+    return [(f.id, f.message, f.snippet) for f in findings]
+
+
+def test_ruleset_matches_per_rule_scan_on_samples():
+    rules = get_builtin_rules()
+    ruleset = RuleSet(rules)
+    for path, language in [
+        (Path("samples/python_vuln/app.py"), "python"),
+        (Path("samples/python_vuln/db.py"), "python"),
+        (Path("samples/js_vuln/index.js"), "javascript"),
+        (Path("samples/js_vuln/server.js"), "javascript"),
+    ]:
+        text = path.read_text(encoding="utf-8")
+        assert _ids(ruleset.scan(path.name, text, language)) == _ids(_per_rule(rules, path.name, text, language))
+
+
+def test_ruleset_handles_shared_lines_and_line_endings():
+    rules = get_builtin_rules()
+    ruleset = RuleSet(rules)
+    text = (
+        "import os\r\n"
+        "os.system(cmd); data = yaml.load(s)\r\n"
+        "eval\n(\n"
+        "key = random.choice(chars)\x0cpickle.loads(x)\n"
+        "requests.get(u, verify=False)"
+    )
+    found = ruleset.scan("x.py", text, "python")
+    assert _ids(found) == _ids(_per_rule(rules, "x.py", text, "python"))
+    assert [f.rule_id for f in found] == ["PY002", "PY003", "PY004", "PY007", "PY008"]
+    assert ruleset.scan("x.txt", text, "other") == []
+
+
+def test_required_literals():
+    assert required_literals(re.compile(r"subprocess\.(run|Popen)\s*\(.*shell")) == ("subprocess.",)
+    assert required_literals(re.compile(r"\beval\s*\(")) == ("eval",)
+    assert required_literals(re.compile(r"AKIA[0-9A-Z]{16}|password\s*=")) == ("AKIA", "password")
+    assert required_literals(re.compile(r"(?:token)?\s*=\s*x")) is None
+    assert required_literals(re.compile(r"secret", re.IGNORECASE)) is None
+    assert required_literals(re.compile(r"ab\s*\(")) is None
+
+
+def test_rules_without_their_literals_are_skipped():
+    calls = []
+
+    def marker_scan(file_path, text):
+        calls.append(file_path)
+        return []
+
+    rule = Rule(
+        id="LIT001", title="marker", description="marker", severity=Severity.LOW, cwe=None, owasp=None,
+        languages={"python"}, scan=marker_scan, message="marker", fixer_id=None, literals=("MARKER",),
+    )
+    ruleset = RuleSet(get_builtin_rules() + [rule])
+    assert ruleset.scan("clean.py", "x = 1\n" * 100, "python") == []
+    ruleset.scan("marked.py", "# MARKER\nos.system(cmd)\n", "python")
+    assert calls == ["marked.py"]
+
+
+def _reference_scan(rule, file_path, text):
+    return [
+        (f"{rule.id}:{file_path}:{idx}", line.strip())
+        for idx, line in enumerate(text.splitlines(), start=1)
+        if rule.line_pattern.matches(line)
+    ]
+
+
+def test_line_core_matches_splitlines_reference():
+    specs = [
+        RuleSpec(
+            id="SPEC001", title="t", description="d", severity=Severity.LOW, cwe=None, owasp=None,
+            languages={"python"}, message="m", pattern=pattern, guard=r"(?i)USER",
+        )
+        for pattern in (r"danger\(\w*\)\s*$", r"(?<!x)danger\(")
+    ]
+    gated, line_by_line = compile_rules(specs)
+    texts = [
+        "danger(user)\nsafe\ndanger(x)\n",
+        "a\r\ndanger(user)\r\n\x0cdanger(user_id)\x85b\n",
+        "danger(user)",
+        "",
+        "\n\ndanger(User) \n",
+    ]
+    for rule in (gated, line_by_line):
+        for text in texts:
+            assert [(f.id, f.snippet) for f in rule.scan("m.py", text)] == _reference_scan(rule, "m.py", text)
+    assert gated.line_pattern.message == "m"
+    assert gated.literals is None and required_literals(gated.line_pattern.regex) == ("danger(",)
@@ -15,3 +15,41 @@ def test_scan_js_sample():
     sample_dir = Path("samples/js_vuln").resolve()
     result = engine.scan_project(str(sample_dir), ScanOptions())
     assert len(result.findings) >= 6
+
+
+def test_iter_scan_streams_per_file():
+    engine = ScanEngine()
+    sample_dir = Path("samples/python_vuln").resolve()
+    options = ScanOptions(use_external_tools=False)
+    stream = engine.iter_scan(str(sample_dir), options)
+    events = list(stream)
+    assert [e.files_done for e in events[:-1]] == list(range(1, len(events)))
+    assert events[-1].file_path is None
+    streamed = [f.id for e in events for f in e.findings]
+    assert streamed == [f.id for f in stream.result.findings]
+    assert streamed == [f.id for f in engine.scan_project(str(sample_dir), options).findings]
+
+
+def test_iter_scan_cancel():
+    engine = ScanEngine()
+    stream = engine.iter_scan(str(Path("samples/js_vuln").resolve()), ScanOptions(use_external_tools=False))
+    for event in stream:
+        stream.cancel()
+    assert event.files_done == 1
+    assert stream.result.cancelled
+    assert stream.result.errors == ["Scan cancelled"]
+
+
+def test_scan_profile(tmp_path):
+    engine = ScanEngine()
+    sample_dir = Path("samples/python_vuln").resolve()
+    dump = tmp_path / "scan.prof"
+    options = ScanOptions(use_external_tools=False, profile=True, profile_top_n=2, cprofile_path=str(dump))
+    result = engine.scan_project(str(sample_dir), options)
+    profile = result.profile.to_dict()
+    assert profile["files_scanned"] == sum(result.language_stats.values())
+    assert sum(rule["matches"] for rule in profile["rules"].values()) == len(result.findings)
+    assert len(profile["slowest_files"]) <= 2
+    assert profile["total_seconds"] >= profile["walk_seconds"]
+    assert dump.stat().st_size > 0
+    assert engine.scan_project(str(sample_dir), ScanOptions(use_external_tools=False)).profile is None
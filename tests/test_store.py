@@ -0,0 +1,57 @@
+﻿from core import store as store_module
+from core.models import Finding, Severity
+from core.store import SNIPPET_BLOCK, FindingStore
+
+
+def _finding(idx, finding_id=None):
+    file_path = f"pkg/mod_{idx % 3}.py"
+    return Finding(
+        id=finding_id or f"PY002:{file_path}:{idx}",
+        title="os.system usage",
+        description="os.system executes via shell",
+        severity=Severity.HIGH,
+        file_path=file_path,
+        line=idx,
+        column=1,
+        cwe="CWE-78",
+        owasp="A03:2021",
+        rule_id="PY002",
+        message="os.system executes via shell",
+        snippet=f"os.system(cmd_{idx})" if idx % 4 else "",
+        fixable=False,
+        fixer_id=None,
+    )
+
+
+def test_store_round_trips_findings(monkeypatch):
+    monkeypatch.setattr(store_module, "SNIPPET_BLOCK", 8)
+    findings = [_finding(idx) for idx in range(1, 30)]
+    findings.append(_finding(30, finding_id="BANDIT:B605"))
+    store = FindingStore(findings)
+
+    assert len(store) == 30
+    assert [view.to_finding() for view in store] == findings
+    assert store[-1].id == "BANDIT:B605"
+    assert store[9].snippet == "os.system(cmd_10)"
+    assert store[11].snippet == ""
+    assert store[2] == findings[2]
+    assert [f.line for f in store[3:6]] == [4, 5, 6]
+    assert len(store._meta) == 1
+    assert len(store._files) == 3
+
+
+def test_column_dump_round_trips(tmp_path):
+    findings = [
+        Finding(f"R{i % 3}:src/f{i % 5}.py:{i}", f"T{i % 3}", "d", Severity.HIGH, f"src/f{i % 5}.py", i, 1,
+                "CWE-1", None, f"R{i % 3}", "m", f"snippet ü {i}" * (i % 4), i % 2 == 0, None)
+        for i in range(SNIPPET_BLOCK + 10)
+    ]
+    findings.append(Finding("custom-id", "T", "d", Severity.LOW, "x.js", 3, 2, None, None, "J", "m", "", False, None))
+    store = FindingStore(findings)
+    path = tmp_path / "findings.spfc"
+    with open(path, "wb") as handle:
+        store.dump(handle)
+    with open(path, "rb") as handle:
+        loaded = FindingStore.load(handle)
+    assert [view.to_finding() for view in loaded] == findings
+    assert list(loaded.rows()) == list(store.rows())
@@ -0,0 +1,91 @@
+﻿import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from core import tooling
+from core.config import ScanOptions
+from core.scanner import Scanner
+from core.tooling import ToolTimeout, _run_tool, start_external_tools
+
+
+def test_external_tools_run_concurrently(monkeypatch):
+    def slow_tool(project_path, timeout):
+        time.sleep(0.3)
+        return [], None
+
+    def stuck_tool(project_path, timeout):
+        raise ToolTimeout(f"stuck timed out after {timeout}s")
+
+    monkeypatch.setattr(tooling, "EXTERNAL_TOOLS", [
+        ("first", slow_tool),
+        ("second", slow_tool),
+        ("stuck", stuck_tool),
+    ])
+    start = time.perf_counter()
+    run = start_external_tools(".", ScanOptions(tool_timeout=5))
+    tools_used, findings, errors, timings = run.result()
+    assert time.perf_counter() - start < 0.55
+    assert tools_used == ["first", "second"]
+    assert errors == ["stuck timed out after 5s"]
+    assert timings["stuck"]["timed_out"]
+    assert timings["first"]["seconds"] >= 0.3
+
+
+def test_run_tool_timeout():
+    with pytest.raises(ToolTimeout):
+        _run_tool([sys.executable, "-c", "import time; time.sleep(5)"], ".", timeout=0.2)
+
+
+def test_cancelled_scan_stops_external_tools(monkeypatch, tmp_path):
+    started = []
+
+    class RecordingPopen(subprocess.Popen):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            started.append(self)
+
+    def hanging_tool(project_path, timeout):
+        _, _, err = _run_tool([sys.executable, "-c", "import time; time.sleep(30)"], project_path, timeout)
+        return [], err or None
+
+    monkeypatch.setattr(tooling.subprocess, "Popen", RecordingPopen)
+    monkeypatch.setattr(tooling, "EXTERNAL_TOOLS", [("hanging", hanging_tool)])
+    for idx in range(3):
+        (tmp_path / f"m{idx}.py").write_text("import os\n", encoding="utf-8")
+
+    stream = Scanner().iter_scan(str(tmp_path), ScanOptions(tool_timeout=30))
+    events = iter(stream)
+    next(events)
+    deadline = time.monotonic() + 5
+    while not started and time.monotonic() < deadline:
+        time.sleep(0.01)
+    start = time.perf_counter()
+    stream.cancel()
+    assert list(events) == []
+    assert time.perf_counter() - start < 3
+    assert started and all(proc.poll() is not None for proc in started)
+    assert not [t for t in threading.enumerate() if t.name.startswith("securepatch-tool")]
+    assert stream.result.cancelled
+
+
+def test_cancel_while_waiting_for_tools_stops_them(monkeypatch, tmp_path):
+    def hanging_tool(project_path, timeout):
+        _, _, err = _run_tool([sys.executable, "-c", "import time; time.sleep(30)"], project_path, timeout)
+        return [], err or None
+
+    monkeypatch.setattr(tooling, "EXTERNAL_TOOLS", [("hanging", hanging_tool)])
+    (tmp_path / "m.py").write_text("import os\n", encoding="utf-8")
+
+    stream = Scanner().iter_scan(str(tmp_path), ScanOptions(tool_timeout=30))
+    timer = threading.Timer(0.3, stream.cancel)
+    timer.start()
+    start = time.perf_counter()
+    events = list(stream)
+    timer.join()
+    assert time.perf_counter() - start < 3
+    assert [event.file_path for event in events] == ["m.py"]
+    assert stream.result.cancelled
+    assert not [t for t in threading.enumerate() if t.name.startswith("securepatch-tool")]
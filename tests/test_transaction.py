@@ -0,0 +1,59 @@
+﻿from core.engine import ScanEngine
+from core.models import FileChange, PatchPlan
+from core.transaction import open_archive
+from core.utils import hash_text
+
+
+def _plan(root, contents):
+    changes = []
+    for name, (original, updated) in contents.items():
+        (root / name).write_bytes(original.encode("utf-8"))
+        changes.append(FileChange(name, original, updated, hash_text(original)))
+    return PatchPlan(changes, [])
+
+
+def _engine(root):
+    engine = ScanEngine()
+    engine.project_root = root.resolve()
+    return engine
+
+
+def test_apply_archives_originals_once_and_rolls_back(tmp_path):
+    plan = _plan(tmp_path, {
+        "a.py": ("x = 1\r\n", "x = 2\r\n"),
+        "b.py": ("x = 1\r\n", "x = 3\r\n"),
+    })
+    engine = _engine(tmp_path)
+    result = engine.apply_patch(plan, create_backup=True)
+    assert sorted(result.applied_files) == ["a.py", "b.py"]
+    assert not result.errors
+    assert (tmp_path / "a.py").read_bytes() == b"x = 2\r\n"
+    archive = open_archive(tmp_path.resolve())
+    assert len([p for p in archive.objects.rglob("*") if p.is_file()]) == 1
+    assert not list(tmp_path.glob("*.securepatch-tmp"))
+
+    restored = engine.rollback_patch()
+    assert sorted(restored.applied_files) == ["a.py", "b.py"]
+    assert (tmp_path / "b.py").read_bytes() == b"x = 1\r\n"
+    assert engine.rollback_patch().errors == ["No patch to roll back"]
+
+
+def test_transactional_apply_is_all_or_nothing(tmp_path):
+    plan = _plan(tmp_path, {"a.py": ("a\n", "A\n"), "b.py": ("b\n", "B\n")})
+    (tmp_path / "b.py").write_text("edited\n", encoding="utf-8")
+    result = _engine(tmp_path).apply_patch(plan, create_backup=False, transactional=True)
+    assert result.applied_files == []
+    assert any("changed since scan" in error for error in result.errors)
+    assert (tmp_path / "a.py").read_text(encoding="utf-8") == "a\n"
+    assert not list(tmp_path.glob("*.securepatch-tmp"))
+
+
+def test_rollback_skips_files_edited_after_apply(tmp_path):
+    plan = _plan(tmp_path, {"a.py": ("a\n", "A\n"), "b.py": ("b\n", "B\n")})
+    engine = _engine(tmp_path)
+    engine.apply_patch(plan, create_backup=True)
+    (tmp_path / "b.py").write_text("mine\n", encoding="utf-8")
+    result = engine.rollback_patch()
+    assert result.applied_files == ["a.py"]
+    assert result.errors == ["b.py: file changed since patch was applied"]
+    assert (tmp_path / "b.py").read_text(encoding="utf-8") == "mine\n"
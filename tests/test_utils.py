@@ -0,0 +1,48 @@
+﻿import pytest
+
+from core import scanner as scanner_module
+from core import utils
+from core.config import ScanOptions
+from core.rules import get_builtin_rules
+from core.rules.ruleset import RuleSet
+from core.scanner import Scanner
+from core.utils import open_text_bytes, read_text_file
+
+
+def test_read_text_file_maps_large_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(utils, "MMAP_THRESHOLD_BYTES", 64)
+    path = tmp_path / "big.js"
+    path.write_bytes(("const a = 'café';\n" * 20).encode("utf-8"))
+    with open_text_bytes(path) as data:
+        assert not isinstance(data, bytes)
+    assert read_text_file(path) == "const a = 'café';\n" * 20
+
+
+def test_binary_sniff_uses_prefix(tmp_path):
+    head = tmp_path / "head.py"
+    head.write_bytes(b"\x00" + b"x" * 10)
+    with pytest.raises(ValueError):
+        read_text_file(head)
+    tail = tmp_path / "tail.py"
+    tail.write_bytes(b"x = 1\n" * 2000 + b"\x00")
+    assert read_text_file(tail).startswith("x = 1")
+
+
+def test_needs_text_skips_ascii_without_hits():
+    ruleset = RuleSet(get_builtin_rules())
+    assert not ruleset.needs_text(b"const a = 1;\n" * 50, "javascript")
+    assert ruleset.needs_text(b"const a = 1;\neval(x);\n", "javascript")
+    assert not ruleset.needs_text("const a = 'é';\n".encode("utf-8"), "javascript")
+    assert ruleset.needs_text("const a = 'é'; query(a)\n".encode("utf-8"), "javascript")
+
+
+def test_large_file_scan_matches_small_file_scan(tmp_path, monkeypatch):
+    (tmp_path / "bundle.min.js").write_text("var a=1;" * 400 + "\nel.innerHTML = x;\n", encoding="utf-8")
+    (tmp_path / "clean.min.js").write_text("var a=1;" * 400 + "\n", encoding="utf-8")
+    options = ScanOptions(use_external_tools=False)
+    expected = [f.id for f in Scanner().scan(str(tmp_path), options).findings]
+    monkeypatch.setattr(utils, "MMAP_THRESHOLD_BYTES", 256)
+    monkeypatch.setattr(scanner_module, "MMAP_THRESHOLD_BYTES", 256)
+    result = Scanner().scan(str(tmp_path), options)
+    assert [f.id for f in result.findings] == expected == ["JS003:bundle.min.js:2"]
+    assert result.language_stats == {"javascript": 2}
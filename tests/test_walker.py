@@ -0,0 +1,67 @@
+﻿import os
+from pathlib import Path
+
+from core.walker import IgnoreFile, walk_files
+
+
+def _rel(root, entries):
+    return [Path(e.path).relative_to(root).as_posix() for e in entries]
+
+
+def _make_tree(root):
+    for rel in [
+        "app.py", "README.md", "src/a.py", "src/b.js", "src/gen/out.py", "src/keep.log.py",
+        "build/x.py", "node_modules/lib/index.js", "docs/notes/c.py", "docs/notes/d.py",
+    ]:
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("x = 1\n", encoding="utf-8")
+    (root / ".gitignore").write_text("# generated\n/docs/notes/d.py\ngen/\n*.log.py\n", encoding="utf-8")
+    (root / "src" / ".securepatchignore").write_text("*.js\n!b.js\n", encoding="utf-8")
+
+
+def test_walk_filters_extensions_and_ignore_files(tmp_path):
+    _make_tree(tmp_path)
+    everything = sorted(_rel(tmp_path, walk_files(tmp_path)))
+    assert "README.md" in everything
+    assert "build/x.py" not in everything
+    assert "node_modules/lib/index.js" not in everything
+
+    found = sorted(_rel(tmp_path, walk_files(tmp_path, {".py", ".js"}, use_ignore_files=True)))
+    assert found == ["app.py", "docs/notes/c.py", "src/a.py", "src/b.js"]
+
+
+def test_parallel_walk_keeps_serial_order(tmp_path):
+    _make_tree(tmp_path)
+    for idx in range(20):
+        nested = tmp_path / f"pkg_{idx}" / "sub"
+        nested.mkdir(parents=True)
+        (nested / "m.py").write_text("", encoding="utf-8")
+        (tmp_path / f"pkg_{idx}" / "n.py").write_text("", encoding="utf-8")
+    serial = _rel(tmp_path, walk_files(tmp_path, {".py"}))
+    assert _rel(tmp_path, walk_files(tmp_path, {".py"}, parallel=True, workers=4)) == serial
+
+
+def test_walk_skips_symlinks(tmp_path):
+    (tmp_path / "real").mkdir()
+    (tmp_path / "real" / "a.py").write_text("", encoding="utf-8")
+    try:
+        os.symlink(tmp_path / "real", tmp_path / "link")
+        os.symlink(tmp_path / "real" / "a.py", tmp_path / "b.py")
+    except (OSError, NotImplementedError):
+        return
+    assert _rel(tmp_path, walk_files(tmp_path)) == ["real/a.py"]
+
+
+def test_ignore_file_patterns():
+    ignore = IgnoreFile(["**/cache/", "/top.py", "a/**/z.py", "*.min.js", "!keep.min.js", "lib/*.py"])
+    assert ignore.match("x/cache", True)
+    assert ignore.match("x/cache", False) is None
+    assert ignore.match("top.py", False)
+    assert ignore.match("sub/top.py", False) is None
+    assert ignore.match("a/b/c/z.py", False)
+    assert ignore.match("a/z.py", False)
+    assert ignore.match("deep/bundle.min.js", False)
+    assert ignore.match("keep.min.js", False) is False
+    assert ignore.match("lib/m.py", False)
+    assert ignore.match("lib/sub/m.py", False) is None
@@ -0,0 +1,63 @@
+﻿import queue
+import threading
+
+from core.config import ScanOptions
+from core import watch
+from core.engine import ScanEngine
+
+
+def _watch(tmp_path):
+    watcher = ScanEngine().watch(str(tmp_path), ScanOptions(), poll_interval=0.01, use_watchdog=False)
+    initial = watcher.start()
+    deltas = queue.Queue()
+    thread = threading.Thread(target=lambda: [deltas.put(delta) for delta in watcher.deltas()], daemon=True)
+    thread.start()
+    return watcher, initial, deltas, thread
+
+
+def test_watch_reports_added_and_resolved_findings(tmp_path):
+    (tmp_path / "a.py").write_text("import os\nos.system(cmd)\n", encoding="utf-8")
+    (tmp_path / "b.py").write_text("x = 1\n", encoding="utf-8")
+    watcher, initial, deltas, thread = _watch(tmp_path)
+    try:
+        assert [f.rule_id for f in initial.added] == ["PY002"]
+
+        (tmp_path / "b.py").write_text("requests.get(url, verify=False)\n", encoding="utf-8")
+        delta = deltas.get(timeout=5)
+        assert delta.files == ["b.py"]
+        assert [(f.file_path, f.rule_id) for f in delta.added] == [("b.py", "PY007")]
+        assert delta.resolved == []
+
+        (tmp_path / "a.py").unlink()
+        delta = deltas.get(timeout=5)
+        assert delta.added == []
+        assert [(f.file_path, f.rule_id) for f in delta.resolved] == [("a.py", "PY002")]
+        assert [f.rule_id for f in watcher.findings()] == ["PY007"]
+    finally:
+        watcher.stop()
+        thread.join(timeout=5)
+    assert not thread.is_alive()
+
+
+def test_unreadable_file_keeps_its_findings(tmp_path, monkeypatch):
+    (tmp_path / "a.py").write_text("import os\nos.system(cmd)\n", encoding="utf-8")
+    watcher = ScanEngine().watch(str(tmp_path), ScanOptions(), use_watchdog=False)
+    watcher.start()
+    monkeypatch.setattr(watch, "scan_file", lambda ruleset, path, root: (None, [], f"{path}: busy", None))
+    delta = watcher.rescan({"a.py"})
+    assert delta.added == [] and delta.resolved == []
+    assert delta.errors and delta.errors[0].endswith("busy")
+    assert [f.rule_id for f in watcher.findings()] == ["PY002"]
+
+
+def test_polling_rechecks_recently_changed_files_between_walks(tmp_path):
+    (tmp_path / "a.py").write_text("x = 1\n", encoding="utf-8")
+    (tmp_path / "b.py").write_text("x = 1\n", encoding="utf-8")
+    watcher = ScanEngine().watch(str(tmp_path), ScanOptions(), poll_interval=60, use_watchdog=False)
+    watcher.start()
+    watcher._remember({"b.py"})
+    (tmp_path / "a.py").write_text("x = 22\n", encoding="utf-8")
+    (tmp_path / "b.py").write_text("x = 22\n", encoding="utf-8")
+    assert watcher._changes(set()) == {"b.py"}
+    watcher._walked -= 60
+    assert watcher._changes(set()) == {"a.py"}